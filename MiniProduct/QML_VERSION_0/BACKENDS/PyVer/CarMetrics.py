@@ -2,22 +2,25 @@ import random
 import time
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QTimer, pyqtProperty
 from MiniProduct.QML_VERSION_0.Colours import ALL_AVAILABLE_COLORS, find_colours_by_tag
-from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_pipeline import TelemetryPipeline
 
 
 class CarMetrics(QObject):
-    # === Signals for QML (engine + vehicle) ===
-    speedChanged = pyqtSignal(float)
-    rpmChanged = pyqtSignal(float)
-    throttleChanged = pyqtSignal(float)
-    brakesChanged = pyqtSignal(float)
-    fuelChanged = pyqtSignal(float)
-    oilTempChanged = pyqtSignal(float)
-    batteryChanged = pyqtSignal(float)
-    coolantChanged = pyqtSignal(float)
-    fuelLevelChanged = pyqtSignal(float)
-    engineLoadChanged = pyqtSignal(float)
-    fuelConsumptionChanged = pyqtSignal(float)
+    """
+    Qt adapter over TelemetryPipeline: QTimers drive the pipeline, and its
+    state goes to QML as frames, signals, properties and slots. The random
+    fallback view and the startup animation live here; acquisition,
+    recording and derived metrics do not.
+    """
+
+    # === One signal per UI tick for QML (engine + vehicle) ===
+    # carries only the values that changed since the last frame, e.g. {"speed": 42.0, "rpm": 1800.0}.
+    # keys: speed, rpm, throttle, engineLoad, fuel, fuelConsumption, brakes, oilTemp, battery,
+    #       coolant, fuelLevel, engineWarning, generalWarning
+    #       tripDistanceKm, tripFuelL, tripIdleFuelL, tripEconomy (L/100km, 0 until the car has moved)
+    # plus speedPoints / fuelPoints: graph points appended since the last frame (1 s means);
+    # `frame` holds the full current state, seriesPoints() a graph's history
+    frameChanged = pyqtSignal("QVariantMap")
 
     # === New signals for CAN-level / chassis metrics ===
     steeringAngleChanged = pyqtSignal(float)      # degrees
@@ -30,31 +33,37 @@ class CarMetrics(QObject):
     wheelRRChanged = pyqtSignal(float)
     dtcCodesChanged = pyqtSignal(list)            # list of strings ["P0138 - O2 Sensor High Voltage", ...]
 
-    miniLoggerChanged = pyqtSignal(list)
-    engineWarningChanged = pyqtSignal(bool)
-    generalWarningChanged = pyqtSignal(bool)
+    miniLoggerChanged = pyqtSignal(int, list)     # sequence of the first line, new lines only
     loggingStateChanged = pyqtSignal(bool)
-
-    speedSeriesChanged = pyqtSignal(list)
-    fuelSeriesChanged = pyqtSignal(list)
+    connectionStateChanged = pyqtSignal(str)     # "disconnected", "probing", "connected", "degraded"
+    diagnosticsChanged = pyqtSignal()            # 1 Hz; `diagnostics` is only built when read
 
 
 
     def log(self, message):
-        print(message)
-        if isinstance(message, list):
-            for line in message:
-                timestamp = time.strftime("%H:%M:%S", time.localtime())
-                self.mini_logger.append(f"[{timestamp}] {line}")
-        else:
-            timestamp = time.strftime("%H:%M:%S", time.localtime())
-            self.mini_logger.append(f"[{timestamp}] {message}")
-        if len(self.mini_logger) > 100:
-            self.mini_logger.pop(0)
+        self._pipeline.log(message)
+
+    @property
+    def mini_logger(self):
+        return self._pipeline.mini_logger
+
+    @property
+    def obd_connected(self):
+        return self._pipeline.connected
 
-    def __init__(self, colours_filename="COLOURS_CONFIG.txt", log_file_path=None):
+    def __init__(self, colours_filename="COLOURS_CONFIG.txt", log_file_path=None, replay_path=None, replay_speed=1.0,
+                 isolated=False):
         super().__init__()
-        self.mini_logger = []
+        self._frame = {}            # last value sent for each frame key
+        self._pending_frame = {}
+        self._pending_points = {}
+        # isolated=True runs the OBD client in its own process (see OBD_process):
+        # this process then only reads frames from shared memory
+        self._pipeline = TelemetryPipeline(log_file_path=log_file_path, replay_path=replay_path,
+                                           replay_speed=replay_speed, isolated=isolated)
+        self._pipeline.on_state_change = lambda state: self._emit("connectionStateChanged", state)
+        self._instrumentation = self._pipeline.instrumentation
+        self._log_cursor = 0        # last mini_logger sequence sent to QML
         self.log("CarMetrics backend initialized.")
 
         self.colours_filename = colours_filename
@@ -70,46 +79,31 @@ class CarMetrics(QObject):
         self.fuel_current_start = 0
         self.fuel_range_max = 100
 
-        # === OBD client ===
-        try:
-            self._obd_client = OBDBackendCore(port="COM5", log_file_path=log_file_path)
-            connect_response = self._obd_client._connect()
-            self.log(connect_response)
-            self.obd_connected = self._obd_client.obd_elm327_connection
-            self.log("[OBD] Connected to OBD-II adapter." if self.obd_connected else "[OBD] OBD-II adapter not connected.")
-        except Exception as e:
-            self.log(f"[OBD] Connection failed: {e}\nSwitching to random view...")
-            self._obd_client = None
-            self.obd_connected = False
+        # === OBD client (connected and polled by the pipeline's acquisition worker) ===
+        if not self._pipeline.start():
+            self.log("[OBD] Switching to random view...")
 
-        # === Timers ===
+        # === Timers (each slot's run time, lateness and jitter go to the instrumentation) ===
+        timed = self._instrumentation.timed
         self.fast_timer = QTimer()
-        self.fast_timer.timeout.connect(self.update_fast_metrics)
+        self.fast_timer.timeout.connect(timed("update_fast_metrics", 0.1, self.update_fast_metrics))
         self.fast_timer.start(100)  # ~10 Hz
 
         self.slow_timer = QTimer()
-        self.slow_timer.timeout.connect(self.update_slow_metrics)
+        self.slow_timer.timeout.connect(timed("update_slow_metrics", 1.0, self.update_slow_metrics))
         self.slow_timer.start(1000)  # 1 Hz
 
         self.dtc_timer = QTimer()
-        self.dtc_timer.timeout.connect(self.update_dtc_codes)
+        self.dtc_timer.timeout.connect(timed("update_dtc_codes", 5.0, self.update_dtc_codes))
         self.dtc_timer.start(5000)  # Every 5 seconds (diagnostic check)
 
 
         self.logger_timer = QTimer()
-        self.logger_timer.timeout.connect(self.emit_logger)
+        self.logger_timer.timeout.connect(timed("emit_logger", 3.0, self.emit_logger))
         self.logger_timer.start(3000)  # update every 3 seconds
 
-        self.isLogging = False
         self.engine_warning = False
         self.general_warning = True
-
-        self._speed_tick = 0
-        self._fuel_tick = 0
-        self._avg_speed = 0.0
-        self._avg_fuel = 0.0
-        self._avg_speed_series = []
-        self._avg_fuel_series = []
         self._current_fuel_consumption = 0.0
 
 
@@ -117,15 +111,44 @@ class CarMetrics(QObject):
     #                       METRIC UPDATES
     # ----------------------------------------------------------------------
 
+    def _emit(self, name, *args):
+        """Emit a signal by name, counting it for the emissions-per-second diagnostics."""
+        self._instrumentation.count(name)
+        getattr(self, name).emit(*args)
+
+    def _stage(self, **values):
+        """Queue values for the next frame; unchanged ones are dropped when it is sent."""
+        self._pending_frame.update(values)
+
+    def _stage_points(self, key, points):
+        """Queue appended graph points; unlike values they are always sent, then forgotten."""
+        if points:
+            self._pending_points.setdefault(key, []).extend(points)
+
+    def _emit_frame(self):
+        """Send every staged value that differs from what QML already has, as one frameChanged."""
+        pending, self._pending_frame = self._pending_frame, {}
+        frame = self._frame
+        changed = {key: value for key, value in pending.items() if frame.get(key) != value}
+        if self._pending_points:
+            changed.update(self._pending_points)
+            self._pending_points = {}
+        if changed:
+            frame.update((key, value) for key, value in changed.items() if key in pending)
+            self._emit("frameChanged", changed)
+
     def update_fast_metrics(self):
         """Called ~10Hz → we use it as base clock."""
         if self.starting:
             self._startup_animation_step()
             return
 
-        # --- fetch or simulate data ---
-        if self.obd_connected and self._obd_client and self._obd_client.is_connected():
-            fast_data = self._obd_client.get_fast_data()
+        self._pipeline.consume_samples()
+
+        # --- read latest snapshot or simulate data ---
+        snapshot = self._pipeline.latest()
+        if snapshot and snapshot.connected:
+            fast_data = snapshot.fast
             speed = float(fast_data.get("SPEED", 0))
             rpm = float(fast_data.get("RPM", 0))
             throttle = float(fast_data.get("THROTTLE_POS", 0))
@@ -142,135 +165,145 @@ class CarMetrics(QObject):
             fuel = random.uniform(20, 90)
             fuel_consumption = random.uniform(3, 12)  # random simulated L/100km
 
-        # --- Emit instant readings to QML ---
-        self.speedChanged.emit(speed)
-        self.rpmChanged.emit(rpm)
-        self.throttleChanged.emit(throttle)
-        self.engineLoadChanged.emit(engine_load)
-        self.fuelChanged.emit(fuel)
+        # --- Stage instant readings for this tick's frame ---
         self._current_fuel_consumption = fuel_consumption
-        self.fuelConsumptionChanged.emit(fuel_consumption)
-
         brakes = random.uniform(0, 100)
-        self.brakesChanged.emit(brakes)
-
-        # === accumulate speed ===
-        self._speed_tick += 1
-        self._avg_speed = (self._avg_speed * (self._speed_tick - 1) + speed) / self._speed_tick
-
-        # === accumulate fuel ===
-        self._fuel_tick += 1
-        self._avg_fuel = (self._avg_fuel * (self._fuel_tick - 1) + fuel_consumption) / self._fuel_tick
-
-
-        # --- every 10 ticks, record one average point ---
-        if self._speed_tick % 10 == 0:
-            self._avg_speed_series.append(self._avg_speed)
-            self._speed_tick = 0  # reset tick counter for next local average block
-
-        if self._fuel_tick % 10 == 0:
-            self._avg_fuel_series.append(self._avg_fuel)
-            self._fuel_tick = 0
-
-        # --- if too many points, downsample ---
-        if len(self._avg_speed_series) > 100:
-            self._avg_speed_series = self._downsample(self._avg_speed_series)
-        if len(self._avg_fuel_series) > 100:
-            self._avg_fuel_series = self._downsample(self._avg_fuel_series)
-
-        # --- emit rolling average series for graphs ---
-        self.speedSeriesChanged.emit(self._avg_speed_series)
-        self.fuelSeriesChanged.emit(self._avg_fuel_series)
-
-    # ----------------------------------------------------------
-    # Helper: reduce list by averaging each 10-segment block
-    # ----------------------------------------------------------
-    def _downsample(self, data, factor=10):
-        if len(data) < factor:
-            return data
-        new_data = []
-        block_size = len(data) // factor
-        for i in range(0, len(data), block_size):
-            block = data[i:i + block_size]
-            if block:
-                new_data.append(sum(block) / len(block))
-        return new_data
+        self._stage(speed=speed, rpm=rpm, throttle=throttle, engineLoad=engine_load, fuel=fuel,
+                    fuelConsumption=fuel_consumption, brakes=brakes)
+
+        # === graph series: only points closed by this sample go out ===
+        now = time.monotonic()
+        self._stage_points("speedPoints", self._pipeline.append_series("speed", now, speed))
+        self._stage_points("fuelPoints", self._pipeline.append_series("fuel", now, fuel_consumption))
+
+        self._emit_frame()
+
+    @pyqtSlot(str, str, result="QVariantMap")
+    def stats(self, metric, window="1min"):
+        """count / mean / min / max / stddev / p50 / p90 / p95 of a metric over "10s", "1min", "5min" or "trip"."""
+        return self._pipeline.stats_summary(metric, window)
+
+    @pyqtSlot(result="QVariantMap")
+    def tripSummary(self):
+        """Trip computer totals: duration / distance / fuel / idle fuel / average speed and economy."""
+        return self._pipeline.trip_summary()
+
+    @pyqtSlot()
+    def resetTrip(self):
+        self._pipeline.reset_trip()
+
+    @pyqtSlot(str, str, int, result=list)
+    def seriesPoints(self, name, tier="minute", max_points=100):
+        """History of a graph ("speed" / "fuel") on one tier, LTTB-reduced to max_points."""
+        return self._pipeline.series_points(name, tier, max_points)
 
     def update_slow_metrics(self):
         """Fuel, temp, voltage — slower updates."""
         if self.starting:
             return  # no need during intro
 
-        if self.obd_connected and self._obd_client and self._obd_client.is_connected():
+        snapshot = self._pipeline.latest()
+        if snapshot and snapshot.connected:
             try:
-                fast_data = self._obd_client.get_fast_data()
+                fast_data = snapshot.fast
                 battery = round(float(fast_data.get("VOLTAGE", 12.5)), 1)
                 coolant = float(fast_data.get("COOLANT_TEMP", 80))
                 fuel_level = random.randint(20, 90)
                 oil_temp = coolant + random.randint(-5, 5)
                 fuel = random.randint(30, 90)
 
-                self.batteryChanged.emit(battery)
-                self.coolantChanged.emit(coolant)
-                self.oilTempChanged.emit(oil_temp)
-                self.fuelLevelChanged.emit(fuel_level)
-                self.fuelChanged.emit(fuel)
-
-
-
+                self._stage(battery=battery, coolant=coolant, oilTemp=oil_temp, fuelLevel=fuel_level, fuel=fuel)
             except Exception as e:
                 self.log(f"[OBD] Slow update error: {e}")
-                self.obd_connected = False
         else:
-            self.batteryChanged.emit(round(random.uniform(12.0, 14.5), 1))
-            self.coolantChanged.emit(random.randint(70, 110))
-            self.oilTempChanged.emit(random.randint(80, 120))
-            self.fuelLevelChanged.emit(random.randint(0, 100))
-            self.fuelChanged.emit(random.randint(0, 100))
+            self._stage(battery=round(random.uniform(12.0, 14.5), 1), coolant=random.randint(70, 110),
+                        oilTemp=random.randint(80, 120), fuelLevel=random.randint(0, 100),
+                        fuel=random.randint(0, 100))
 
-        self.engineWarningChanged.emit(bool(self.engine_warning))
-        self.generalWarningChanged.emit(bool(self.general_warning))
+        self._stage(engineWarning=bool(self.engine_warning), generalWarning=bool(self.general_warning))
+        trip = self._pipeline.trip_summary()
+        self._stage(tripDistanceKm=round(trip["distance_km"], 2), tripFuelL=round(trip["fuel_l"], 3),
+                    tripIdleFuelL=round(trip["idle_fuel_l"], 3), tripEconomy=round(trip["avg_l_per_100km"] or 0.0, 1))
+        self._emit_frame()
+        self._emit("diagnosticsChanged")
 
     def update_dtc_codes(self):
-        """Fetch DTC codes periodically (if available)."""
-        if not self._obd_client or not self.obd_connected:
-            return
-
+        """Publish DTC codes read by the acquisition worker (if available)."""
         try:
-            dtc_data = self._obd_client.get_dtc_codes()
-            codes = []
-            for category in ("stored", "pending", "permanent"):
-                codes.extend(dtc_data.get(category, []))
-            self.dtcCodesChanged.emit(codes)
+            codes = self._pipeline.dtc_codes()
+            if codes is not None:
+                self._emit("dtcCodesChanged", codes)
         except Exception as e:
             self.log(f"[OBD] DTC fetch error: {e}")
 
     def emit_logger(self):
-        """Emit mini_logger contents periodically."""
-        if hasattr(self, "mini_logger"):
-            self.miniLoggerChanged.emit(self.mini_logger[-50:])  # last 50 lines
+        """Emit the mini_logger lines added since the last emit (nothing when the log is quiet)."""
+        self._pipeline.pump_messages()
+        first_seq, lines = self.mini_logger.since(self._log_cursor)
+        if lines:
+            self._log_cursor = self.mini_logger.last_seq
+            self._emit("miniLoggerChanged", first_seq, lines)
+
+    @pyqtSlot(int, result="QVariantMap")
+    def logSince(self, cursor):
+        """{"first": sequence of lines[0], "lines": [...]} for every retained line after `cursor`."""
+        first_seq, lines = self.mini_logger.since(cursor)
+        return {"first": first_seq, "lines": lines}
 
     # --- logging control ---
     @pyqtSlot()
     def toggleLogging(self):
-        if self._obd_client:
-            if self.isLogging:
-                self._obd_client.stop_logging()
-                self.isLogging = False
-            else:
-                if not self.obd_connected:
-                    self.log("[OBD] Cannot start logging: Not connected to OBD-II adapter. The functions will be called, but no data is stored")
-                self._obd_client.start_logging()
-                self.isLogging = True
-            self.loggingStateChanged.emit(self.isLogging)
+        if self._pipeline.worker:
+            self._pipeline.set_logging(not self._pipeline.is_logging)
+            self._emit("loggingStateChanged", self.isLogging)
+
 
+    @pyqtSlot()
+    def shutdown(self):
+        """Stop the acquisition worker; it closes the OBD connection on exit."""
+        self._pipeline.stop()
+
+    def report_stall(self, seconds, lines):
+        """StallWatchdog callback (GUI thread): log the report and keep the duration in diagnostics."""
+        self._pipeline.instrumentation.record("gui_stall", seconds)
+        self._pipeline.instrumentation.count("gui_stalls")
+        self.log(lines)
+
+    @pyqtSlot()
+    def reconnect(self):
+        """Ask the acquisition worker to drop the link and retry immediately."""
+        self._pipeline.reconnect()
+
+    @pyqtProperty("QVariantMap", notify=diagnosticsChanged)
+    def diagnostics(self):
+        """Slot timings, timer lateness / jitter, signal rates and per-PID query latency."""
+        return self._pipeline.diagnostics()
+
+    @pyqtSlot(str, result=str)
+    def dumpDiagnostics(self, path=""):
+        """Write the diagnostics snapshot as JSON (default logs/diagnostics_<time>.json); returns the path."""
+        try:
+            return self._pipeline.dump_diagnostics(path or None)
+        except OSError as e:
+            self.log(f"[DIAG] Could not write diagnostics: {e}")
+            return ""
+
+    @pyqtSlot(str, result=str)
+    def exportTrace(self, path=""):
+        """Write the span timeline (see OBD_trace) as Chrome / Perfetto JSON; returns the path."""
+        try:
+            return self._pipeline.export_trace(path or None)
+        except OSError as e:
+            self.log(f"[TRACE] Could not write trace: {e}")
+            return ""
+
+    @pyqtProperty(str, notify=connectionStateChanged)
+    def connectionState(self):
+        return self._pipeline.connection_state
 
     @pyqtProperty(bool, notify=loggingStateChanged)
     def isLogging(self):
-        return self._isLogging
-    @isLogging.setter
-    def isLogging(self, val):
-        self._isLogging = val
+        return self._pipeline.is_logging
 
 
     # ----------------------------------------------------------------------
@@ -293,9 +326,9 @@ class CarMetrics(QObject):
                     self.rpm_current_start < self.rpm_range_max or
                     self.fuel_current_start < self.fuel_range_max):
 
-                self.speedChanged.emit(self.speed_current_start)
-                self.rpmChanged.emit(self.rpm_current_start)
-                self.fuelLevelChanged.emit(self.fuel_current_start)
+                self._stage(speed=self.speed_current_start, rpm=self.rpm_current_start,
+                            fuelLevel=self.fuel_current_start)
+                self._emit_frame()
 
                 self.speed_current_start = min(self.speed_current_start + step_speed, self.speed_range_max)
                 self.rpm_current_start = min(self.rpm_current_start + step_rpm, self.rpm_range_max)
@@ -308,9 +341,9 @@ class CarMetrics(QObject):
                     self.rpm_current_start > 0 or
                     self.fuel_current_start > 0):
 
-                self.speedChanged.emit(self.speed_current_start)
-                self.rpmChanged.emit(self.rpm_current_start)
-                self.fuelLevelChanged.emit(self.fuel_current_start)
+                self._stage(speed=self.speed_current_start, rpm=self.rpm_current_start,
+                            fuelLevel=self.fuel_current_start)
+                self._emit_frame()
 
                 self.speed_current_start = max(self.speed_current_start - step_speed, 0)
                 self.rpm_current_start = max(self.rpm_current_start - step_rpm, 0)
@@ -318,10 +351,15 @@ class CarMetrics(QObject):
             else:
                 self.starting = False  # done animating
 
-    @pyqtProperty(float, notify=fuelConsumptionChanged)
+    @pyqtProperty(float, notify=frameChanged)
     def fuelConsumption(self):
         return self._current_fuel_consumption
 
+    @pyqtProperty("QVariantMap", notify=frameChanged)
+    def frame(self):
+        """Full current state, for gauges that are (re)loaded after the values were sent."""
+        return dict(self._frame)
+
     # ----------------------------------------------------------------------
     #                    COLOR / DESIGN SETTINGS
     # ----------------------------------------------------------------------
@@ -0,0 +1,131 @@
+"""
+Per-vehicle capability cache.
+
+The first connection to a car pays for protocol auto-detection (ATSP0 plus
+two 1 s settle delays) and the supported-PID bitmap probes. CapabilityCache
+stores the outcome per VIN: protocol, supported commands, whether multi-PID
+requests work, measured per-PID latency and PIDs that never answered. The
+next connection on the same port starts from that entry through CachedOBD,
+and the VIN read right after connecting confirms it is still the same car.
+Tuned adapter settings (OBD_tuning) are kept in the same file, per adapter.
+"""
+import json
+import os
+import time
+
+import obd
+
+DEFAULT_CAPABILITY_CACHE = os.path.join("cache", "obd_capabilities.json")
+CACHE_VERSION = 1
+
+
+def read_vin(connection):
+    """VIN as a plain string, or None if the car doesn't answer mode 09 02."""
+    try:
+        res = connection.query(obd.commands.VIN, force=True)
+    except Exception:
+        return None
+    if res is None or not res.messages:
+        return None
+    # decoded from the raw payload: python-obd's string decoder also strips
+    # '0', '1' and '2' characters from both ends of the VIN
+    data = res.messages[0].data
+    if len(data) < 3 or data[0] != 0x49 or data[1] != 0x02:
+        return None
+    vin = bytes(b for b in data[2:] if 0x20 < b < 0x7F).decode("ascii")[-17:]
+    return vin or None
+
+
+def commands_by_name(names):
+    return {obd.commands[name] for name in names if obd.commands.has_name(name)}
+
+
+class CachedOBD(obd.OBD):
+    """
+    obd.OBD that can skip PID discovery.
+    With `known_commands` the probe of 0100/0120/... is replaced by the cached
+    set; discover() runs the real probe later if the cache turns out wrong.
+    `read_timeout` replaces the 10 s serial timeout python-obd leaves on the
+    port, before any car-side request is made.
+    """
+
+    def __init__(self, portstr=None, baudrate=None, protocol=None, fast=True, timeout=0.1,
+                 known_commands=None, read_timeout=None, **kwargs):
+        self._known_commands = known_commands
+        self._read_timeout = read_timeout
+        self.discovered = False
+        super().__init__(portstr, baudrate, protocol, fast, timeout, **kwargs)
+
+    def _OBD__connect(self, *args):
+        obd.OBD._OBD__connect(self, *args)
+        port = getattr(self.interface, "_ELM327__port", None)
+        if port is not None and self._read_timeout is not None:
+            port.timeout = self._read_timeout
+
+    def _OBD__load_commands(self):
+        if self._known_commands:
+            self.supported_commands.update(self._known_commands)
+            return
+        self.discover()
+
+    def discover(self):
+        """Probe the supported-PID bitmaps (python-obd's normal startup path)."""
+        self.supported_commands = set(obd.commands.base_commands())
+        obd.OBD._OBD__load_commands(self)
+        self.discovered = True
+
+
+class CapabilityCache:
+    """JSON file of {vin: capabilities}, the last VIN seen on each port and {adapter: settings}."""
+
+    def __init__(self, path=DEFAULT_CAPABILITY_CACHE):
+        self.path = path
+        self._data = {"version": CACHE_VERSION, "vehicles": {}, "ports": {}, "adapters": {}}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._data.update(data)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"[OBD-CACHE] Ignoring unreadable cache {path}: {e}")
+
+    def get(self, vin):
+        return self._data["vehicles"].get(vin)
+
+    def for_port(self, port):
+        """Entry of the car last seen on `port`, or None."""
+        vin = self._data["ports"].get(str(port))
+        return self.get(vin) if vin else None
+
+    def update(self, vin, port=None, **fields):
+        entry = self._data["vehicles"].setdefault(vin, {"vin": vin})
+        entry.update(fields)
+        entry["updated"] = time.time()
+        if port is not None:
+            self._data["ports"][str(port)] = vin
+        self.save()
+        return entry
+
+    def adapter(self, key):
+        return self._data["adapters"].get(key)
+
+    def update_adapter(self, key, **fields):
+        entry = self._data["adapters"].setdefault(key, {})
+        entry.update(fields)
+        entry["updated"] = time.time()
+        self.save()
+        return entry
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[OBD-CACHE] Could not write {self.path}: {e}")
@@ -1,8 +1,238 @@
+import copy
 import obd
 import threading
 import time
-import pandas as pd
+from collections import deque
 import os
+from obd.OBDCommand import OBDCommand
+from obd.decoders import dtc as decode_dtc
+from obd.protocols import ECU
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_recorder import TelemetryRecorder, LOG_COLUMNS
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_instrumentation import Instrumentation
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_capabilities import (
+    CachedOBD, CapabilityCache, DEFAULT_CAPABILITY_CACHE, commands_by_name, read_vin,
+)
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_tuning import AdapterTuner, AdapterSettings
+
+
+# python-obd only ships modes 03 and 07; mode 0A (permanent DTCs) uses the same payload format
+PENDING_DTC = obd.commands.GET_CURRENT_DTC
+PERMANENT_DTC = OBDCommand("PERMANENT_DTC", "Get permanent DTCs", b"0A", 0, decode_dtc, ECU.ALL, False)
+
+# ELM327 over ISO 15765 (CAN) accepts up to six mode 01 PIDs per request
+MAX_PIDS_PER_REQUEST = 6
+CAN_PROTOCOL_IDS = ("6", "7", "8", "9")
+BATCH_REJECT_LIMIT = 3
+
+
+# ----------------------------------------------------------------------
+# FAST-PATH DECODERS
+# ----------------------------------------------------------------------
+# Raw payload bytes (after the 0x41 <pid> prefix) → float, skipping pint.
+# Values come out in the same units python-obd reports (rpm, km/h, g/s, %, °C, V),
+# which is what the dashboard and log schema already use.
+FAST_DECODERS = {
+    0x04: (1, lambda d: d[0] * 100.0 / 255.0),              # ENGINE_LOAD
+    0x05: (1, lambda d: d[0] - 40.0),                       # COOLANT_TEMP
+    0x0C: (2, lambda d: ((d[0] << 8) | d[1]) / 4.0),        # RPM
+    0x0D: (1, lambda d: float(d[0])),                       # SPEED
+    0x10: (2, lambda d: ((d[0] << 8) | d[1]) / 100.0),      # MAF
+    0x11: (1, lambda d: d[0] * 100.0 / 255.0),              # THROTTLE_POS
+    0x42: (2, lambda d: ((d[0] << 8) | d[1]) / 1000.0),     # CONTROL_MODULE_VOLTAGE
+}
+
+
+def decode_fast(pid, payload):
+    """Decode a mode 01 payload with the fast-path table, or None if the PID has no entry."""
+    entry = FAST_DECODERS.get(pid)
+    if entry is None or len(payload) < entry[0]:
+        return None
+    return entry[1](payload)
+
+
+def _magnitude(value):
+    return getattr(value, "magnitude", value)
+
+
+def _display_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("ascii", "ignore").strip("\x00 ")
+    return str(value)
+
+
+# ----------------------------------------------------------------------
+# RATE CLASSES / SCHEDULER
+# ----------------------------------------------------------------------
+class RateClass:
+    """
+    A group of PIDs polled at the same rate.
+    `commands` maps the result key (as used in get_fast_data) to an obd command.
+    Lower `priority` wins when several jobs are due at once.
+    """
+
+    def __init__(self, name, interval, commands, priority=0):
+        self.name = name
+        self.interval = interval
+        self.commands = commands
+        self.priority = priority
+
+
+# key used for the DTC job inside the scheduler
+DTC_JOB = "DTC"
+
+DEFAULT_RATE_CLASSES = (
+    RateClass("fast", 0.05, {"RPM": obd.commands.RPM, "SPEED": obd.commands.SPEED}, priority=0),   # 20 Hz
+    RateClass("medium", 0.2, {
+        "THROTTLE_POS": obd.commands.THROTTLE_POS,
+        "ENGINE_LOAD": obd.commands.ENGINE_LOAD,
+        "MAF": obd.commands.MAF,
+    }, priority=1),                                                                                 # 5 Hz
+    RateClass("slow", 1.0, {
+        "COOLANT_TEMP": obd.commands.COOLANT_TEMP,
+        "VOLTAGE": obd.commands.CONTROL_MODULE_VOLTAGE,
+    }, priority=2),                                                                                 # 1 Hz
+    RateClass("dtc", 5.0, {DTC_JOB: None}, priority=3),                                             # 0.2 Hz
+)
+
+
+def scale_rate_classes(factor, rate_classes=DEFAULT_RATE_CLASSES):
+    """
+    Rate classes polled `factor` times faster (for replay at N× speed).
+    factor=None drops all intervals to zero: poll as fast as the source answers.
+    """
+    return tuple(
+        RateClass(rc.name, 0.0 if factor is None else rc.interval / factor, rc.commands, rc.priority)
+        for rc in rate_classes
+    )
+
+
+def unthrottle_rate_classes(names=("fast",), rate_classes=DEFAULT_RATE_CLASSES):
+    """
+    Rate classes with the named ones polled as fast as the adapter answers
+    (interval 0); the others keep their interval and are batched in when due.
+    """
+    return tuple(
+        RateClass(rc.name, 0.0 if rc.name in names else rc.interval, rc.commands, rc.priority)
+        for rc in rate_classes
+    )
+
+
+class ScheduledJob:
+    __slots__ = ("key", "command", "interval", "priority", "next_due")
+
+    def __init__(self, key, command, interval, priority, next_due):
+        self.key = key
+        self.command = command
+        self.interval = interval
+        self.priority = priority
+        self.next_due = next_due
+
+
+class PIDScheduler:
+    """
+    Deadline-based scheduler over declared rate classes.
+    Every PID is one job with its own deadline. Among due jobs the highest
+    priority runs first; a lower-priority job that has waited longer than its
+    own interval is promoted, so slow PIDs are never starved completely.
+    """
+
+    def __init__(self, rate_classes=DEFAULT_RATE_CLASSES, now=None):
+        now = time.monotonic() if now is None else now
+        self.rate_classes = tuple(rate_classes)
+        self.jobs = []
+        for rc in self.rate_classes:
+            for key, cmd in rc.commands.items():
+                self.jobs.append(ScheduledJob(key, cmd, rc.interval, rc.priority, now))
+
+    def due_jobs(self, now, lookahead=0.0):
+        """
+        Jobs that should run now, most urgent first.
+        `lookahead` (fraction of a job's interval) also admits jobs that are
+        almost due, so they can share a batched request.
+        """
+        ranked = []
+        for job in self.jobs:
+            lateness = now - job.next_due
+            if lateness < -lookahead * job.interval:
+                continue
+            rank = (-1 if lateness > job.interval else job.priority, job.next_due)
+            ranked.append((rank, job))
+        ranked.sort(key=lambda item: item[0])
+        return [job for _, job in ranked]
+
+    def next_job(self, now):
+        """Return the job that should run now, or None if nothing is due."""
+        due = self.due_jobs(now)
+        return due[0] if due else None
+
+    def mark_done(self, job, now):
+        # keep the phase, but never try to "catch up" on missed slots
+        job.next_due = max(job.next_due + job.interval, now)
+
+    def time_until_next(self, now):
+        if not self.jobs:
+            return None
+        return max(0.0, min(job.next_due for job in self.jobs) - now)
+
+
+# ----------------------------------------------------------------------
+# PID HEALTH
+# ----------------------------------------------------------------------
+PID_FAILURE_LIMIT = 3          # consecutive answered-but-empty queries before a PID is quarantined
+PID_QUARANTINE_S = 30.0        # first re-probe delay; doubles on every failed re-probe
+PID_QUARANTINE_MAX_S = 600.0
+
+
+class PIDHealth:
+    """Failure bookkeeping for one command; a quarantined command is not queried until it may be re-probed."""
+
+    __slots__ = ("failures", "total_failures", "quarantine", "quarantined_until")
+
+    def __init__(self):
+        self.failures = 0
+        self.total_failures = 0
+        self.quarantine = 0.0
+        self.quarantined_until = 0.0
+
+    def record(self, ok, now):
+        """Returns True when this result put the command (back) into quarantine."""
+        if ok:
+            self.failures = 0
+            self.quarantine = 0.0
+            self.quarantined_until = 0.0
+            return False
+        self.failures += 1
+        self.total_failures += 1
+        if self.failures < PID_FAILURE_LIMIT:
+            return False
+        self.quarantine = min(self.quarantine * 2 or PID_QUARANTINE_S, PID_QUARANTINE_MAX_S)
+        self.quarantined_until = now + self.quarantine
+        return True
+
+
+# ----------------------------------------------------------------------
+# SNAPSHOT CACHE
+# ----------------------------------------------------------------------
+SNAPSHOT_DEFAULT_COST_S = 0.15     # assumed query time for a command we have no latency for yet
+SNAPSHOT_GAP_MARGIN_S = 0.01       # slack left before the next scheduled poll
+SNAPSHOT_MAX_STALENESS_S = 30.0    # past this, refresh even without a free gap (starvation guard)
+SNAPSHOT_SKIP_MODES = (3, 4, 7, 0x0A)   # DTC reads belong to the DTC job; mode 04 would clear them
+
+
+class SnapshotEntry:
+    """Last known value of one command: `value` is a display string, `updated` a monotonic time."""
+
+    __slots__ = ("value", "updated")
+
+    def __init__(self, value, updated):
+        self.value = value
+        self.updated = updated
+
+
+STATUS_CACHE_S = 0.5
+
 
 class OBDBackendCore:
     """
@@ -11,24 +241,70 @@ class OBDBackendCore:
     Includes middleware logging when enabled.
     """
 
-    def __init__(self, port="COM5", baudrate=38400, fast=False, timeout=1.0, log_file_path=None):
+    def __init__(self, port="COM5", baudrate=38400, fast=False, timeout=1.0, log_file_path=None,
+                 rate_classes=DEFAULT_RATE_CLASSES, batch_queries=True, fast_decoders=True, log_format="csv",
+                 connection_factory=None, capability_cache=DEFAULT_CAPABILITY_CACHE, auto_tune=True):
         self.port = port
         self.baudrate = baudrate
         self.fast = fast
         self.timeout = timeout
         self.lock = threading.Lock()
+        self.connection = None
+        self.obd_elm327_connection = False
+        self.connection_factory = connection_factory   # e.g. a replay source instead of obd.OBD
+
+        # --- Per-vehicle capability cache (real adapters only) ---
+        self.capabilities = CapabilityCache(capability_cache) if capability_cache and connection_factory is None else None
+        self.vin = None
+        self._capability_entry = None
+        self._pid_latency = {}                  # command name → smoothed query latency (s)
+        self.instrumentation = Instrumentation()  # command name → query latency histogram
+
+        # --- Adapter tuning (persisted per adapter in the capability cache) ---
+        self.auto_tune = auto_tune
+        self.adapter_settings = None
+        self.frame_hints = False                # append the expected frame count to raw requests
+        self._frame_counts = {}                 # request bytes → frames seen in the last good reply
+
+        # --- Cached link health (connection.status() is only re-read every STATUS_CACHE_S) ---
+        self._status_ok = False
+        self._status_checked = 0.0
+        self.consecutive_empty_polls = 0
+        self.consecutive_silent_polls = 0       # polls where the adapter did not answer at all
+        self._adapter_silent = False            # last raw request got no reply at all (not even NO DATA)
+
+        # --- Scheduled polling state ---
+        self.scheduler = PIDScheduler(rate_classes)
+        self._latest_values = {}
+        self._latest_dtc = {}
+        self._latest_fast = {}
+
+        # --- Full-snapshot cache, refreshed one command at a time between polls ---
+        self._snapshot_cache = {}               # command name → SnapshotEntry
+        self._snapshot_attempts = {}            # command name → monotonic time of the last refresh attempt
+        self._live_updated = {}                 # scheduler key → monotonic time of the last value
+        self.snapshot_refresh = True
+
+        # --- Per-PID health: supported-PID filter + quarantine of dead PIDs ---
+        self._supported_pids = None             # {(mode, pid)} from the vehicle's bitmap, None if unknown
+        self._pid_health = {}                   # command name → PIDHealth
+
+        # --- Multi-PID batching + throughput accounting ---
+        self.batch_queries = batch_queries
+        self.fast_decoders = fast_decoders
+        self._batch_failures = 0
+        self._round_trips = deque(maxlen=256)   # (monotonic time, samples decoded)
 
         # --- Logging setup ---
         self.logging_enabled = False
-        self._log_buffer = []
-        self._log_df = pd.DataFrame()
-        self._log_filename = log_file_path if log_file_path is not None else None #TODO: FIX THIS
-        self._log_columns = [
-            "timestamp", "SPEED", "RPM", "THROTTLE_POS", "ENGINE_LOAD",
-            "COOLANT_TEMP", "VOLTAGE", "MAF",
-            "STEERING_ANGLE", "GEAR", "BRAKE_PRESSURE", "ACCELERATOR_PEDAL",
-            "WHEEL_FL", "WHEEL_FR", "WHEEL_RL", "WHEEL_RR"
-        ]
+        self._log_path = log_file_path          # explicit target; otherwise logs/obd_log_<time>.csv
+        self._log_filename = log_file_path
+        self._log_columns = LOG_COLUMNS
+        self._log_format = log_format           # "csv" or "trip"
+        self._recorder = None
+        # start/stop run on the caller's thread, appends on the acquisition thread:
+        # swapping the recorder and appending to it both happen under this lock
+        self._log_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # CONNECTION
@@ -36,13 +312,28 @@ class OBDBackendCore:
     def _connect(self):
         mssg = [f"[OBD] Connecting to {self.port} ..."]
         try:
-            self.connection = obd.OBD(
-                portstr=self.port,
-                baudrate=self.baudrate,
-                fast=self.fast,
-                timeout=self.timeout
-            )
+            self.vin = None
+            self._capability_entry = None
+            self.adapter_settings = None
+            self.frame_hints = False
+            self._frame_counts = {}
+            if self.connection_factory is not None:
+                self.connection = self.connection_factory()
+            else:
+                self.connection = self._open_adapter(mssg)
+            self._tune_adapter(self.connection, mssg)
             mssg.append(f"[OBD] Status: {self.connection.status()}")
+            self._batch_failures = 0
+            self.consecutive_empty_polls = 0
+            self.consecutive_silent_polls = 0
+            self._pid_health = {}
+            self._pid_latency = {}
+            self._snapshot_cache = {}
+            self._snapshot_attempts = {}
+            if self.vin:
+                self._snapshot_cache["VIN"] = SnapshotEntry(self.vin, time.monotonic())
+            self._supported_pids = self._read_supported_pids()
+            self._apply_cached_capabilities()
             self.obd_elm327_connection = (
                 self.connection.status() != obd.OBDStatus.NOT_CONNECTED
             )
@@ -50,69 +341,185 @@ class OBDBackendCore:
             mssg.append(f"[OBD] Failed to connect: {e}")
             self.connection = None
             self.obd_elm327_connection = False
+        self._status_checked = 0.0
         return mssg
 
-    def is_connected(self):
-        return self.connection and self.connection.status() == obd.OBDStatus.CAR_CONNECTED
+    def is_connected(self, max_age=STATUS_CACHE_S):
+        """Car link up? Uses a cached status no older than `max_age` seconds."""
+        now = time.monotonic()
+        if now - self._status_checked >= max_age:
+            try:
+                self._status_ok = bool(self.connection) and self.connection.status() == obd.OBDStatus.CAR_CONNECTED
+            except Exception:
+                self._status_ok = False
+            self._status_checked = now
+        return self._status_ok
 
     def reconnect(self):
-        self._connect()
+        """Blocking reconnect. The acquisition worker uses ConnectionSupervisor instead."""
+        self.disconnect()
+        return self._connect()
+
+    def disconnect(self):
+        """Drop the adapter connection but keep logging state."""
+        if self.connection is not None:
+            self._save_capabilities()
+        connection, self.connection = self.connection, None
+        self.obd_elm327_connection = False
+        self._status_ok = False
+        if connection:
+            try:
+                connection.close()
+            except Exception as e:
+                print(f"[OBD] Close failed: {e}")
 
     def close(self):
-        if self.connection:
-            self.connection.close()
+        self.stop_logging()
+        self.disconnect()
+
+    # ------------------------------------------------------------------
+    # CAPABILITY CACHE
+    # ------------------------------------------------------------------
+    def _open_adapter(self, mssg):
+        """
+        Open the ELM327. If the car last seen on this port is in the capability
+        cache, its protocol and PID list are used instead of auto-detection and
+        discovery; the VIN read afterwards confirms it is still the same car.
+        """
+        options = dict(portstr=self.port, baudrate=self.baudrate, fast=self.fast, timeout=self.timeout,
+                       # python-obd leaves the port at a 10 s read timeout; a silent adapter would stall every query
+                       read_timeout=self.timeout)
+        hint = self.capabilities.for_port(self.port) if self.capabilities else None
+        connection = None
+        if hint:
+            connection = CachedOBD(protocol=hint.get("protocol") or None,
+                                   known_commands=commands_by_name(hint.get("supported", ())), **options)
+            if connection.status() != obd.OBDStatus.CAR_CONNECTED:
+                connection.close()      # different car or protocol: start over with auto-detection
+                connection, hint = None, None
+        if connection is None:
+            connection = CachedOBD(**options)
+        if not self.capabilities or connection.status() != obd.OBDStatus.CAR_CONNECTED:
+            return connection
+
+        self.vin = read_vin(connection)
+        cached = self.capabilities.get(self.vin) if self.vin else None
+        if hint and cached is not hint:
+            # the PID list we started from belongs to another car
+            if cached:
+                connection.supported_commands = set(obd.commands.base_commands())
+                connection.supported_commands.update(commands_by_name(cached.get("supported", ())))
+            else:
+                connection.discover()
+        if cached and not connection.discovered:
+            mssg.append(f"[OBD] Known vehicle {self.vin}: skipped PID discovery.")
+        elif self.vin:
+            mssg.append(f"[OBD] Vehicle {self.vin}: {len(connection.supported_commands)} commands supported.")
+            cached = self.capabilities.update(
+                self.vin, port=self.port, protocol=connection.protocol_id(),
+                supported=sorted(cmd.name for cmd in connection.supported_commands),
+            )
+        self._capability_entry = cached
+        return connection
+
+    def _tune_adapter(self, connection, mssg):
+        """
+        Re-apply this adapter's stored tuning, or run the tuning pass and store it.
+        Without a capability cache nothing is stored, so every connect tunes again.
+        """
+        if not self.auto_tune or self.fast or getattr(connection, "interface", None) is None:
+            return                              # e.g. a replay source: no adapter to tune
+        if connection.status() != obd.OBDStatus.CAR_CONNECTED:
+            return
+        # the tuner talks to the same port as the locked query paths (DTC reads, snapshots)
+        with self.lock:
+            tuner = AdapterTuner(connection)
+            key = f"{self.port}|{tuner.identify()}"
+            stored = self.capabilities.adapter(key) if self.capabilities else None
+            settings = AdapterSettings.from_dict(stored) if stored else None
+            if settings and tuner.apply(settings):
+                mssg.append(f"[OBD-TUNE] Applied stored settings: {settings.describe()}")
+            else:
+                settings = tuner.tune()
+                mssg.extend(tuner.log)
+                if settings and self.capabilities:
+                    self.capabilities.update_adapter(key, **settings.as_dict())
+        if settings:
+            self.adapter_settings = settings
+            self.frame_hints = settings.frame_hint
+
+    def _apply_cached_capabilities(self):
+        entry = self._capability_entry
+        if not entry:
+            return
+        if entry.get("batching") is False:
+            self._batch_failures = BATCH_REJECT_LIMIT
+        now = time.monotonic()
+        for cmd in commands_by_name(entry.get("dead", ())):
+            # start quarantined; re-probed after PID_QUARANTINE_S like any other dead PID
+            health = self._pid_health[cmd.name] = PIDHealth()
+            health.failures = PID_FAILURE_LIMIT
+            health.quarantine = PID_QUARANTINE_S
+            health.quarantined_until = now + PID_QUARANTINE_S
+
+    def _save_capabilities(self):
+        if not self.capabilities or not self.vin:
+            return
+        now = time.monotonic()
+        self.capabilities.update(
+            self.vin, port=self.port,
+            batching=self._batch_failures < BATCH_REJECT_LIMIT,
+            dead=sorted(name for name, h in self._pid_health.items() if h.quarantined_until > now),
+            latency_ms={name: round(t * 1000, 1) for name, t in sorted(self._pid_latency.items())},
+        )
+
+    def _note_latency(self, key, seconds):
+        prev = self._pid_latency.get(key)
+        self._pid_latency[key] = seconds if prev is None else prev + 0.2 * (seconds - prev)
+        self.instrumentation.record(key, seconds)
 
     # ------------------------------------------------------------------
     # LOGGING CONTROL
     # ------------------------------------------------------------------
     def start_logging(self):
         """Enable logging and create CSV file."""
-        os.makedirs("logs", exist_ok=True)
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        self._log_filename = f"obd_log_{timestamp}.csv"
-        self.logging_enabled = True
-        self._log_buffer = []
-        self._log_df = pd.DataFrame(columns=self._log_columns)
+        if self.logging_enabled:
+            return
+        if self._log_path:
+            self._log_filename = self._log_path
+        else:
+            os.makedirs("logs", exist_ok=True)
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            extension = "trip" if self._log_format == "trip" else "csv"
+            self._log_filename = os.path.join("logs", f"obd_log_{timestamp}.{extension}")
+        recorder = TelemetryRecorder(self._log_filename, columns=self._log_columns, log_format=self._log_format)
+        with self._log_lock:
+            self._recorder = recorder
+            self.logging_enabled = True
         print(f"[OBD-LOG] Started logging → {self._log_filename}")
 
     def stop_logging(self):
         """Flush current logs and disable."""
         if not self.logging_enabled:
             return
-        self._flush_to_csv()
-        self._log_buffer = []
-        self.logging_enabled = False
+        with self._log_lock:
+            self.logging_enabled = False
+            recorder, self._recorder = self._recorder, None
+        if recorder:
+            recorder.close()        # no append can reach it any more: the final flush gets every row
         print("[OBD-LOG] Stopped logging.")
 
     def _append_log_entry(self, data_dict: dict):
-        """Internal — append a single dict entry to the log buffer."""
-        if not self.logging_enabled:
-            return
-        data_dict["timestamp"] = time.time()
-        self._log_buffer.append(data_dict)
-
-        # flush to dataframe every 100
-        if len(self._log_buffer) >= 100:
-            df = pd.DataFrame(self._log_buffer)
-            self._log_buffer.clear()
-            self._log_df = pd.concat([self._log_df, df], ignore_index=True)
-
-        # flush to CSV every 500
-        if len(self._log_df) >= 500:
-            self._flush_to_csv()
-
-    def _flush_to_csv(self):
-        """Internal — append current DataFrame to CSV and clear."""
-        if not self._log_filename:
-            return
-        self._log_df.to_csv(
-            self._log_filename,
-            mode="a",
-            index=False,
-            header=not os.path.exists(self._log_filename)
-        )
-        self._log_df = pd.DataFrame(columns=self._log_columns)
-        print(f"[OBD-LOG] Data flushed → {self._log_filename}")
+        """Internal — record one sample row (fixed schema, O(1), no I/O)."""
+        with self._log_lock:
+            if self.logging_enabled and self._recorder is not None:
+                self._recorder.append(data_dict)
+
+    def _append_log_event(self, kind, payload):
+        """Internal — record a non-sample entry (DTCs, snapshots, flags) in the events sidecar."""
+        with self._log_lock:
+            if self.logging_enabled and self._recorder is not None:
+                self._recorder.record_event(kind, payload)
 
     # ------------------------------------------------------------------
     # STATUS DETECTION
@@ -121,16 +528,18 @@ class OBDBackendCore:
         if not self.is_connected():
             return {"connected": False, "ignition_on": False, "engine_running": False, "voltage": None, "rpm": None}
 
-        with self.lock:
-            voltage = self._safe_query(obd.commands.CONTROL_MODULE_VOLTAGE)
-            rpm = self._safe_query(obd.commands.RPM)
-            maf = self._safe_query(obd.commands.MAF)
-            speed = self._safe_query(obd.commands.SPEED)
+        values = self.query_batch([
+            obd.commands.CONTROL_MODULE_VOLTAGE, obd.commands.RPM, obd.commands.MAF, obd.commands.SPEED
+        ])
+        voltage = values.get(obd.commands.CONTROL_MODULE_VOLTAGE)
+        rpm = values.get(obd.commands.RPM)
+        maf = values.get(obd.commands.MAF)
+        speed = values.get(obd.commands.SPEED)
 
-        voltage_v = voltage.magnitude if voltage else None
-        rpm_v = rpm.magnitude if rpm else 0
-        maf_v = maf.magnitude if maf else 0
-        speed_v = speed.magnitude if speed else 0
+        voltage_v = voltage
+        rpm_v = rpm if rpm is not None else 0
+        maf_v = maf if maf is not None else 0
+        speed_v = speed if speed is not None else 0
 
         ignition_on = voltage_v is not None and voltage_v > 9.0
         engine_running = (rpm_v and rpm_v > 200) or (maf_v and maf_v > 0.5) or (speed_v and speed_v > 0.5)
@@ -143,7 +552,7 @@ class OBDBackendCore:
             "rpm": rpm_v
         }
 
-        self._append_log_entry(data)
+        self._append_log_event("STATUS", data)
         return data
 
     # ------------------------------------------------------------------
@@ -182,13 +591,13 @@ class OBDBackendCore:
             "VOLTAGE": obd.commands.CONTROL_MODULE_VOLTAGE,
         }
 
-        results = {}
-        with self.lock:
-            for name, cmd in cmds.items():
-                val = self._safe_query(cmd)
-                if val is not None:
-                    results[name] = val.magnitude
+        values = self.query_batch(list(cmds.values()))
+        results = {name: values[cmd] for name, cmd in cmds.items() if cmd in values}
 
+        return self._finish_fast_data(results)
+
+    def _finish_fast_data(self, results):
+        """Add derived and CAN placeholder fields to raw PID values, then log the row."""
         # Calculate instantaneous fuel consumption if possible
         maf = results.get("MAF", 0.0)
         speed = results.get("SPEED", 0.0)
@@ -209,23 +618,161 @@ class OBDBackendCore:
         self._append_log_entry(results)
         return results
 
-    def get_full_snapshot(self):
+    # ------------------------------------------------------------------
+    # SCHEDULED POLLING
+    # ------------------------------------------------------------------
+    def poll_scheduled(self):
+        """
+        Run the jobs that are due right now, each at most once per call.
+        Returns the set of keys that were refreshed (empty if nothing was due).
+        """
         if not self.is_connected():
-            return {}
+            return set()
 
-        snapshot = {}
-        with self.lock:
-            for cmd in self.connection.supported_commands:
+        refreshed = set()
+        due = self.scheduler.due_jobs(time.monotonic())
+        pid_jobs = [job for job in due if job.key != DTC_JOB]
+
+        now = time.monotonic()
+        usable = []
+        dropped = False
+        for job in pid_jobs:
+            if self.pid_usable(job.command, now):
+                usable.append(job)
+            else:
+                self.scheduler.mark_done(job, now)     # unsupported / quarantined: skip this slot
+                dropped = self._drop_live_value(job.key) or dropped
+        pid_jobs = usable
+
+        if pid_jobs:
+            if self._batching_available():
+                # fill the remaining request slots with PIDs that are almost due anyway
+                spare = -len(pid_jobs) % MAX_PIDS_PER_REQUEST
+                for job in self.scheduler.due_jobs(time.monotonic(), lookahead=0.5):
+                    if spare <= 0:
+                        break
+                    if job.key != DTC_JOB and job not in pid_jobs and self.pid_usable(job.command, now):
+                        pid_jobs.append(job)
+                        spare -= 1
+            try:
+                values = self.query_batch([job.command for job in pid_jobs])
+                for job in pid_jobs:
+                    val = values.get(job.command)
+                    if val is not None:
+                        self._latest_values[job.key] = val
+                        self._live_updated[job.key] = now
+                    elif not self.pid_usable(job.command):
+                        dropped = self._drop_live_value(job.key) or dropped    # quarantined by this poll
+                # the supervisor watches this to spot a dead link behind a "connected" status
+                self.consecutive_empty_polls = 0 if values else self.consecutive_empty_polls + 1
+                self.consecutive_silent_polls = self.consecutive_silent_polls + 1 if self._adapter_silent else 0
+            finally:
+                now = time.monotonic()
+                for job in pid_jobs:
+                    self.scheduler.mark_done(job, now)
+                    refreshed.add(job.key)
+
+        for job in due:
+            if job.key == DTC_JOB:
                 try:
-                    r = self.connection.query(cmd, force=True)
-                    if not r.is_null() and r.value is not None:
-                        snapshot[cmd.name] = str(r.value)
-                except Exception as e:
-                    snapshot[cmd.name] = f"ERR: {e}"
+                    if not self.consecutive_empty_polls:   # skip the slow DTC reads on a dead link
+                        self._latest_dtc = self.get_dtc_codes()
+                finally:
+                    self.scheduler.mark_done(job, time.monotonic())
+                refreshed.add(job.key)
+
+        if refreshed - {DTC_JOB} or dropped:
+            self._latest_fast = self._finish_fast_data(dict(self._latest_values))
+        return refreshed
 
-        self._append_log_entry(snapshot)
+    def _drop_live_value(self, key):
+        """Forget a job's last value once its PID is quarantined or unsupported, so it isn't shown as live."""
+        self._live_updated.pop(key, None)
+        return self._latest_values.pop(key, None) is not None
+
+    def latest_fast_data(self):
+        """Newest scheduled values in the same shape as get_fast_data(), without querying."""
+        return self._latest_fast
+
+    def latest_dtc_codes(self):
+        return self._latest_dtc
+
+    def time_until_next_poll(self):
+        return self.scheduler.time_until_next(time.monotonic())
+
+    # ------------------------------------------------------------------
+    # FULL SNAPSHOT (cache-backed)
+    # ------------------------------------------------------------------
+    def get_full_snapshot(self, max_age=None):
+        """
+        Every supported command's last known value as {name: str}, without
+        touching the bus. Entries older than `max_age` seconds are left out.
+        """
+        snapshot = {name: entry["value"] for name, entry in self.snapshot_entries(max_age).items()}
+        self._append_log_event("SNAPSHOT", snapshot)
         return snapshot
 
+    def snapshot_entries(self, max_age=None):
+        """{name: {"value", "age", "timestamp"}}: the snapshot with staleness metadata."""
+        now = time.monotonic()
+        wall = time.time()
+        entries = {}
+        for name, entry in list(self._snapshot_cache.items()):
+            entries[name] = (entry.value, now - entry.updated)
+        # live-scheduled PIDs are always fresher than anything the refresher could read
+        for job in self.scheduler.jobs:
+            updated = self._live_updated.get(job.key)
+            if job.command is not None and updated is not None:
+                entries[job.command.name] = (str(self._latest_values[job.key]), now - updated)
+        return {
+            name: {"value": value, "age": round(age, 3), "timestamp": wall - age}
+            for name, (value, age) in entries.items()
+            if max_age is None or age <= max_age
+        }
+
+    def refresh_snapshot_step(self):
+        """
+        Refresh the stalest snapshot command if its query fits before the next
+        scheduled poll (or it has been starved for SNAPSHOT_MAX_STALENESS_S).
+        Called by the acquisition worker between polls; returns the command name or None.
+        """
+        if not self.snapshot_refresh or not self.is_connected():
+            return None
+        now = time.monotonic()
+        stalest, stalest_at = None, None
+        for cmd in self._snapshot_commands(now):
+            attempted = self._snapshot_attempts.get(cmd.name, float("-inf"))
+            if stalest is None or attempted < stalest_at:
+                stalest, stalest_at = cmd, attempted
+        if stalest is None:
+            return None
+
+        gap = self.time_until_next_poll()
+        cost = self._pid_latency.get(stalest.name, SNAPSHOT_DEFAULT_COST_S)
+        if gap is not None and gap < cost + SNAPSHOT_GAP_MARGIN_S and now - stalest_at < SNAPSHOT_MAX_STALENESS_S:
+            return None
+
+        with self.lock:
+            value = self._safe_query(stalest)
+        self._snapshot_attempts[stalest.name] = time.monotonic()
+        if value is not None:
+            self._snapshot_cache[stalest.name] = SnapshotEntry(_display_value(value), time.monotonic())
+        self._note_pid_result(stalest, value is not None)
+        return stalest.name
+
+    def _snapshot_commands(self, now):
+        connection = self.connection
+        if connection is None:
+            return []
+        live = {job.command.name for job in self.scheduler.jobs if job.command is not None}
+        return [
+            cmd for cmd in list(connection.supported_commands)
+            if cmd.mode is not None and cmd.mode not in SNAPSHOT_SKIP_MODES
+            and not (cmd.pid is not None and cmd.pid % 0x20 == 0)      # PID-listing bitmaps
+            and cmd is not obd.commands.VIN                             # read once at connect
+            and cmd.name not in live and self.pid_usable(cmd, now)
+        ]
+
     # ------------------------------------------------------------------
     # DTC MANAGEMENT
     # ------------------------------------------------------------------
@@ -238,10 +785,10 @@ class OBDBackendCore:
                 return []
             return [f"{c} - {d}" for c, d in res.value]
 
-        with self.lock:
+        with self.lock, TRACER.span("DTC", "obd"):
             stored = self.connection.query(obd.commands.GET_DTC)
-            pending = self.connection.query(obd.commands.PENDING_DTC)
-            permanent = self.connection.query(obd.commands.PERMANENT_DTC)
+            pending = self.connection.query(PENDING_DTC, force=True)
+            permanent = self.connection.query(PERMANENT_DTC, force=True)
 
         result = {
             "stored": parse(stored),
@@ -249,7 +796,7 @@ class OBDBackendCore:
             "permanent": parse(permanent)
         }
 
-        self._append_log_entry({"DTC": result})
+        self._append_log_event("DTC", result)
         return result
 
     def clear_dtc_codes(self):
@@ -257,17 +804,253 @@ class OBDBackendCore:
             return False
         with self.lock:
             res = self.connection.query(obd.commands.CLEAR_DTC)
-        self._append_log_entry({"CLEAR_DTC": True})
+        self._append_log_event("CLEAR_DTC", True)
         return not res.is_null()
 
+    # ------------------------------------------------------------------
+    # BATCHED QUERIES
+    # ------------------------------------------------------------------
+    def query_batch(self, commands):
+        """
+        Query several PIDs with as few round trips as possible.
+        Mode 01 PIDs are packed up to six per request on CAN adapters; anything
+        else (or everything, once the ECU has rejected batching) is queried singly.
+        Returns {command: magnitude} for the commands that produced data.
+        """
+        results = {}
+        answered = []       # commands the adapter actually replied to (data or NO DATA)
+        now = time.monotonic()
+        with self.lock:
+            self._adapter_silent = False
+            singles = []
+            batchable = []
+            for cmd in commands:
+                if self.pid_usable(cmd, now):
+                    (batchable if cmd.mode == 1 and cmd.bytes > 2 else singles).append(cmd)
+
+            if self._batching_available() and len(batchable) > 1:
+                for i in range(0, len(batchable), MAX_PIDS_PER_REQUEST):
+                    chunk = batchable[i:i + MAX_PIDS_PER_REQUEST]
+                    decoded = self._query_multi_pid(chunk)
+                    if self._adapter_silent:
+                        singles = []        # adapter stopped answering; don't wait out every PID
+                        break
+                    if decoded is None:
+                        singles.extend(batchable[i:])
+                        break
+                    results.update(decoded)
+                    answered.extend(chunk)
+            else:
+                singles.extend(batchable)
+
+            for cmd in singles:
+                val = self._query_magnitude(cmd)
+                if self._adapter_silent:
+                    break
+                answered.append(cmd)
+                if val is not None:
+                    results[cmd] = val
+
+            # a silent adapter is a link problem, not a PID problem: only answered queries count
+            for cmd in answered:
+                self._note_pid_result(cmd, cmd in results)
+        return results
+
+    # ------------------------------------------------------------------
+    # PID HEALTH
+    # ------------------------------------------------------------------
+    def _read_supported_pids(self):
+        """Mode 01 PIDs from the vehicle's support bitmap, or None if the probe gave nothing usable."""
+        try:
+            supported = self.connection.supported_commands
+        except Exception:
+            return None
+        pids = {(cmd.mode, cmd.pid) for cmd in supported if cmd.mode == 1}
+        # python-obd always lists the PID-listing commands (0x00, 0x20, ...); nothing else means no bitmap
+        return pids if any(pid % 0x20 for _, pid in pids) else None
+
+    def pid_usable(self, cmd, now=None):
+        """False for mode 01 PIDs the vehicle doesn't report, and for quarantined commands."""
+        if cmd.mode == 1 and self._supported_pids is not None and (cmd.mode, cmd.pid) not in self._supported_pids:
+            return False
+        health = self._pid_health.get(cmd.name)
+        if health is None:
+            return True
+        return (time.monotonic() if now is None else now) >= health.quarantined_until
+
+    def _note_pid_result(self, cmd, ok):
+        health = self._pid_health.get(cmd.name)
+        if health is None:
+            if ok:
+                return
+            health = self._pid_health[cmd.name] = PIDHealth()
+        if health.record(ok, time.monotonic()):
+            print(f"[OBD] {cmd.name} quarantined for {health.quarantine:.0f}s after {health.failures} failed queries.")
+
+    def get_pid_health(self):
+        """Per-command failure counters and remaining quarantine, for diagnostics."""
+        now = time.monotonic()
+        return {
+            name: {
+                "failures": h.failures,
+                "total_failures": h.total_failures,
+                "quarantined_for": round(max(0.0, h.quarantined_until - now), 1),
+            }
+            for name, h in self._pid_health.items()
+        }
+
+    def _raw_interface(self):
+        # Raw requests go straight to the ELM327 interface. With fast=True python-obd may
+        # re-send "the last command" as a bare CR, which would repeat our request instead.
+        if self.fast or self.connection is None:
+            return None
+        return getattr(self.connection, "interface", None)
+
+    def _batching_available(self):
+        if not self.batch_queries or self._batch_failures >= BATCH_REJECT_LIMIT:
+            return False
+        if self._raw_interface() is None:
+            return False
+        try:
+            return self.connection.protocol_id() in CAN_PROTOCOL_IDS
+        except Exception:
+            return False
+
+    def _query_magnitude(self, cmd):
+        """Single query returning a plain number; hot PIDs skip python-obd's pint decoding."""
+        interface = self._raw_interface()
+        if self.fast_decoders and interface is not None and cmd.mode == 1 and cmd.pid in FAST_DECODERS:
+            try:
+                t = time.perf_counter()
+                messages = interface.send_and_parse(self._with_frame_hint(cmd.command)) or []
+                if TRACER.enabled:
+                    TRACER.complete(cmd.name, "obd", t, time.perf_counter(), {"answered": bool(messages)})
+                self._adapter_silent = not messages
+                for message in messages:
+                    data = message.data
+                    if (cmd.ecu & message.ecu) and len(data) > 2 and data[0] == 0x41 and data[1] == cmd.pid:
+                        val = decode_fast(cmd.pid, data[2:])
+                        if val is not None:
+                            self._learn_frames(cmd.command, messages)
+                            self._note_latency(cmd.name, time.perf_counter() - t)
+                            self._note_round_trip(1)
+                            return val
+            except Exception:
+                pass
+            self._note_round_trip(0)
+            return None
+        return _magnitude(self._safe_query(cmd))
+
+    def _query_multi_pid(self, chunk):
+        """
+        Send one mode 01 request for every PID in `chunk` and decode the combined
+        response. Returns {command: value}, or None if the ECU rejected the request.
+        """
+        by_pid = {cmd.pid: cmd for cmd in chunk}
+        request = b"01" + b"".join(b"%02X" % cmd.pid for cmd in chunk)
+        t = time.perf_counter()
+        try:
+            messages = self.connection.interface.send_and_parse(self._with_frame_hint(request)) or []
+        except Exception:
+            messages = []
+        elapsed = time.perf_counter() - t
+        if TRACER.enabled:
+            TRACER.complete("MULTI_PID", "obd", t, t + elapsed, {"pids": [cmd.name for cmd in chunk]})
+        if not messages:
+            # silence is a dead link, not a rejected batch
+            self._adapter_silent = True
+            self._note_round_trip(0)
+            return {}
+
+        decoded = {}
+        for message in messages:
+            data = message.data
+            if len(data) < 2 or data[0] != 0x41 or not (message.ecu & ECU.ENGINE):
+                continue
+            i = 1
+            while i < len(data):
+                pid = data[i]
+                cmd = by_pid.get(pid)
+                if cmd is None:
+                    break  # unknown PID → payload length unknown, stop parsing this message
+                n = cmd.bytes - 2
+                payload = data[i + 1:i + 1 + n]
+                val = decode_fast(pid, payload) if self.fast_decoders else None
+                if val is None:
+                    part = copy.copy(message)
+                    part.data = bytearray([0x41, pid]) + payload
+                    try:
+                        res = cmd([part])
+                        if not res.is_null() and res.value is not None:
+                            val = _magnitude(res.value)
+                    except Exception:
+                        pass
+                if val is not None:
+                    decoded[cmd] = val
+                i += 1 + n
+
+        if not decoded:
+            self._note_round_trip(0)
+            self._batch_failures += 1
+            if self._batch_failures == BATCH_REJECT_LIMIT:
+                print("[OBD] ECU rejected multi-PID requests; falling back to single queries.")
+            return None
+
+        self._batch_failures = 0
+        self._learn_frames(request, messages)
+        self._note_latency("MULTI_PID", elapsed)
+        self._note_round_trip(len(decoded))
+        return decoded
+
+    def _with_frame_hint(self, request):
+        # "010C1": the ELM327 returns after that many frames instead of waiting out its timeout
+        frames = self._frame_counts.get(request) if self.frame_hints else None
+        return request + b"%X" % frames if frames and frames < 16 else request
+
+    def _learn_frames(self, request, messages):
+        self._frame_counts[request] = sum(len(m.frames) for m in messages)
+
+    def _note_round_trip(self, samples):
+        self._round_trips.append((time.monotonic(), samples))
+
+    def get_throughput_stats(self):
+        """Effective sample and round-trip rates over the recent query window."""
+        if len(self._round_trips) < 2:
+            return {"samples_per_sec": 0.0, "round_trips_per_sec": 0.0, "samples_per_round_trip": 0.0,
+                    "batching": self._batching_available()}
+        first_t = self._round_trips[0][0]
+        last_t = self._round_trips[-1][0]
+        span = max(last_t - first_t, 1e-6)
+        trips = len(self._round_trips) - 1          # intervals between the first and last round trip
+        samples = sum(s for _, s in list(self._round_trips)[1:])
+        return {
+            "samples_per_sec": round(samples / span, 2),
+            "round_trips_per_sec": round(trips / span, 2),
+            "samples_per_round_trip": round(samples / trips, 2),
+            "batching": self._batching_available(),
+        }
+
+    def get_diagnostics(self):
+        """Per-command query latency histograms (successful queries) and throughput, for diagnostics."""
+        return {
+            "query_latency": self.instrumentation.snapshot()["histograms"],
+            "throughput": self.get_throughput_stats(),
+        }
+
     # ------------------------------------------------------------------
     # INTERNAL HELPERS
     # ------------------------------------------------------------------
     def _safe_query(self, cmd):
         try:
+            t = time.perf_counter()
             res = self.connection.query(cmd, force=True)
+            if TRACER.enabled:
+                TRACER.complete(cmd.name, "obd", t, time.perf_counter())
             if res and not res.is_null() and res.value is not None:
+                self._note_latency(cmd.name, time.perf_counter() - t)
+                self._note_round_trip(1)
                 return res.value
         except Exception:
             pass
+        self._note_round_trip(0)
         return None
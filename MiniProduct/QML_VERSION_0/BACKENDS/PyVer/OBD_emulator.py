@@ -0,0 +1,362 @@
+"""
+ELM327 emulator on a pseudo-terminal (Linux / macOS).
+
+Speaks enough of the ELM327 command set for python-obd to connect through its
+real serial stack: AT setup commands, mode 01 (single and multi-PID), 03, 04,
+07, 09 (VIN) and 0A, framed as ISO 15765-4 CAN 11-bit / 500k with headers on.
+Per-request latency, jitter and fault injection (NO DATA, silent timeouts,
+bus errors) make it usable for throughput and reconnect benchmarks in CI.
+
+With elm_timing=True the emulator also models what makes real adapters
+slow: serial transfer time at the current baud rate (ATBRD switches it),
+and the wait for further responses after the last frame, governed by ATST
+and adaptive timing (ATAT0/1/2) unless the request carries a response
+count digit. Too short a timeout loses slow responses as NO DATA.
+
+    emu = ELM327Emulator(latency=0.03, jitter=0.01)
+    port = emu.start()
+    client = OBDBackendCore(port=port)
+"""
+import argparse
+import math
+import os
+import random
+import select
+import threading
+import time
+import tty
+
+ELM_ID = "ELM327 v1.5"
+ECU_HEADER = "7E8"
+DEFAULT_BAUD = 38400
+DEFAULT_ST = 0x32                 # ATST unit is 4 ms → 200 ms
+BRD_CONFIRM_S = 0.075             # ATBRT default: host must answer the new-baud ID within this
+
+def _u8(v):
+    return [max(0, min(255, int(round(v))))]
+
+
+def _u16(v):
+    v = max(0, min(0xFFFF, int(round(v))))
+    return [v >> 8, v & 0xFF]
+
+
+# PID → (encoder from a physical value to payload bytes, value generator f(t))
+DEFAULT_SIGNALS = {
+    0x04: (lambda v: _u8(v * 255 / 100), lambda t: 35 + 25 * math.sin(t / 7)),            # ENGINE_LOAD %
+    0x05: (lambda v: _u8(v + 40), lambda t: min(90.0, 20 + t / 4)),                       # COOLANT_TEMP °C
+    0x0C: (lambda v: _u16(v * 4), lambda t: 2200 + 1400 * math.sin(t / 3)),               # RPM
+    0x0D: (lambda v: _u8(v), lambda t: 60 + 40 * math.sin(t / 11)),                       # SPEED km/h
+    0x10: (lambda v: _u16(v * 100), lambda t: 9 + 6 * math.sin(t / 3)),                   # MAF g/s
+    0x11: (lambda v: _u8(v * 255 / 100), lambda t: 30 + 20 * math.sin(t / 5)),            # THROTTLE %
+    0x42: (lambda v: _u16(v * 1000), lambda t: 13.9 + 0.2 * math.sin(t)),                 # VOLTAGE V
+}
+
+DEFAULT_DTCS = {0x03: ["P0138"], 0x07: ["P0171"], 0x0A: []}
+DEFAULT_VIN = "WVWZZZ1JZXW386752"
+
+
+def _encode_dtc(code):
+    kind = "PCBU".index(code[0])
+    value = int(code[1:], 16)
+    return [(kind << 6) | (value >> 8), value & 0xFF]
+
+
+class ELM327Emulator:
+    def __init__(self, latency=0.0, jitter=0.0, no_data_rate=0.0, timeout_rate=0.0, bus_error_rate=0.0,
+                 signals=None, dtcs=None, vin=DEFAULT_VIN, multi_pid=True, seed=0, elm_timing=False,
+                 brd_supported=True):
+        self.latency = latency
+        self.jitter = jitter
+        self.no_data_rate = no_data_rate
+        self.timeout_rate = timeout_rate
+        self.bus_error_rate = bus_error_rate
+        self.signals = dict(DEFAULT_SIGNALS if signals is None else signals)
+        self.dtcs = {k: list(v) for k, v in (DEFAULT_DTCS if dtcs is None else dtcs).items()}
+        self.vin = vin
+        self.multi_pid = multi_pid
+        self.elm_timing = elm_timing
+        self.brd_supported = brd_supported
+        self._rng = random.Random(seed)
+
+        self.port = None
+        self.requests = 0
+        self.faults = 0
+        self._drop_all = False
+        self._master = None
+        self._slave = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._t0 = time.monotonic()
+        self._reset_state()
+
+    # ------------------------------------------------------------------
+    # LIFECYCLE
+    # ------------------------------------------------------------------
+    def start(self):
+        """Open the pty and start answering; returns the port path for python-obd."""
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, name="ELM327Emulator", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(2.0)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def unplug(self, unplugged=True):
+        """Simulate a pulled adapter: every request (AT included) goes unanswered."""
+        self._drop_all = unplugged
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # SERIAL LOOP
+    # ------------------------------------------------------------------
+    def _reset_state(self):
+        self.echo = True
+        self.headers = False
+        self.spaces = True
+        self.protocol = "0"
+        self.baud = DEFAULT_BAUD
+        self.st = DEFAULT_ST
+        self.adaptive = 1
+        self._pending_baud = None     # (baud, deadline) while an ATBRD switch awaits the host's CR
+
+    def _serve(self):
+        buf = b""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._master, 1024)
+            except OSError:
+                continue
+            buf += data
+            while b"\r" in buf:
+                line, buf = buf.split(b"\r", 1)
+                self._handle(line.decode("ascii", "ignore"))
+
+    def _write(self, text):
+        try:
+            os.write(self._master, text.encode("ascii"))
+        except OSError:
+            pass
+
+    def _handle(self, raw):
+        cmd = raw.replace(" ", "").replace("\n", "").upper()
+        if self._drop_all:
+            return
+        if self._pending_baud:
+            self._confirm_baud(cmd)
+            return
+        if not cmd:
+            return
+        lines = self._respond(cmd)
+        if lines is None:          # injected timeout: no prompt at all
+            return
+        echo = raw + "\r" if self.echo else ""
+        out = echo + "\r".join(lines) + "\r\r>"
+        if self.elm_timing:
+            time.sleep((len(raw) + 1 + len(out)) * 10.0 / self.baud)    # 8N1 on the wire
+        self._write(out)
+
+    def _confirm_baud(self, cmd):
+        baud, deadline = self._pending_baud
+        self._pending_baud = None
+        if cmd == "" and time.monotonic() <= deadline:
+            self.baud = baud
+            self._write("OK\r\r>")
+        # otherwise the ELM327 silently stays at the old rate
+
+    def _respond(self, cmd):
+        if cmd.startswith("AT"):
+            return self._at(cmd[2:])
+
+        self.requests += 1
+        delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if self.elm_timing:
+            timeout = self._response_timeout()
+            if delay > timeout:
+                time.sleep(timeout)
+                return ["NO DATA"]
+            # without a response count the ELM waits out the timeout for more ECUs
+            expected = len(cmd) % 2 and cmd[-1] in "123456789ABCDEF"
+            delay += 0 if expected else timeout
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = self._rng.random()
+        if roll < self.timeout_rate:
+            self.faults += 1
+            return None
+        roll -= self.timeout_rate
+        if roll < self.no_data_rate:
+            self.faults += 1
+            return ["NO DATA"]
+        roll -= self.no_data_rate
+        if roll < self.bus_error_rate:
+            self.faults += 1
+            return [self._rng.choice(["CAN ERROR", "BUS ERROR", "STOPPED"])]
+
+        try:
+            payload = self._obd(cmd)
+        except ValueError:
+            return ["?"]
+        return self._frames(payload) if payload else ["NO DATA"]
+
+    # ------------------------------------------------------------------
+    # AT COMMANDS
+    # ------------------------------------------------------------------
+    def _response_timeout(self):
+        st = self.st * 0.004
+        if self.adaptive == 0:
+            return st
+        factor = 2.0 if self.adaptive == 1 else 1.25
+        return min(st, max(0.008, self.latency * factor))
+
+    def _at(self, cmd):
+        if cmd == "Z":
+            self._reset_state()
+            return ["", ELM_ID]
+        if cmd.startswith("BRD"):
+            if not self.brd_supported:
+                return ["?"]
+            baud = round(4000000 / int(cmd[3:], 16))
+            # "OK" goes out at the old rate, then the ID string at the new one
+            self._write("OK\r")
+            time.sleep(0.005)
+            self._write(ELM_ID + "\r")
+            self._pending_baud = (baud, time.monotonic() + BRD_CONFIRM_S)
+            return None
+        if cmd.startswith("AT") and cmd[2:] in ("0", "1", "2"):
+            self.adaptive = int(cmd[2:])
+            return ["OK"]
+        if cmd.startswith("ST"):
+            self.st = int(cmd[2:], 16) or DEFAULT_ST
+            return ["OK"]
+        if cmd in ("E0", "E1"):
+            self.echo = cmd == "E1"
+        elif cmd in ("H0", "H1"):
+            self.headers = cmd == "H1"
+        elif cmd in ("S0", "S1"):
+            self.spaces = cmd == "S1"
+        elif cmd.startswith("SP") or cmd.startswith("TP"):
+            self.protocol = cmd[2:].lstrip("A") or "0"
+        elif cmd == "DPN":
+            return ["A6" if self.protocol == "0" else "6"]
+        elif cmd == "RV":
+            return [f"{13.9 + 0.1 * math.sin(time.monotonic()):.1f}V"]
+        elif cmd == "I":
+            return [ELM_ID]
+        elif cmd == "@1":
+            return ["OBDII to RS232 Interpreter"]
+        return ["OK"]
+
+    # ------------------------------------------------------------------
+    # OBD REQUESTS
+    # ------------------------------------------------------------------
+    def _obd(self, cmd):
+        if len(cmd) % 2:
+            cmd = cmd[:-1]                     # trailing "expected frames" digit
+        request = bytes.fromhex(cmd)
+        mode, pids = request[0], list(request[1:])
+        t = time.monotonic() - self._t0
+
+        if mode == 0x01:
+            if len(pids) > 1 and not self.multi_pid:
+                return []
+            payload = [0x41]
+            for pid in pids[:6]:
+                if pid % 0x20 == 0:
+                    payload += [pid] + self._bitmap(pid)
+                elif pid in self.signals:
+                    encode, value = self.signals[pid]
+                    payload += [pid] + encode(value(t))
+            return payload if len(payload) > 1 else []
+        if mode in (0x03, 0x07, 0x0A):
+            codes = self.dtcs.get(mode, [])
+            payload = [mode + 0x40, len(codes)]
+            for code in codes:
+                payload += _encode_dtc(code)
+            return payload
+        if mode == 0x04:
+            for key in self.dtcs:
+                self.dtcs[key] = []
+            return [0x44]
+        if mode == 0x09 and pids:
+            if pids[0] == 0x00:
+                return [0x49, 0x00, 0x40, 0x00, 0x00, 0x00]     # only 09 02 (VIN)
+            if pids[0] == 0x02 and self.vin:
+                return [0x49, 0x02, 0x01] + list(self.vin.encode("ascii"))
+        return []
+
+    def _bitmap(self, base):
+        bits = 0
+        supported = set(self.signals)
+        for pid in supported:
+            if base < pid <= base + 0x20:
+                bits |= 1 << (32 - (pid - base))
+        if any(pid > base + 0x20 for pid in supported):
+            bits |= 1                           # next listing PID is supported
+        return [(bits >> shift) & 0xFF for shift in (24, 16, 8, 0)]
+
+    def _frames(self, payload):
+        """ISO-TP framing as an ELM327 prints it with headers on."""
+        sep = " " if self.spaces else ""
+
+        def line(data):
+            parts = ([ECU_HEADER] if self.headers else []) + ["%02X" % b for b in data]
+            return sep.join(parts)
+
+        if len(payload) <= 7:
+            return [line([len(payload)] + payload + [0x00] * (7 - len(payload)))]
+        frames = [line([0x10 | (len(payload) >> 8), len(payload) & 0xFF] + payload[:6])]
+        rest, seq = payload[6:], 1
+        while rest:
+            chunk, rest = rest[:7], rest[7:]
+            frames.append(line([0x20 | (seq & 0x0F)] + chunk + [0x00] * (7 - len(chunk))))
+            seq += 1
+        return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve an emulated ELM327 on a pty")
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--no-data-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--bus-error-rate", type=float, default=0.0)
+    parser.add_argument("--elm-timing", action="store_true", help="model baud rate, ATST and adaptive timing")
+    args = parser.parse_args(argv)
+
+    emu = ELM327Emulator(latency=args.latency, jitter=args.jitter, no_data_rate=args.no_data_rate,
+                         timeout_rate=args.timeout_rate, bus_error_rate=args.bus_error_rate,
+                         elm_timing=args.elm_timing)
+    print(f"[ELM327-EMU] Listening on {emu.start()} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emu.stop()
+        print(f"[ELM327-EMU] Served {emu.requests} requests ({emu.faults} injected faults)")
+
+
+if __name__ == "__main__":
+    main()
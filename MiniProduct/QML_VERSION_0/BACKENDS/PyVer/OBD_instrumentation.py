@@ -0,0 +1,205 @@
+"""
+Low-overhead instrumentation for the hot paths.
+
+    Histogram     latency distribution in fixed √2-spaced buckets (50 µs … 13 s);
+                  record() is a bisect and three adds, percentiles come from the buckets
+    SlotStats     a periodic slot: run time, lateness against its interval, period jitter
+    RateCounter   events per second over the last few whole seconds
+
+Instrumentation groups them by name and turns them into a JSON-ready
+snapshot. Histograms may be read from another thread (the snapshot copies
+the registry first), so the recording side takes no locks; slots and
+counters belong to the thread that drives them.
+"""
+import functools
+import json
+import math
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER
+
+HISTOGRAM_BOUNDS = tuple(50e-6 * 2 ** (k / 2) for k in range(37))     # upper bounds in seconds
+RATE_WINDOW_S = 5
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)         # last bucket: above every bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(HISTOGRAM_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (never above the largest sample)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(HISTOGRAM_BOUNDS[i], self.max) if i < len(HISTOGRAM_BOUNDS) else self.max
+        return self.max
+
+    def as_dict(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class SlotStats:
+    """A slot expected every `interval` seconds: run time, lateness and period jitter."""
+
+    __slots__ = ("interval", "runtime", "lateness", "overruns", "_last_start", "_periods", "_mean", "_m2")
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.runtime = Histogram()
+        self.lateness = Histogram()
+        self.overruns = 0               # runs longer than the interval
+        self._last_start = None
+        self._periods = 0
+        self._mean = 0.0                # running mean / M2 of the period (Welford)
+        self._m2 = 0.0
+
+    def begin(self, now):
+        last, self._last_start = self._last_start, now
+        if last is None:
+            return
+        period = now - last
+        self.lateness.record(max(0.0, period - self.interval))
+        self._periods += 1
+        delta = period - self._mean
+        self._mean += delta / self._periods
+        self._m2 += delta * (period - self._mean)
+
+    def end(self, elapsed):
+        self.runtime.record(elapsed)
+        if elapsed > self.interval:
+            self.overruns += 1
+
+    def as_dict(self):
+        jitter = math.sqrt(self._m2 / self._periods) if self._periods > 1 else 0.0
+        return {
+            "interval_ms": round(self.interval * 1000, 1),
+            "period_ms": round(self._mean * 1000, 2),
+            "jitter_ms": round(jitter * 1000, 3),
+            "overruns": self.overruns,
+            "runtime": self.runtime.as_dict(),
+            "lateness": self.lateness.as_dict(),
+        }
+
+
+class RateCounter:
+    """Events per second, averaged over the last RATE_WINDOW_S whole seconds."""
+
+    __slots__ = ("total", "_second", "_n", "_done")
+
+    def __init__(self):
+        self.total = 0
+        self._second = None
+        self._n = 0
+        self._done = deque(maxlen=RATE_WINDOW_S)     # counts of the last finished seconds
+
+    def _roll(self, second):
+        if self._second is not None and second != self._second:
+            self._done.append(self._n)
+            for _ in range(min(second - self._second - 1, RATE_WINDOW_S)):
+                self._done.append(0)                 # seconds without events
+            self._n = 0
+        self._second = second
+
+    def add(self, n=1, now=None):
+        self._roll(int(time.monotonic() if now is None else now))
+        self._n += n
+        self.total += n
+
+    def rate(self, now=None):
+        self._roll(int(time.monotonic() if now is None else now))
+        return sum(self._done) / len(self._done) if self._done else 0.0
+
+
+class Instrumentation:
+    """Named histograms, slots and counters; disabled, every call is a no-op."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.slots = {}
+        self.counters = {}
+
+    def record(self, name, seconds):
+        if self.enabled:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            counter = self.counters.get(name)
+            if counter is None:
+                counter = self.counters[name] = RateCounter()
+            counter.add(n)
+
+    def timed(self, name, interval, fn):
+        """
+        `fn` wrapped to feed the slot `name` (expected every `interval` s), e.g. for
+        a QTimer; every run is also a "slot" span while the tracer is enabled.
+        """
+        if not self.enabled:
+            return fn
+        slot = self.slots[name] = SlotStats(interval)
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def run(*args):
+            start = clock()
+            slot.begin(start)
+            try:
+                return fn(*args)
+            finally:
+                end = clock()
+                slot.end(end - start)
+                if TRACER.enabled:
+                    TRACER.complete(name, "slot", start, end)
+        return run
+
+    def snapshot(self):
+        """Plain dict of everything recorded so far."""
+        now = time.monotonic()
+        return {
+            "histograms": {name: h.as_dict() for name, h in sorted(list(self.histograms.items()))},
+            "slots": {name: s.as_dict() for name, s in sorted(list(self.slots.items()))},
+            "rates": {name: round(c.rate(now), 2) for name, c in sorted(list(self.counters.items()))},
+            "counts": {name: c.total for name, c in sorted(list(self.counters.items()))},
+        }
+
+
+def dump_json(snapshot, path=None):
+    """Write a diagnostics snapshot to `path` (default logs/diagnostics_<time>.json); returns the path."""
+    if not path:
+        os.makedirs("logs", exist_ok=True)
+        path = os.path.join("logs", f"diagnostics_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(snapshot, f, indent=2, sort_keys=True)
+    return path
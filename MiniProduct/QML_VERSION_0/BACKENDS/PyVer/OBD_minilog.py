@@ -0,0 +1,47 @@
+"""
+Bounded in-memory log for the dashboard's log panel.
+
+Every line gets a sequence number that only ever increases, so a reader keeps
+a cursor (the last sequence it has seen) and asks for what came after it.
+Old lines fall off the front of a deque; since() costs O(new lines), and
+nothing at all when there are none.
+"""
+from collections import deque
+from itertools import islice
+
+MINI_LOG_CAPACITY = 100
+
+
+class MiniLog:
+    """Fixed-capacity log of lines numbered 1, 2, 3, ..."""
+
+    __slots__ = ("_lines", "last_seq")
+
+    def __init__(self, capacity=MINI_LOG_CAPACITY):
+        self._lines = deque(maxlen=capacity)
+        self.last_seq = 0           # sequence of the newest line, 0 = empty
+
+    def __len__(self):
+        return len(self._lines)
+
+    @property
+    def first_seq(self):
+        """Sequence of the oldest line still held."""
+        return self.last_seq - len(self._lines) + 1
+
+    def append(self, line):
+        self._lines.append(line)
+        self.last_seq += 1
+        return self.last_seq
+
+    def since(self, cursor):
+        """(first_seq, lines) of every retained line after `cursor`; lines may start later if they fell off."""
+        n = min(self.last_seq - cursor, len(self._lines))
+        if n <= 0:
+            return self.last_seq + 1, []
+        lines = list(islice(reversed(self._lines), n))
+        lines.reverse()
+        return self.last_seq - n + 1, lines
+
+    def lines(self):
+        return list(self._lines)
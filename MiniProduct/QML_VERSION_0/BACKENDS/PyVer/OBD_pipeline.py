@@ -0,0 +1,250 @@
+"""
+Qt-free telemetry pipeline.
+
+TelemetryPipeline owns everything between the adapter and a display:
+acquisition (thread or process worker), recording, the mini log and the
+derived metrics (windowed statistics, trip computer, graph series). It has
+no timers of its own; a front end calls its steps on its own clock:
+
+    consume_samples()   every acquired sample → statistics and trip
+    latest()            newest snapshot, link-state changes → on_state_change
+    pump_messages()     worker log lines → mini log
+
+CarMetrics drives it from QTimers; run() drives it from a plain loop for
+headless recording (see headless_init.py).
+"""
+import os
+import time
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_instrumentation import Instrumentation, dump_json
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_minilog import MiniLog
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_process import OBDProcessWorker, build_client
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_series import TieredSeries
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_stats import StreamingStats
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trip import TripComputer
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import OBDAcquisitionWorker, LINK_DISCONNECTED
+
+# metrics with windowed statistics (name → sample column)
+STATS_METRICS = {
+    "speed": "SPEED", "rpm": "RPM", "throttle": "THROTTLE_POS", "engineLoad": "ENGINE_LOAD",
+    "fuelConsumption": "FUEL_CONSUMPTION", "coolant": "COOLANT_TEMP", "battery": "VOLTAGE",
+}
+SERIES = ("speed", "fuel")
+
+
+class TelemetryPipeline:
+    """Acquisition, recording and derived metrics of one vehicle link, driven by the caller's clock."""
+
+    def __init__(self, port="COM5", log_file_path=None, replay_path=None, replay_speed=1.0, isolated=False,
+                 log_format="csv", max_rate=False):
+        self.client_options = {"port": port, "log_file_path": log_file_path, "replay_path": replay_path,
+                               "replay_speed": replay_speed, "log_format": log_format, "max_rate": max_rate}
+        self.isolated = isolated
+        self.mini_logger = MiniLog()
+        self.worker = None
+        self.connected = False
+        self.connection_state = LINK_DISCONNECTED
+        self.on_state_change = None     # called with the new link state
+        self.is_logging = False
+        self.samples = 0                # samples consumed since start
+        # front-end side timings (slots, signals); the client keeps its own query histograms
+        self.instrumentation = Instrumentation()
+        self._client_diagnostics = {}
+        self._acquisition_trace = None  # the child's spans, fetched before it stops
+
+        # graph history: minute / hour / trip tiers of 1 s means, constant memory
+        self.series = {name: TieredSeries() for name in SERIES}
+        # windowed statistics (10 s / 1 min / 5 min / trip) of every acquired sample
+        self.stats = {metric: StreamingStats() for metric in STATS_METRICS}
+        self.trip = TripComputer()
+
+    def log(self, message, at=None):
+        """Print and add to the mini log, stamped with `at` (time.time() value) or now."""
+        print(message)
+        timestamp = time.strftime("%H:%M:%S", time.localtime(at))
+        for line in message if isinstance(message, list) else (message,):
+            self.mini_logger.append(f"[{timestamp}] {line}")
+
+    # ------------------------------------------------------------------
+    # ACQUISITION
+    # ------------------------------------------------------------------
+    def start(self):
+        """Start the acquisition worker; False (and logged) if it could not be created."""
+        replay_path = self.client_options["replay_path"]
+        try:
+            if replay_path:
+                self.log(f"[OBD] Replaying {replay_path} at {self.client_options['replay_speed']}x")
+            if self.isolated:
+                self.worker = OBDProcessWorker(trace=TRACER.enabled, **self.client_options)
+            else:
+                self.worker = OBDAcquisitionWorker(build_client(**self.client_options))
+            self.worker.start()
+            self.log(f"[OBD] Acquisition {'process' if self.isolated else 'worker'} started.")
+            return True
+        except Exception as e:
+            self.log(f"[OBD] Connection failed: {e}")
+            self.worker = None
+            return False
+
+    def stop(self):
+        """Stop the acquisition worker; it closes the OBD connection (and any log) on exit."""
+        if self.worker:
+            self._client_diagnostics = self.worker.diagnostics()     # kept for a dump after shutdown
+            if TRACER.enabled:
+                self._acquisition_trace = self.worker.trace_dump()
+            self.worker.stop()
+            self.worker = None
+        self.pump_messages()
+
+    def latest(self):
+        """Newest worker snapshot (None without a worker); also refreshes connected / connection_state."""
+        if not self.worker:
+            self.connected = False
+            return None
+        snapshot = self.worker.latest()
+        self.connected = snapshot.connected
+        if snapshot.link_state != self.connection_state:
+            self.connection_state = snapshot.link_state
+            if self.on_state_change:
+                self.on_state_change(snapshot.link_state)
+        return snapshot
+
+    def consume_samples(self):
+        """Feed every sample acquired since the last call (not just the newest) into statistics and trip."""
+        if not self.worker:
+            return 0
+        samples = self.worker.drain_samples()
+        for timestamp, fast_data in samples:
+            for metric, column in STATS_METRICS.items():
+                value = fast_data.get(column)
+                if value is not None:
+                    self.stats[metric].add(timestamp, float(value))
+            self.trip.add(timestamp, fast_data.get("SPEED"), fast_data.get("MAF"))
+        self.samples += len(samples)
+        return len(samples)
+
+    def pump_messages(self):
+        """Move the worker's log lines into the mini log, stamped with the time they were queued."""
+        if self.worker:
+            for at, line in self.worker.drain_messages():
+                self.log(line, at)
+
+    def dtc_codes(self):
+        """Stored, pending and permanent DTCs of the newest snapshot, or None when not connected."""
+        snapshot = self.latest()
+        if not snapshot or not snapshot.connected:
+            return None
+        codes = []
+        for category in ("stored", "pending", "permanent"):
+            codes.extend(snapshot.dtc.get(category, []))
+        return codes
+
+    # ------------------------------------------------------------------
+    # RECORDING / CONTROL
+    # ------------------------------------------------------------------
+    def set_logging(self, enabled):
+        if not self.worker or enabled == self.is_logging:
+            return self.is_logging
+        if enabled:
+            if not self.connected:
+                self.log("[OBD] Cannot start logging: Not connected to OBD-II adapter. The functions will be called, but no data is stored")
+            self.worker.start_logging()
+        else:
+            self.worker.stop_logging()
+        self.is_logging = enabled
+        return enabled
+
+    def reconnect(self):
+        if self.worker:
+            self.worker.request_reconnect()
+
+    # ------------------------------------------------------------------
+    # DERIVED METRICS
+    # ------------------------------------------------------------------
+    def append_series(self, name, t, value):
+        """Add a display value to a graph series; returns the points it closed."""
+        return self.series[name].append(t, value)
+
+    def series_points(self, name, tier="minute", max_points=100):
+        series = self.series.get(name)
+        if series is None or tier not in series.tiers:
+            return []
+        return series.values(tier, max_points)
+
+    def stats_summary(self, metric, window="1min"):
+        stats = self.stats.get(metric)
+        if stats is None or window not in stats.windows:
+            return {}
+        return stats.summary(window, now=time.time())
+
+    def trip_summary(self):
+        return self.trip.summary()
+
+    def reset_trip(self):
+        self.trip.reset()
+        self.log("[TRIP] Trip computer reset.")
+
+    # ------------------------------------------------------------------
+    # DIAGNOSTICS
+    # ------------------------------------------------------------------
+    def diagnostics(self):
+        """Front-end instrumentation plus the client's query latency and throughput."""
+        if self.worker:
+            self._client_diagnostics = self.worker.diagnostics()
+        client = self._client_diagnostics
+        return {
+            "time": time.time(),
+            "link_state": self.connection_state,
+            "samples": self.samples,
+            "frontend": self.instrumentation.snapshot(),
+            "query_latency": client.get("query_latency", {}),
+            "throughput": client.get("throughput", {}),
+        }
+
+    def dump_diagnostics(self, path=None):
+        path = dump_json(self.diagnostics(), path)
+        self.log(f"[DIAG] Diagnostics written to {path}")
+        return path
+
+    def export_trace(self, path=None):
+        """
+        Write the trace buffer (and the acquisition process's, if isolated) as
+        Chrome trace JSON, by default to logs/trace_<time>.json; returns the path.
+        """
+        if not path:
+            os.makedirs("logs", exist_ok=True)
+            path = os.path.join("logs", f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        child = self.worker.trace_dump() if self.worker else self._acquisition_trace
+        spans = TRACER.export(path, *([child] if child else []))
+        self.log(f"[TRACE] {spans} spans written to {path}")
+        return path
+
+    # ------------------------------------------------------------------
+    # PLAIN-LOOP DRIVER
+    # ------------------------------------------------------------------
+    def run(self, duration=None, tick=0.1, message_interval=1.0, on_tick=None, should_stop=None):
+        """
+        Drive the pipeline without an event loop until `duration` seconds have
+        passed or should_stop() is true. on_tick(now) runs after every tick.
+        """
+        tick_fn = self.instrumentation.timed("tick", tick, self._tick)
+        start = time.monotonic()
+        next_messages = start
+        while True:
+            now = time.monotonic()
+            if duration is not None and now - start >= duration:
+                break
+            if should_stop is not None and should_stop():
+                break
+            tick_fn()
+            if now >= next_messages:
+                self.pump_messages()
+                next_messages = now + message_interval
+            if on_tick:
+                on_tick(now)
+            time.sleep(max(0.0, tick - (time.monotonic() - now)))
+
+    def _tick(self):
+        self.consume_samples()
+        self.latest()
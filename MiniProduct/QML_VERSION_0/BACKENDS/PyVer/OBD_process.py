@@ -0,0 +1,416 @@
+"""
+Process-isolated acquisition.
+
+OBDProcessWorker runs OBDBackendCore, its ConnectionSupervisor and recorder
+in a child process, so serial I/O, decoding and log writes never compete
+with the UI for the GIL. Samples cross over through TelemetryRing, a
+multiprocessing.shared_memory ring of fixed float64 frames: nothing is
+pickled on the sample path, and the reader copies one frame straight out
+of the mapping. Log lines, DTCs and control commands (reconnect, logging)
+are rare and go through multiprocessing queues.
+
+Ring layout (all 8-byte words):
+
+    header   magic, n_slots, n_fields, head (frames written so far)
+    slot i   seq, field_0 .. field_n-1
+
+Frame k lives in slot k % n_slots. Each slot's seq is a seqlock: the writer
+sets it to 2k+1 (odd, writing), fills the fields, sets it to 2k+2 and only
+then advances head. A reader accepts frame k only if seq reads 2k+2 both
+before and after the copy; anything else means the slot was being
+rewritten and the read is retried.
+"""
+import math
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import (
+    OBDBackendCore, scale_rate_classes, unthrottle_rate_classes,
+)
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_recorder import LOG_COLUMNS, GEAR_CODES
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_replay import ReplayConnection, REPLAY_MAX
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import (
+    OBDAcquisitionWorker, TelemetrySnapshot,
+    LINK_DISCONNECTED, LINK_PROBING, LINK_CONNECTED, LINK_DEGRADED,
+)
+
+RING_MAGIC = 0x4F424452494E4731          # "OBDRING1"
+RING_SLOTS = 256                          # ~12 s of 20 Hz samples
+HEADER_WORDS = 4
+_HEAD = 3
+READ_RETRIES = 4
+DIAGNOSTICS_PUSH_S = 2.0                  # how often the child sends its query diagnostics
+
+# frame = one LOG_COLUMNS row (GEAR as an index into GEAR_CODES) + the link state
+# + 1.0 for a new sample / 0.0 for a frame that only reports a state change
+FRAME_FIELDS = LOG_COLUMNS + ("LINK_STATE", "SAMPLE")
+LINK_STATES = (LINK_DISCONNECTED, LINK_PROBING, LINK_CONNECTED, LINK_DEGRADED)
+_GEAR_INDEX = {g: float(i) for i, g in enumerate(GEAR_CODES)}
+_LINK_INDEX = {s: float(i) for i, s in enumerate(LINK_STATES)}
+_NAN = float("nan")
+
+
+def build_client(port="COM5", log_file_path=None, replay_path=None, replay_speed=1.0, log_format="csv",
+                 max_rate=False):
+    """
+    OBDBackendCore from plain (picklable) options: an adapter port or a recorded trip.
+    max_rate polls the fast PIDs back to back instead of at 20 Hz.
+    """
+    if replay_path:
+        # recorded trip instead of an adapter; poll N× faster to keep the sample density
+        return OBDBackendCore(
+            port=replay_path, log_file_path=log_file_path, log_format=log_format,
+            rate_classes=scale_rate_classes(None if replay_speed == REPLAY_MAX else replay_speed),
+            connection_factory=lambda: ReplayConnection(replay_path, speed=replay_speed),
+        )
+    if max_rate:
+        return OBDBackendCore(port=port, log_file_path=log_file_path, log_format=log_format,
+                              rate_classes=unthrottle_rate_classes())
+    return OBDBackendCore(port=port, log_file_path=log_file_path, log_format=log_format)
+
+
+# ----------------------------------------------------------------------
+# SHARED-MEMORY RING
+# ----------------------------------------------------------------------
+class TelemetryRing:
+    """
+    Single-writer, many-reader ring of float64 frames in shared memory.
+    Create it in the UI process (name=None) and attach in the child by name.
+    """
+
+    def __init__(self, name=None, n_slots=RING_SLOTS, n_fields=len(FRAME_FIELDS)):
+        if name is None:
+            size = (HEADER_WORDS + n_slots * (1 + n_fields)) * 8
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        buf = self._shm.buf
+        self._words = buf[:len(buf) - len(buf) % 8]
+        self._u64 = self._words.cast("Q")
+        self._f64 = self._words.cast("d")
+        if self.owner:
+            self._u64[1], self._u64[2], self._u64[_HEAD] = n_slots, n_fields, 0
+            self._u64[0] = RING_MAGIC
+        elif self._u64[0] != RING_MAGIC:
+            self.close()
+            raise ValueError(f"Shared memory '{name}' is not a telemetry ring")
+        self.n_slots = self._u64[1]
+        self.n_fields = self._u64[2]
+        self._stride = 1 + self.n_fields
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def head(self):
+        """Number of frames written so far; the newest one is head - 1."""
+        return self._u64[_HEAD]
+
+    def _base(self, k):
+        return HEADER_WORDS + (k % self.n_slots) * self._stride
+
+    def write(self, values):
+        """Writer side: append one frame (a sequence of n_fields floats)."""
+        k = self._u64[_HEAD]
+        base = self._base(k)
+        self._u64[base] = 2 * k + 1
+        f64 = self._f64
+        for i, v in enumerate(values, base + 1):
+            f64[i] = v
+        self._u64[base] = 2 * k + 2
+        self._u64[_HEAD] = k + 1
+
+    def read(self, k):
+        """Frame k as a list of floats, or None if it is not (or no longer) in the ring."""
+        base = self._base(k)
+        seq = 2 * k + 2
+        if self._u64[base] != seq:
+            return None
+        values = self._f64[base + 1:base + self._stride].tolist()
+        if self._u64[base] != seq:
+            return None
+        return values
+
+    def latest(self):
+        """(head, newest frame); the frame is None while nothing has been written."""
+        head = 0
+        for _ in range(READ_RETRIES):
+            head = self._u64[_HEAD]
+            if not head:
+                return 0, None
+            values = self.read(head - 1)
+            if values is not None:
+                return head, values
+        return head, None
+
+    def read_since(self, last):
+        """Frames written after frame index `last` - 1, oldest first: [(k, frame), ...]."""
+        head = self._u64[_HEAD]
+        frames = []
+        for k in range(max(last, head - self.n_slots), head):
+            values = self.read(k)
+            if values is not None:
+                frames.append((k, values))
+        return frames
+
+    def close(self):
+        for view in (self._u64, self._f64, self._words):
+            view.release()
+        self._shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self._shm.unlink()
+
+
+def encode_frame(snapshot, sample=True):
+    """TelemetrySnapshot → ring frame (timestamp column = publish time)."""
+    fast = snapshot.fast
+    values = [snapshot.timestamp]
+    for name in LOG_COLUMNS[1:]:
+        value = fast.get(name)
+        if value is None:
+            values.append(_NAN)
+        elif name == "GEAR":
+            values.append(_GEAR_INDEX.get(value, _NAN))
+        else:
+            values.append(float(value))
+    values.append(_LINK_INDEX.get(snapshot.link_state, 0.0))
+    values.append(1.0 if sample else 0.0)
+    return values
+
+
+def decode_frame(values):
+    """Ring frame → (timestamp, fast data dict, link state); missing values are left out."""
+    fast = {}
+    for name, value in zip(LOG_COLUMNS[1:], values[1:]):
+        if math.isnan(value):
+            continue
+        fast[name] = GEAR_CODES[int(value)] if name == "GEAR" else value
+    return values[0], fast, LINK_STATES[int(values[-2])]
+
+
+# ----------------------------------------------------------------------
+# CHILD PROCESS
+# ----------------------------------------------------------------------
+def _acquisition_main(ring_name, control, events, client_options, trace=False):
+    """Entry point of the acquisition process: the thread worker's loop, publishing into the ring."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)     # Ctrl+C reaches the whole group; the parent sends "stop"
+    if trace:
+        TRACER.process_name = "acquisition"
+        TRACER.enable()
+    ring = TelemetryRing(ring_name)
+    worker = OBDAcquisitionWorker(build_client(**client_options))
+    last_dtc = [None]
+
+    def publish(snapshot, sample):
+        ring.write(encode_frame(snapshot, sample))
+        if snapshot.dtc is not last_dtc[0]:
+            last_dtc[0] = snapshot.dtc
+            events.put(("dtc", snapshot.dtc))
+
+    worker.on_publish = publish
+    commands = {
+        "reconnect": worker.request_reconnect,
+        "start_logging": worker.start_logging,
+        "stop_logging": worker.stop_logging,
+        "stop": worker.stop,
+        "trace": lambda: events.put(("trace", TRACER.dump())),
+    }
+
+    def control_loop():
+        next_diagnostics = time.monotonic()
+        while True:
+            try:
+                command = control.get(timeout=0.25)
+            except queue.Empty:
+                command = None
+            except (EOFError, OSError):
+                command = "stop"             # UI process went away
+            if command:
+                try:
+                    commands[command]()
+                except Exception as e:
+                    events.put(("log", [(time.time(), f"[OBD] Command '{command}' failed: {e}")]))
+            lines = worker.drain_messages()
+            if lines:
+                events.put(("log", lines))
+            if time.monotonic() >= next_diagnostics:
+                events.put(("diagnostics", worker.diagnostics()))
+                next_diagnostics = time.monotonic() + DIAGNOSTICS_PUSH_S
+            if command == "stop":
+                return
+
+    control_thread = threading.Thread(target=control_loop, name="OBDControl", daemon=True)
+    control_thread.start()
+    try:
+        worker.run()                     # until "stop"; closes the client (and recorder) on exit
+    finally:
+        lines = worker.drain_messages()
+        if lines:
+            events.put(("log", lines))
+        ring.close()
+
+
+# ----------------------------------------------------------------------
+# UI-SIDE HANDLE
+# ----------------------------------------------------------------------
+class OBDProcessWorker:
+    """
+    Drop-in for OBDAcquisitionWorker with the acquisition in a child process.
+    latest() reads the newest ring frame (no I/O, no decoding beyond a dict
+    of floats); everything else is a message on a queue.
+    """
+
+    def __init__(self, trace=False, **client_options):
+        self._client_options = client_options
+        self._trace = trace                  # record spans in the child too (see OBD_trace)
+        self._trace_dump = None
+        self._ctx = multiprocessing.get_context("spawn")     # no fork after Qt has started threads
+        self._ring = None
+        self._process = None
+        self._control = None
+        self._events = None
+        self._messages = []
+        self._dtc = {}
+        self._dtc_version = 0
+        self._diagnostics = {}
+        self._snapshot = TelemetrySnapshot()
+        self._snapshot_key = (0, 0)
+        self._sample_cursor = 0
+        self._exited = False
+
+    def start(self):
+        self._ring = TelemetryRing()
+        self._control = self._ctx.Queue()
+        self._events = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_acquisition_main, name="OBDAcquisition", daemon=True,
+            args=(self._ring.name, self._control, self._events, self._client_options, self._trace),
+        )
+        self._process.start()
+
+    def is_alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    # ------------------------------------------------------------------
+    # GUI-SIDE API (non-blocking)
+    # ------------------------------------------------------------------
+    def latest(self):
+        """Newest frame as a TelemetrySnapshot; rebuilt only when a frame or the DTCs changed."""
+        if self._ring is None or self._exited:
+            return self._snapshot
+        self._pump_events()
+        head, values = self._ring.latest()
+        key = (head, self._dtc_version)
+        if values is None or key == self._snapshot_key:
+            return self._snapshot
+        timestamp, fast, link_state = decode_frame(values)
+        self._snapshot = TelemetrySnapshot(
+            head, timestamp, link_state in (LINK_CONNECTED, LINK_DEGRADED), fast, self._dtc, link_state,
+        )
+        self._snapshot_key = key
+        return self._snapshot
+
+    def diagnostics(self):
+        """The child's query diagnostics as of its last report (every DIAGNOSTICS_PUSH_S)."""
+        self._pump_events()
+        return self._diagnostics
+
+    def drain_messages(self):
+        self._pump_events()
+        if self._process is not None and not self._exited and not self._process.is_alive():
+            self._exited = True
+            self._messages.append((time.time(), f"[OBD] Acquisition process exited (code {self._process.exitcode})."))
+            self._snapshot = TelemetrySnapshot(self._snapshot.seq + 1, time.time())
+        lines, self._messages = self._messages, []
+        return lines
+
+    def drain_samples(self):
+        """Every sample frame written since the last call that is still in the ring: [(timestamp, fast data)]."""
+        if self._ring is None:
+            return []
+        frames = self._ring.read_since(self._sample_cursor)
+        if frames:
+            self._sample_cursor = frames[-1][0] + 1
+        samples = []
+        for _, values in frames:
+            if values[-1]:
+                timestamp, fast, _ = decode_frame(values)
+                samples.append((timestamp, fast))
+        return samples
+
+    def trace_dump(self, timeout=2.0):
+        """The child's trace buffer (Tracer.dump()), or None if it did not answer in time."""
+        if not self._trace or not self.is_alive():
+            return None
+        self._trace_dump = None
+        self._send("trace")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._pump_events()
+            if self._trace_dump is not None:
+                return self._trace_dump
+            time.sleep(0.01)
+        return None
+
+    def request_reconnect(self):
+        self._send("reconnect")
+
+    def start_logging(self):
+        self._send("start_logging")
+
+    def stop_logging(self):
+        self._send("stop_logging")
+
+    def stop(self, timeout=5.0):
+        """Stop the child (it closes the connection and flushes the log), then free the ring."""
+        if self._process is None:
+            return
+        self._send("stop")
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(1.0)
+        self._pump_events()
+        for q in (self._control, self._events):
+            q.close()
+            q.cancel_join_thread()
+        self._control = self._events = None
+        self._ring.close()
+        self._ring.unlink()
+        self._ring = None
+        self._process = None
+
+    # ------------------------------------------------------------------
+    # INTERNALS
+    # ------------------------------------------------------------------
+    def _send(self, command):
+        if self._process is not None and self._process.is_alive():
+            self._control.put(command)
+
+    def _pump_events(self):
+        if self._events is None:
+            return
+        while True:
+            try:
+                kind, payload = self._events.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                return
+            if kind == "log":
+                self._messages.extend(payload)
+            elif kind == "dtc":
+                self._dtc = payload
+                self._dtc_version += 1
+            elif kind == "diagnostics":
+                self._diagnostics = payload
+            elif kind == "trace":
+                self._trace_dump = payload
@@ -0,0 +1,180 @@
+import csv
+import json
+import math
+import os
+import queue
+import threading
+import time
+from array import array
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER
+
+# Fixed sample schema. Every column is stored as a float64; GEAR is kept as an
+# index into GEAR_CODES so the hot path never touches strings.
+LOG_COLUMNS = (
+    "timestamp", "SPEED", "RPM", "THROTTLE_POS", "ENGINE_LOAD",
+    "COOLANT_TEMP", "VOLTAGE", "MAF", "FUEL_CONSUMPTION",
+    "STEERING_ANGLE", "GEAR", "BRAKE_PRESSURE", "ACCELERATOR_PEDAL",
+    "WHEEL_FL", "WHEEL_FR", "WHEEL_RL", "WHEEL_RR",
+)
+GEAR_CODES = ("P", "R", "N", "D", "1", "2", "3", "4", "5", "6", "7", "8")
+_GEAR_INDEX = {g: float(i) for i, g in enumerate(GEAR_CODES)}
+_NAN = float("nan")
+
+
+class _Chunk:
+    """One preallocated block of rows, column-major (one typed array per column)."""
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, n_columns, size):
+        self.columns = [array("d", [_NAN]) * size for _ in range(n_columns)]
+        self.rows = 0
+
+
+class TelemetryRecorder:
+    """
+    Fixed-schema sample recorder.
+    Samples are written into preallocated column arrays; full chunks are handed
+    to a background writer thread, so append() is O(1) and does no I/O.
+    Non-sample entries (DTCs, snapshots, status flags) go to a JSON-lines
+    sidecar instead of being forced into the sample table.
+    `log_format` is "csv" or "trip" (indexed, compressed, see OBD_triplog).
+    """
+
+    def __init__(self, filename, columns=LOG_COLUMNS, chunk_size=500, pool_size=4, log_format="csv"):
+        if log_format not in ("csv", "trip"):
+            raise ValueError(f"Unknown log format '{log_format}'")
+        self.filename = filename
+        self.log_format = log_format
+        self.events_filename = os.path.splitext(filename)[0] + ".events.jsonl"
+        self.columns = tuple(columns)
+        self.chunk_size = chunk_size
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self._blank = array("d", [_NAN]) * chunk_size
+        self._gear_col = self._index.get("GEAR")
+
+        self._free = queue.SimpleQueue()
+        for _ in range(pool_size - 1):
+            self._free.put(_Chunk(len(self.columns), chunk_size))
+        self._current = _Chunk(len(self.columns), chunk_size)
+
+        self._trip_writer = None
+        if log_format == "trip":
+            # imported here: OBD_triplog depends on this module's schema
+            from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_triplog import TripLogWriter
+            self._trip_writer = TripLogWriter(filename, self.columns)
+
+        self._lock = threading.Lock()
+        self._pending = queue.SimpleQueue()
+        self.rows_written = 0
+        self.overflows = 0
+        self._writer = threading.Thread(target=self._write_loop, name="OBDRecorder", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------
+    # HOT PATH
+    # ------------------------------------------------------------------
+    def append(self, sample: dict, timestamp=None):
+        """Store one sample row. Unknown keys are ignored, missing ones stay NaN."""
+        with self._lock:
+            chunk = self._current
+            row = chunk.rows
+            cols = chunk.columns
+            cols[0][row] = time.time() if timestamp is None else timestamp
+            index = self._index
+            for key, value in sample.items():
+                i = index.get(key)
+                if i is None or i == 0:
+                    continue
+                if i == self._gear_col:
+                    cols[i][row] = _GEAR_INDEX.get(value, _NAN)
+                else:
+                    try:
+                        cols[i][row] = value
+                    except TypeError:
+                        cols[i][row] = _NAN
+            chunk.rows = row + 1
+            if chunk.rows >= self.chunk_size:
+                self._hand_off()
+
+    def record_event(self, kind, payload, timestamp=None):
+        """Queue a free-form entry for the events sidecar."""
+        self._pending.put(("event", (time.time() if timestamp is None else timestamp, kind, payload)))
+
+    def flush(self):
+        """Hand the partially filled chunk to the writer."""
+        with self._lock:
+            if self._current.rows:
+                self._hand_off()
+
+    def close(self, timeout=5.0):
+        """Flush everything and stop the writer thread."""
+        self.flush()
+        self._pending.put(None)
+        self._writer.join(timeout)
+
+    # ------------------------------------------------------------------
+    # INTERNAL
+    # ------------------------------------------------------------------
+    def _hand_off(self):
+        # caller holds self._lock
+        self._pending.put(("chunk", self._current))
+        try:
+            self._current = self._free.get_nowait()
+        except queue.Empty:
+            # writer is behind; grow the pool instead of blocking the poller
+            self.overflows += 1
+            self._current = _Chunk(len(self.columns), self.chunk_size)
+
+    def _write_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                if self._trip_writer:
+                    self._trip_writer.close()
+                return
+            kind, body = item
+            try:
+                if kind == "chunk":
+                    with TRACER.span("write_chunk", "log", {"rows": body.rows}):
+                        self._write_chunk(body)
+                else:
+                    with TRACER.span("write_event", "log"):
+                        self._write_event(*body)
+            except Exception as e:
+                print(f"[OBD-LOG] Write failed: {e}")
+            if kind == "chunk":
+                # reset on the writer side so append() never has to clear stale cells
+                for col in body.columns:
+                    col[:] = self._blank
+                body.rows = 0
+                self._free.put(body)
+
+    def _write_chunk(self, chunk):
+        n = chunk.rows
+        if self._trip_writer:
+            self._trip_writer.write_chunk(chunk.columns, n)
+            self.rows_written += n
+            return
+        write_header = not os.path.exists(self.filename)
+        with open(self.filename, "a", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(self.columns)
+            columns = [col[:n] for col in chunk.columns]
+            for row in zip(*columns):
+                writer.writerow([self._format(i, v) for i, v in enumerate(row)])
+        self.rows_written += n
+        print(f"[OBD-LOG] Data flushed → {self.filename} ({n} rows)")
+
+    def _format(self, i, v):
+        if math.isnan(v):
+            return ""
+        if i == self._gear_col:
+            return GEAR_CODES[int(v)]
+        return repr(v)
+
+    def _write_event(self, timestamp, kind, payload):
+        with open(self.events_filename, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"timestamp": timestamp, "kind": kind, "data": payload}, default=str) + "\n")
@@ -0,0 +1,208 @@
+"""
+Deterministic OBD source that plays back recorded trip logs.
+
+ReplayConnection implements the part of obd.OBD that OBDBackendCore uses
+(query, status, supported_commands, protocol_id, close), so the whole
+CarMetrics → QML pipeline can run without an adapter.
+"""
+import argparse
+import csv
+import math
+import time
+from array import array
+
+import obd
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_recorder import LOG_COLUMNS
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_triplog import TripLogReader, _csv_value
+
+REPLAY_MAX = "max"   # play one row per polling round, as fast as the consumer asks
+
+# log column → command that produced it
+COLUMN_COMMANDS = {
+    "RPM": obd.commands.RPM,
+    "SPEED": obd.commands.SPEED,
+    "THROTTLE_POS": obd.commands.THROTTLE_POS,
+    "ENGINE_LOAD": obd.commands.ENGINE_LOAD,
+    "MAF": obd.commands.MAF,
+    "COOLANT_TEMP": obd.commands.COOLANT_TEMP,
+    "VOLTAGE": obd.commands.CONTROL_MODULE_VOLTAGE,
+}
+_COMMAND_COLUMNS = {cmd.name: col for col, cmd in COLUMN_COMMANDS.items()}
+
+
+class ReplayResponse:
+    """Minimal OBDResponse stand-in: a plain float value (or None)."""
+
+    __slots__ = ("command", "value")
+
+    def __init__(self, command=None, value=None):
+        self.command = command
+        self.value = value
+
+    def is_null(self):
+        return self.value is None
+
+
+def _load_csv_chunks(path):
+    cols = {name: array("d") for name in LOG_COLUMNS}
+    with open(path, newline="") as f:
+        for record in csv.DictReader(f):
+            ts = _csv_value("timestamp", record.get("timestamp"))
+            if math.isnan(ts):
+                continue
+            for name in LOG_COLUMNS:
+                cols[name].append(_csv_value(name, record.get(name)))
+    return [cols]
+
+
+class ReplayConnection:
+    """
+    Plays a recorded trip at `speed` × real time (1.0, 10.0, ...) or, with
+    speed=REPLAY_MAX, advances one row whenever a command is asked for twice
+    at the same row. With loop=True the trip restarts at the end.
+    """
+
+    def __init__(self, path, speed=1.0, loop=True, clock=time.monotonic):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.clock = clock
+        if path.lower().endswith(".csv"):
+            self._reader = None
+            self._csv_chunks = _load_csv_chunks(path)
+            self._chunk_starts = [c["timestamp"][0] for c in self._csv_chunks if len(c["timestamp"])]
+        else:
+            self._reader = TripLogReader(path)
+            self._csv_chunks = None
+            self._chunk_starts = [c[0] for c in self._reader.chunks]
+        if not self._chunk_starts:
+            raise ValueError(f"[REPLAY] No samples in {path}")
+        first = self._load_chunk(0)
+
+        self.supported_commands = set(obd.commands.base_commands())
+        for name, cmd in COLUMN_COMMANDS.items():
+            if name in first and any(not math.isnan(v) for v in first[name]):
+                self.supported_commands.add(cmd)
+
+        self.rows_played = 0
+        self._finished = False
+        self._rewind()
+
+    # ------------------------------------------------------------------
+    # obd.OBD SURFACE
+    # ------------------------------------------------------------------
+    def status(self):
+        return obd.OBDStatus.NOT_CONNECTED if self._finished else obd.OBDStatus.CAR_CONNECTED
+
+    def protocol_id(self):
+        return ""
+
+    def protocol_name(self):
+        return "Replay"
+
+    def query(self, cmd, force=False):
+        if self._finished:
+            return ReplayResponse(cmd)
+        column = _COMMAND_COLUMNS.get(cmd.name)
+        if column is None or column not in self._chunk:
+            return ReplayResponse(cmd)
+
+        if self.speed == REPLAY_MAX:
+            if cmd.name in self._served:
+                self._advance(1)
+            self._served.add(cmd.name)
+        else:
+            self._seek(self._start_ts + (self.clock() - self._start_clock) * self.speed)
+        if self._finished:
+            return ReplayResponse(cmd)
+
+        value = self._chunk[column][self._row]
+        return ReplayResponse(cmd, None if math.isnan(value) else value)
+
+    def close(self):
+        self._finished = True
+        if self._reader:
+            self._reader.close()
+            self._reader = None
+
+    # ------------------------------------------------------------------
+    # CURSOR
+    # ------------------------------------------------------------------
+    def _load_chunk(self, i):
+        return self._reader.decode_chunk(i) if self._reader else self._csv_chunks[i]
+
+    def _rewind(self):
+        self._chunk_index = 0
+        self._chunk = self._load_chunk(0)
+        self._row = 0
+        self._served = set()
+        self._start_ts = self._chunk_starts[0]
+        self._start_clock = self.clock()
+
+    def _next_ts(self):
+        """Timestamp of the row after the cursor, or None at the end of the trip."""
+        if self._row + 1 < len(self._chunk["timestamp"]):
+            return self._chunk["timestamp"][self._row + 1]
+        if self._chunk_index + 1 < len(self._chunk_starts):
+            return self._chunk_starts[self._chunk_index + 1]
+        return None
+
+    def _advance(self, rows):
+        self._served = set()
+        for _ in range(rows):
+            if self._next_ts() is None:
+                if self.loop:
+                    self._rewind()
+                else:
+                    self._finished = True
+                return
+            self.rows_played += 1
+            self._row += 1
+            if self._row >= len(self._chunk["timestamp"]):
+                self._chunk_index += 1
+                self._chunk = self._load_chunk(self._chunk_index)
+                self._row = 0
+
+    def _seek(self, target_ts):
+        while not self._finished:
+            nxt = self._next_ts()
+            if nxt is not None and nxt > target_ts:
+                return
+            self._advance(1)
+            if nxt is None:
+                return  # rewound (loop) or finished
+
+
+def main(argv=None):
+    """Drive OBDBackendCore from a replayed trip and report the achieved sample rate."""
+    from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore, scale_rate_classes
+
+    parser = argparse.ArgumentParser(description="Replay a trip log through OBDBackendCore")
+    parser.add_argument("trip", help=".trip or obd_log_*.csv file")
+    parser.add_argument("--speed", default="1", help="playback speed factor, or 'max'")
+    parser.add_argument("--seconds", type=float, default=10.0, help="wall-clock duration")
+    args = parser.parse_args(argv)
+
+    speed = REPLAY_MAX if args.speed == REPLAY_MAX else float(args.speed)
+    rate_classes = scale_rate_classes(None if speed == REPLAY_MAX else speed)
+    client = OBDBackendCore(port=args.trip, rate_classes=rate_classes,
+                            connection_factory=lambda: ReplayConnection(args.trip, speed=speed))
+    print("\n".join(client._connect()))
+
+    polls = 0
+    end = time.monotonic() + args.seconds
+    while time.monotonic() < end and client.is_connected():
+        if client.poll_scheduled():
+            polls += 1
+        wait = client.time_until_next_poll()
+        if wait:
+            time.sleep(wait)
+    stats = client.get_throughput_stats()
+    print(f"[REPLAY] {polls} polls in {args.seconds:.1f}s, rows played: {client.connection.rows_played}")
+    print(f"[REPLAY] {stats['samples_per_sec']} samples/s, {stats['round_trips_per_sec']} queries/s")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Multi-resolution series store for the UI graphs.
+
+TieredSeries turns a stream of (timestamp, value) samples into bucket means
+at several resolutions, each kept in a fixed-capacity ring of typed arrays:
+
+    minute   1 s points, last 60 s
+    hour     10 s points, last hour
+    trip     whole trip; when full it is thinned to half with LTTB and its
+             resolution doubles, so memory stays constant however long the trip
+
+append() returns only the finest-tier points that were just closed, so a
+consumer can be fed deltas; points() gives a tier's history, reduced with
+LTTB (largest-triangle-three-buckets) when the caller wants fewer points.
+"""
+from array import array
+
+# (name, seconds per point, capacity); capacity None = grows by compaction (trip)
+DEFAULT_TIERS = (
+    ("minute", 1.0, 60),
+    ("hour", 10.0, 360),
+    ("trip", 10.0, None),
+)
+TRIP_CAPACITY = 512
+
+
+def lttb(ts, vs, threshold):
+    """
+    Largest-triangle-three-buckets downsampling of (ts, vs) to `threshold` points.
+    Keeps the first and last point and, per bucket, the point forming the largest
+    triangle with the previous pick and the next bucket's mean: peaks survive,
+    unlike with block averages.
+    """
+    n = len(vs)
+    if threshold >= n or threshold < 3:
+        return list(ts), list(vs)
+    out_t, out_v = [ts[0]], [vs[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        nxt_end = min(int((i + 2) * every) + 1, n)
+        span = nxt_end - hi
+        avg_t = sum(ts[hi:nxt_end]) / span
+        avg_v = sum(vs[hi:nxt_end]) / span
+
+        at, av = ts[a], vs[a]
+        best, best_j = -1.0, lo
+        for j in range(lo, hi):
+            area = abs((at - avg_t) * (vs[j] - av) - (at - ts[j]) * (avg_v - av))
+            if area > best:
+                best, best_j = area, j
+        out_t.append(ts[best_j])
+        out_v.append(vs[best_j])
+        a = best_j
+    out_t.append(ts[-1])
+    out_v.append(vs[-1])
+    return out_t, out_v
+
+
+class SeriesRing:
+    """Fixed-capacity ring of (timestamp, value) pairs in two preallocated arrays."""
+
+    __slots__ = ("capacity", "count", "_t", "_v")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0                      # points ever appended
+        self._t = array("d", bytes(8 * capacity))
+        self._v = array("d", bytes(8 * capacity))
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, t, v):
+        i = self.count % self.capacity
+        self._t[i] = t
+        self._v[i] = v
+        self.count += 1
+
+    def points(self):
+        """(timestamps, values), oldest first."""
+        if self.count <= self.capacity:
+            return self._t[:self.count].tolist(), self._v[:self.count].tolist()
+        i = self.count % self.capacity
+        return (self._t[i:].tolist() + self._t[:i].tolist(),
+                self._v[i:].tolist() + self._v[:i].tolist())
+
+    def replace(self, ts, vs):
+        """Reload the ring with (at most `capacity`) points, keeping the allocation."""
+        self.count = len(vs)
+        self._t[:self.count] = array("d", ts)
+        self._v[:self.count] = array("d", vs)
+
+
+class _Tier:
+    __slots__ = ("name", "resolution", "ring", "compacting", "_bucket", "_sum", "_n", "_t")
+
+    def __init__(self, name, resolution, capacity):
+        self.name = name
+        self.resolution = resolution
+        self.compacting = capacity is None
+        self.ring = SeriesRing(TRIP_CAPACITY if capacity is None else capacity)
+        self._bucket = None
+        self._sum = 0.0
+        self._n = 0
+        self._t = 0.0
+
+    def add(self, t, v):
+        """Accumulate one sample; returns the bucket mean closed by it, or None."""
+        bucket = int(t // self.resolution)
+        closed = None
+        if bucket != self._bucket:
+            closed = self.close()
+            self._bucket = bucket
+        self._sum += v
+        self._n += 1
+        self._t = t
+        return closed
+
+    def close(self):
+        if not self._n:
+            return None
+        mean = self._sum / self._n
+        self._push(self._t, mean)
+        self._sum, self._n = 0.0, 0
+        return mean
+
+    def _push(self, t, v):
+        ring = self.ring
+        if self.compacting and ring.count >= ring.capacity:
+            ts, vs = lttb(*ring.points(), ring.capacity // 2)
+            ring.replace(ts, vs)
+            self.resolution *= 2
+        ring.append(t, v)
+
+
+class TieredSeries:
+    """One metric at several resolutions; O(1) per sample, constant memory."""
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self._spec = tuple(tiers)
+        self.clear()
+
+    @property
+    def tiers(self):
+        return tuple(tier.name for tier in self._tiers)
+
+    def append(self, t, v):
+        """Add a sample; returns the finest-tier points it closed (usually [] or one value)."""
+        closed = None
+        for i, tier in enumerate(self._tiers):
+            point = tier.add(t, v)
+            if i == 0:
+                closed = point
+        return [] if closed is None else [closed]
+
+    def resolution(self, tier):
+        return self._by_name[tier].resolution
+
+    def points(self, tier, max_points=None):
+        """(timestamps, values) of a tier, oldest first, LTTB-reduced to `max_points` if given."""
+        ts, vs = self._by_name[tier].ring.points()
+        if max_points:
+            ts, vs = lttb(ts, vs, max_points)
+        return ts, vs
+
+    def values(self, tier, max_points=None):
+        return self.points(tier, max_points)[1]
+
+    def clear(self):
+        self._tiers = [_Tier(name, resolution, capacity) for name, resolution, capacity in self._spec]
+        self._by_name = {tier.name: tier for tier in self._tiers}
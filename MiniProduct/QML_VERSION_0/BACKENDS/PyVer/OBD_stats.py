@@ -0,0 +1,247 @@
+"""
+Streaming statistics over sliding windows.
+
+StreamingStats keeps mean / min / max / stddev and approximate percentiles of
+one metric over several windows (10 s, 1 min, 5 min, whole trip) without
+storing raw samples. Samples are folded into 1 s buckets; each bucket holds
+count, sum, sum of squares, min, max and a QuantileSketch. A window keeps
+running totals of its buckets (added on close, subtracted on expiry), a
+monotonic deque per extreme, and a merged sketch, so a sample costs O(1)
+and a window O(window / bucket) memory whatever the sample rate.
+"""
+import math
+from collections import deque
+
+DEFAULT_WINDOWS = (("10s", 10.0), ("1min", 60.0), ("5min", 300.0), ("trip", None))
+BUCKET_S = 1.0
+SKETCH_ACCURACY = 0.01
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95)
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style): every estimate is within
+    `relative_accuracy` of a real sample. Sketches with the same accuracy can
+    be merged and subtracted, which is what makes sliding windows cheap.
+    """
+
+    __slots__ = ("relative_accuracy", "_gamma_log", "_offset", "positive", "negative", "zero", "count")
+
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._gamma_log = math.log(gamma)
+        self._offset = 2 / (1 + gamma)       # bucket midpoint factor
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def _key(self, v):
+        return math.ceil(math.log(v) / self._gamma_log)
+
+    def _value(self, key):
+        return math.exp(key * self._gamma_log) * self._offset
+
+    def add(self, v):
+        if v > 0:
+            key = self._key(v)
+            self.positive[key] = self.positive.get(key, 0) + 1
+        elif v < 0:
+            key = self._key(-v)
+            self.negative[key] = self.negative.get(key, 0) + 1
+        else:
+            self.zero += 1
+        self.count += 1
+
+    def merge(self, other, sign=1):
+        """Add (sign=1) or remove (sign=-1) another sketch's samples."""
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in theirs.items():
+                total = mine.get(key, 0) + sign * n
+                if total:
+                    mine[key] = total
+                else:
+                    del mine[key]
+        self.zero += sign * other.zero
+        self.count += sign * other.count
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):        # most negative first
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+
+class _Bucket:
+    __slots__ = ("index", "count", "total", "squares", "low", "high", "sketch")
+
+    def __init__(self, index, relative_accuracy):
+        self.index = index
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+
+class _Window:
+    """Running totals over the closed buckets of one window (span None = never expires)."""
+
+    __slots__ = ("name", "span", "buckets", "count", "total", "squares", "lows", "highs", "low", "high", "sketch")
+
+    def __init__(self, name, span, relative_accuracy):
+        self.name = name
+        self.span = span
+        self.buckets = deque()
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.lows = deque()               # buckets with increasing minima
+        self.highs = deque()              # buckets with decreasing maxima
+        self.low = math.inf               # trip window: plain extremes
+        self.high = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def push(self, bucket):
+        self.count += bucket.count
+        self.total += bucket.total
+        self.squares += bucket.squares
+        self.sketch.merge(bucket.sketch)
+        if self.span is None:
+            self.low = min(self.low, bucket.low)
+            self.high = max(self.high, bucket.high)
+            return
+        self.buckets.append(bucket)
+        while self.lows and self.lows[-1].low >= bucket.low:
+            self.lows.pop()
+        self.lows.append(bucket)
+        while self.highs and self.highs[-1].high <= bucket.high:
+            self.highs.pop()
+        self.highs.append(bucket)
+
+    def expire(self, first_index):
+        """Drop buckets older than `first_index`."""
+        buckets = self.buckets
+        while buckets and buckets[0].index < first_index:
+            old = buckets.popleft()
+            self.count -= old.count
+            self.total -= old.total
+            self.squares -= old.squares
+            self.sketch.merge(old.sketch, -1)
+            if self.lows and self.lows[0] is old:
+                self.lows.popleft()
+            if self.highs and self.highs[0] is old:
+                self.highs.popleft()
+
+    def extremes(self):
+        if self.span is None:
+            return self.low, self.high
+        return (self.lows[0].low if self.lows else math.inf,
+                self.highs[0].high if self.highs else -math.inf)
+
+
+class StreamingStats:
+    """One metric over several sliding windows; add() is O(1), summary() reads running totals."""
+
+    def __init__(self, windows=DEFAULT_WINDOWS, bucket_s=BUCKET_S, relative_accuracy=SKETCH_ACCURACY):
+        self.bucket_s = bucket_s
+        self.relative_accuracy = relative_accuracy
+        self._windows = {name: _Window(name, span, relative_accuracy) for name, span in windows}
+        self._current = None
+        # values are shifted by the first sample so sum-of-squares stays well conditioned
+        self._shift = None
+
+    @property
+    def windows(self):
+        return tuple(self._windows)
+
+    def add(self, t, v):
+        if v is None or v != v:                                # skip missing / NaN samples
+            return
+        index = int(t // self.bucket_s)
+        bucket = self._current
+        # a late sample (its clock behind the open bucket's) joins the open bucket: indices stay unique
+        if bucket is None or index > bucket.index:
+            if bucket is not None:
+                self._close(bucket)
+                self._expire(index)                            # bounded even if nobody reads summary()
+            bucket = self._current = _Bucket(index, self.relative_accuracy)
+        if self._shift is None:
+            self._shift = v
+        d = v - self._shift
+        bucket.count += 1
+        bucket.total += d
+        bucket.squares += d * d
+        if v < bucket.low:
+            bucket.low = v
+        if v > bucket.high:
+            bucket.high = v
+        bucket.sketch.add(v)
+
+    def _close(self, bucket):
+        for window in self._windows.values():
+            window.push(bucket)
+
+    def _expire(self, now_index):
+        for window in self._windows.values():
+            if window.span is not None:
+                window.expire(now_index - int(window.span // self.bucket_s) + 1)
+
+    def summary(self, window, quantiles=DEFAULT_QUANTILES, now=None):
+        """
+        {"count", "mean", "min", "max", "stddev", "p50", ...} for one window,
+        including the bucket still being filled. `now` (same clock as add())
+        expires buckets when no samples have arrived for a while; the open
+        bucket is only left out then, it stays open until the next add().
+        """
+        w = self._windows[window]
+        current = self._current
+        now_index = None if now is None else int(now // self.bucket_s)
+        if current is not None and (now_index is None or now_index < current.index):
+            now_index = current.index
+        if now_index is not None:
+            self._expire(now_index)
+        count, total, squares = w.count, w.total, w.squares
+        low, high = w.extremes()
+        sketch = w.sketch
+        if w.span is not None and current is not None and current.index <= now_index - int(w.span // self.bucket_s):
+            current = None                                     # idle for longer than the window
+        if current is not None and current.count:
+            count += current.count
+            total += current.total
+            squares += current.squares
+            low, high = min(low, current.low), max(high, current.high)
+            sketch = QuantileSketch(self.relative_accuracy)
+            sketch.merge(w.sketch)
+            sketch.merge(current.sketch)
+
+        result = {"count": count}
+        if not count:
+            result.update({"mean": None, "min": None, "max": None, "stddev": None})
+            result.update({f"p{round(q * 100)}": None for q in quantiles})
+            return result
+        mean = total / count
+        result["mean"] = mean + self._shift
+        result["min"] = low
+        result["max"] = high
+        result["stddev"] = math.sqrt(max(0.0, squares / count - mean * mean))
+        for q in quantiles:
+            result[f"p{round(q * 100)}"] = sketch.quantile(q)
+        return result
+
+    def summaries(self, quantiles=DEFAULT_QUANTILES, now=None):
+        return {name: self.summary(name, quantiles, now) for name in self._windows}
@@ -0,0 +1,129 @@
+"""
+Opt-in timeline tracer (Chrome / Perfetto trace-event format).
+
+TRACER records complete spans (name, category, start, duration, thread) in
+a bounded in-memory buffer; the oldest spans fall off once it is full.
+export() writes the buffer as trace-event JSON that chrome://tracing and
+ui.perfetto.dev open directly, so the interleaving of OBD queries, timer
+slots, log writes and QML logger calls can be read off a timeline.
+
+Disabled (the default) a hook costs one attribute check:
+
+    start = time.perf_counter()
+    ...
+    if TRACER.enabled:
+        TRACER.complete("RPM", "obd", start, time.perf_counter())
+
+or, where a context manager reads better, `with TRACER.span("name", "cat"):`.
+Timestamps are time.perf_counter(), a system-wide monotonic clock, so spans
+from the acquisition process line up with the UI process's.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_CAPACITY = 200_000            # spans kept; ~10 min of a busy session is well under this
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.cat, self.start, time.perf_counter(), self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Bounded buffer of complete spans for one process (see TRACER)."""
+
+    def __init__(self, process_name="main"):
+        self.process_name = process_name
+        self.enabled = False
+        self._events = deque(maxlen=TRACE_CAPACITY)
+        self._threads = {}              # thread ident → name
+
+    def enable(self, capacity=TRACE_CAPACITY):
+        if self._events.maxlen != capacity:
+            self._events = deque(self._events, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def complete(self, name, cat, start, end, args=None):
+        """Record a span from perf_counter() `start` to `end`."""
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self._events.append((name, cat, start, end - start, tid, args))
+
+    def span(self, name, cat, args=None):
+        """Context manager recording its body as one span (a shared no-op when disabled)."""
+        return _Span(self, name, cat, args) if self.enabled else _NULL_SPAN
+
+    def dump(self):
+        """Picklable copy of the buffer, e.g. to send from the acquisition process."""
+        return {"pid": os.getpid(), "process": self.process_name, "threads": dict(self._threads),
+                "events": list(self._events)}
+
+    def export(self, path, *others):
+        """
+        Write the buffer (plus other processes' dump()s) as trace-event JSON;
+        returns the number of spans written.
+        """
+        written = 0
+        with open(path, "w") as f:
+            f.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+            first = True
+            for part in (self.dump(),) + others:
+                pid = part["pid"]
+                meta = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": part["process"]}}]
+                meta += [{"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}}
+                         for tid, name in part["threads"].items()]
+                for event in meta:
+                    f.write(("" if first else ",\n") + json.dumps(event))
+                    first = False
+                for name, cat, start, dur, tid, args in part["events"]:
+                    event = {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                             "ts": round(start * 1e6, 3), "dur": round(dur * 1e6, 3)}
+                    if args:
+                        event["args"] = args
+                    f.write(("" if first else ",\n") + json.dumps(event, default=str))
+                    first = False
+                    written += 1
+            f.write("\n]}\n")
+        return written
+
+
+TRACER = Tracer()
@@ -0,0 +1,172 @@
+"""
+Trip computer: fuel used, distance, average economy and idle fuel.
+
+Speed (km/h) and MAF (g/s) are integrated over the real sample timestamps
+with the trapezoid rule. Fuel flow is MAF / (AFR * fuel density), the same
+model as OBDBackendCore._calculate_fuel_consumption. Intervals longer than
+`max_gap` (a dropped link, a paused log) are not integrated, and an interval
+counts as idle when the car stood still at both ends.
+
+TripComputer works sample by sample on the live stream; summarize_arrays()
+does the same arithmetic over whole columns, vectorized with NumPy when it
+is installed, so a multi-hour log summarises in milliseconds.
+
+Command line:
+    python -m MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trip logs/obd_log_*.trip
+"""
+import argparse
+import csv
+import math
+import os
+from array import array
+
+try:
+    import numpy as np
+except ImportError:          # pure-Python fallback below
+    np = None
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_triplog import TripLogReader, _csv_value
+
+AFR = 14.7                 # stoichiometric air/fuel ratio (petrol)
+FUEL_DENSITY = 720.0       # g/L
+IDLE_SPEED_KPH = 1.0
+MAX_GAP_S = 5.0
+_NAN = float("nan")
+
+
+def _summary(duration, moving, idle, distance, fuel, idle_fuel):
+    return {
+        "duration_s": duration,
+        "moving_s": moving,
+        "idle_s": idle,
+        "distance_km": distance,
+        "fuel_l": fuel,
+        "idle_fuel_l": idle_fuel,
+        "avg_speed_kph": distance / (moving / 3600.0) if moving > 0 else 0.0,
+        "avg_l_per_100km": fuel / distance * 100.0 if distance > 0 else None,
+    }
+
+
+class TripComputer:
+    """Incremental trip totals; add() one sample at a time, O(1)."""
+
+    __slots__ = ("afr", "fuel_density", "idle_speed", "max_gap", "_last",
+                 "duration", "moving", "idle", "distance", "fuel", "idle_fuel")
+
+    def __init__(self, afr=AFR, fuel_density=FUEL_DENSITY, idle_speed=IDLE_SPEED_KPH, max_gap=MAX_GAP_S):
+        self.afr = afr
+        self.fuel_density = fuel_density
+        self.idle_speed = idle_speed
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        self._last = None
+        self.duration = self.moving = self.idle = 0.0
+        self.distance = self.fuel = self.idle_fuel = 0.0
+
+    def add(self, t, speed_kph, maf_gps):
+        """One sample; None / NaN values leave the matching totals untouched for that interval."""
+        speed = _NAN if speed_kph is None else speed_kph
+        flow = _NAN if maf_gps is None else maf_gps / (self.afr * self.fuel_density)   # L/s
+        last, self._last = self._last, (t, speed, flow)
+        if last is None:
+            return
+        t0, s0, f0 = last
+        dt = t - t0
+        if dt <= 0 or dt > self.max_gap:
+            return
+        self.duration += dt
+        fuel = (f0 + flow) * 0.5 * dt
+        if s0 == s0 and speed == speed:
+            self.distance += (s0 + speed) * 0.5 * dt / 3600.0
+            if s0 < self.idle_speed and speed < self.idle_speed:
+                self.idle += dt
+                if fuel == fuel:
+                    self.idle_fuel += fuel
+            else:
+                self.moving += dt
+        if fuel == fuel:
+            self.fuel += fuel
+
+    def summary(self):
+        return _summary(self.duration, self.moving, self.idle, self.distance, self.fuel, self.idle_fuel)
+
+
+# ----------------------------------------------------------------------
+# WHOLE-LOG SUMMARIES
+# ----------------------------------------------------------------------
+def summarize_arrays(ts, speed_kph, maf_gps, afr=AFR, fuel_density=FUEL_DENSITY,
+                     idle_speed=IDLE_SPEED_KPH, max_gap=MAX_GAP_S):
+    """Same totals as feeding every row to TripComputer, computed column-wise."""
+    if np is None:
+        trip = TripComputer(afr, fuel_density, idle_speed, max_gap)
+        for row in zip(ts, speed_kph, maf_gps):
+            trip.add(*row)
+        return trip.summary()
+
+    t = np.asarray(ts, dtype=np.float64)
+    s = np.asarray(speed_kph, dtype=np.float64)
+    flow = np.asarray(maf_gps, dtype=np.float64) / (afr * fuel_density)
+    if len(t) < 2:
+        return _summary(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    dt = np.diff(t)
+    valid = (dt > 0) & (dt <= max_gap)
+    dt = np.where(valid, dt, 0.0)
+    fuel = (flow[1:] + flow[:-1]) * 0.5 * dt
+    fuel_ok = valid & np.isfinite(fuel)
+    speed_ok = valid & np.isfinite(s[1:]) & np.isfinite(s[:-1])
+    still = speed_ok & (s[1:] < idle_speed) & (s[:-1] < idle_speed)
+
+    distance = np.sum((s[1:] + s[:-1])[speed_ok] * 0.5 * dt[speed_ok]) / 3600.0
+    return _summary(
+        float(np.sum(dt)),
+        float(np.sum(dt[speed_ok & ~still])),
+        float(np.sum(dt[still])),
+        float(distance),
+        float(np.sum(fuel[fuel_ok])),
+        float(np.sum(fuel[fuel_ok & still])),
+    )
+
+
+def _read_columns(path, names=("timestamp", "SPEED", "MAF")):
+    """Columns of a trip log (.trip) or CSV log, in time order."""
+    if os.path.splitext(path)[1] == ".trip":
+        with TripLogReader(path) as reader:
+            out = {name: array("d") for name in names}
+            for chunk in reader.iter_chunks():
+                for name in names:
+                    out[name].extend(chunk.get(name, array("d", [_NAN]) * len(chunk[reader.columns[0]])))
+            return [out[name] for name in names]
+    cols = [array("d") for _ in names]
+    with open(path, newline="") as f:
+        for record in csv.DictReader(f):
+            row = [_csv_value(name, record.get(name)) for name in names]
+            if math.isnan(row[0]):
+                continue
+            for col, value in zip(cols, row):
+                col.append(value)
+    return cols
+
+
+def summarize_log(path, **params):
+    """Trip summary of a recorded log (see summarize_arrays for the parameters)."""
+    return summarize_arrays(*_read_columns(path), **params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trip computer summary of recorded logs")
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument("--afr", type=float, default=AFR)
+    parser.add_argument("--fuel-density", type=float, default=FUEL_DENSITY)
+    args = parser.parse_args(argv)
+    for path in args.logs:
+        s = summarize_log(path, afr=args.afr, fuel_density=args.fuel_density)
+        economy = "n/a" if s["avg_l_per_100km"] is None else f"{s['avg_l_per_100km']:.2f} L/100km"
+        print(f"[TRIP] {path}: {s['distance_km']:.2f} km in {s['duration_s'] / 60:.1f} min, "
+              f"{s['fuel_l']:.3f} L ({economy}), idle {s['idle_s'] / 60:.1f} min / {s['idle_fuel_l']:.3f} L")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Chunked, compressed trip-log format with a time index.
+
+Layout (all integers little-endian):
+    header   MAGIC | u8 codec | u32 len | JSON column list
+    chunk*   CHUNK_TAG | u32 rows | u32 payload_len | f64 t_start | f64 t_end | payload
+    index    per chunk: f64 t_start | f64 t_end | u64 offset | u32 payload_len | u32 rows
+    trailer  u64 index_offset | u32 chunk_count | INDEX_MAGIC
+
+A payload is the compressed concatenation of every column as float64.
+If the trailer is missing (recording was cut off), the reader rebuilds the
+index by walking the chunk headers.
+"""
+import argparse
+import bisect
+import csv
+import itertools
+import json
+import lzma
+import math
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_recorder import LOG_COLUMNS, GEAR_CODES
+
+MAGIC = b"EHTRIP1\0"
+INDEX_MAGIC = b"EHTRIPIX"
+CHUNK_TAG = b"CHNK"
+
+CODECS = {"zlib": 0, "lzma": 1}
+_CHUNK_HEADER = struct.Struct("<4sIIdd")
+_INDEX_ENTRY = struct.Struct("<ddQII")
+_TRAILER = struct.Struct("<QI8s")
+_NAN = float("nan")
+
+
+def _compress(codec, data):
+    return zlib.compress(data, 6) if codec == 0 else lzma.compress(data, preset=1)
+
+
+def _decompress(codec, data):
+    return zlib.decompress(data) if codec == 0 else lzma.decompress(data)
+
+
+def _to_le(col):
+    if sys.byteorder != "little":
+        col = array("d", col)
+        col.byteswap()
+    return col.tobytes()
+
+
+class TripLogWriter:
+    """Append-only writer; call close() to write the time index."""
+
+    def __init__(self, path, columns=LOG_COLUMNS, codec="zlib"):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}', expected one of {sorted(CODECS)}")
+        self.path = path
+        self.columns = tuple(columns)
+        self.codec = CODECS[codec]
+        self._index = []
+        self._f = open(path, "wb")
+        names = json.dumps(list(self.columns)).encode("utf-8")
+        self._f.write(MAGIC + struct.pack("<BI", self.codec, len(names)) + names)
+
+    def write_chunk(self, columns, rows):
+        """Write `rows` rows from column arrays (column 0 must be the timestamp)."""
+        if rows <= 0:
+            return
+        raw = b"".join(_to_le(array("d", col[:rows])) for col in columns)
+        payload = _compress(self.codec, raw)
+        t_start, t_end = columns[0][0], columns[0][rows - 1]
+        offset = self._f.tell()
+        self._f.write(_CHUNK_HEADER.pack(CHUNK_TAG, rows, len(payload), t_start, t_end))
+        self._f.write(payload)
+        self._f.flush()
+        self._index.append((t_start, t_end, offset, len(payload), rows))
+
+    def close(self):
+        if self._f is None:
+            return
+        index_offset = self._f.tell()
+        for entry in self._index:
+            self._f.write(_INDEX_ENTRY.pack(*entry))
+        self._f.write(_TRAILER.pack(index_offset, len(self._index), INDEX_MAGIC))
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TripLogReader:
+    """
+    Memory-mapped reader. Only the chunks overlapping a requested time range
+    are decompressed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a trip log")
+        codec, name_len = struct.unpack_from("<BI", self._map, len(MAGIC))
+        names_start = len(MAGIC) + 5
+        self.codec = codec
+        self.columns = tuple(json.loads(self._map[names_start:names_start + name_len].decode("utf-8")))
+        self._data_start = names_start + name_len
+        self.chunks = self._read_index()
+        self._starts = [c[0] for c in self.chunks]
+        # running max of the end times: non-decreasing even if a chunk ends before its predecessor
+        self._ends = list(itertools.accumulate((c[1] for c in self.chunks), max))
+
+    def _read_index(self):
+        size = len(self._map)
+        if size >= self._data_start + _TRAILER.size:
+            index_offset, count, magic = _TRAILER.unpack_from(self._map, size - _TRAILER.size)
+            if magic == INDEX_MAGIC:
+                return [_INDEX_ENTRY.unpack_from(self._map, index_offset + i * _INDEX_ENTRY.size)
+                        for i in range(count)]
+        return self._scan_chunks()
+
+    def _scan_chunks(self):
+        # no trailer: walk chunk headers until the data runs out
+        chunks = []
+        pos = self._data_start
+        while pos + _CHUNK_HEADER.size <= len(self._map):
+            tag, rows, length, t_start, t_end = _CHUNK_HEADER.unpack_from(self._map, pos)
+            if tag != CHUNK_TAG or pos + _CHUNK_HEADER.size + length > len(self._map):
+                break
+            chunks.append((t_start, t_end, pos, length, rows))
+            pos += _CHUNK_HEADER.size + length
+        return chunks
+
+    # ------------------------------------------------------------------
+    # QUERIES
+    # ------------------------------------------------------------------
+    def time_span(self):
+        if not self.chunks:
+            return None
+        return self.chunks[0][0], self._ends[-1]
+
+    def row_count(self):
+        return sum(c[4] for c in self.chunks)
+
+    def decode_chunk(self, i):
+        """Return the i-th chunk as {column: array('d')}."""
+        _, _, offset, length, rows = self.chunks[i]
+        start = offset + _CHUNK_HEADER.size
+        raw = _decompress(self.codec, self._map[start:start + length])
+        out = {}
+        step = rows * 8
+        for c, name in enumerate(self.columns):
+            col = array("d")
+            col.frombytes(raw[c * step:(c + 1) * step])
+            if sys.byteorder != "little":
+                col.byteswap()
+            out[name] = col
+        return out
+
+    def overlapping_chunks(self, t0, t1):
+        # chunks are written in time order: everything before `start` ended before t0,
+        # everything from `stop` on starts after t1
+        start = bisect.bisect_left(self._ends, t0)
+        stop = bisect.bisect_right(self._starts, t1)
+        return [i for i in range(start, stop) if self.chunks[i][1] >= t0]
+
+    def read_range(self, t0, t1, columns=None):
+        """Rows with t0 <= timestamp <= t1, as {column: array('d')}."""
+        names = self.columns if columns is None else tuple(columns)
+        out = {name: array("d") for name in names}
+        for i in self.overlapping_chunks(t0, t1):
+            chunk = self.decode_chunk(i)
+            ts = chunk[self.columns[0]]
+            lo = bisect.bisect_left(ts, t0)
+            hi = bisect.bisect_right(ts, t1)
+            for name in names:
+                out[name].extend(chunk[name][lo:hi])
+        return out
+
+    def iter_chunks(self):
+        for i in range(len(self.chunks)):
+            yield self.decode_chunk(i)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ----------------------------------------------------------------------
+# CSV CONVERSION
+# ----------------------------------------------------------------------
+def _csv_value(name, text):
+    if text is None or text == "":
+        return _NAN
+    if name == "GEAR":
+        return float(GEAR_CODES.index(text)) if text in GEAR_CODES else _NAN
+    try:
+        return float(text)
+    except ValueError:
+        return _NAN
+
+
+def convert_csv(csv_path, out_path=None, columns=LOG_COLUMNS, chunk_size=1000, codec="zlib"):
+    """
+    Convert an obd_log_*.csv file into a trip log. Rows without a timestamp
+    (e.g. DTC entries from the old mixed-shape logs) are skipped.
+    Returns the output path.
+    """
+    out_path = out_path or os.path.splitext(csv_path)[0] + ".trip"
+    columns = tuple(columns)
+    buf = [array("d") for _ in columns]
+
+    rows = []
+    with open(csv_path, newline="") as f:
+        for record in csv.DictReader(f):
+            ts = _csv_value("timestamp", record.get("timestamp"))
+            if math.isnan(ts):
+                continue
+            rows.append([ts] + [_csv_value(name, record.get(name)) for name in columns[1:]])
+    rows.sort(key=lambda r: r[0])
+
+    with TripLogWriter(out_path, columns, codec=codec) as writer:
+        for row in rows:
+            for col, value in zip(buf, row):
+                col.append(value)
+            if len(buf[0]) >= chunk_size:
+                writer.write_chunk(buf, len(buf[0]))
+                buf = [array("d") for _ in columns]
+        writer.write_chunk(buf, len(buf[0]))
+    return out_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trip-log tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="convert obd_log_*.csv files to trip logs")
+    conv.add_argument("csv", nargs="+")
+    conv.add_argument("--codec", choices=sorted(CODECS), default="zlib")
+    info = sub.add_parser("info", help="print the chunk index of a trip log")
+    info.add_argument("trip")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "convert":
+        for path in args.csv:
+            out = convert_csv(path, codec=args.codec)
+            print(f"[TRIPLOG] {path} → {out} ({os.path.getsize(path)} → {os.path.getsize(out)} bytes)")
+    else:
+        with TripLogReader(args.trip) as reader:
+            span = reader.time_span()
+            print(f"[TRIPLOG] {args.trip}: {reader.row_count()} rows, {len(reader.chunks)} chunks, span {span}")
+            print(f"[TRIPLOG] columns: {', '.join(reader.columns)}")
+
+
+if __name__ == "__main__":
+    main()
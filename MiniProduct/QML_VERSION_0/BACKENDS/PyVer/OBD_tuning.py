@@ -0,0 +1,217 @@
+"""
+ELM327 adapter tuning.
+
+A stock connection runs at 38400 baud, waits out the full response timeout
+after every answer and never tells the adapter how many frames to expect.
+AdapterTuner measures the round-trip time of a live request under each
+setting and keeps the fastest configuration that answered every sample:
+
+    adaptive timing   ATAT1 / ATAT2
+    response timeout  ATST (4 ms units)
+    frame hint        response count digit after the request ("010C1")
+    baud rate         ATBRD handshake (v1.2+ adapters, real UART links)
+
+Settings are stored per adapter by the caller (see CapabilityCache) and
+re-applied with a short check on the next connect, since ATZ resets them.
+"""
+import statistics
+import time
+
+TUNE_REQUEST = b"010C"               # RPM: supported everywhere, single frame
+TUNE_SAMPLES = 6
+VERIFY_SAMPLES = 3
+BAUD_CANDIDATES = (115200, 230400, 500000)
+ST_CANDIDATES = (0x19, 0x0C)         # 100 ms, 48 ms (default is 0x32 = 200 ms)
+DEFAULT_ADAPTIVE = 1
+DEFAULT_ST = 0x32
+
+
+class AdapterSettings:
+    """One adapter configuration; `rtt` is the measured median round trip in seconds."""
+
+    __slots__ = ("baudrate", "adaptive", "st", "frame_hint", "rtt")
+
+    def __init__(self, baudrate=None, adaptive=DEFAULT_ADAPTIVE, st=DEFAULT_ST, frame_hint=False, rtt=None):
+        self.baudrate = baudrate
+        self.adaptive = adaptive
+        self.st = st
+        self.frame_hint = frame_hint
+        self.rtt = rtt
+
+    def copy(self, **changes):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return AdapterSettings(**fields)
+
+    def as_dict(self):
+        return {
+            "baudrate": self.baudrate, "adaptive": self.adaptive, "st": self.st,
+            "frame_hint": self.frame_hint, "rtt_ms": None if self.rtt is None else round(self.rtt * 1000, 2),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        rtt = data.get("rtt_ms")
+        return cls(data.get("baudrate"), data.get("adaptive", DEFAULT_ADAPTIVE), data.get("st", DEFAULT_ST),
+                   bool(data.get("frame_hint")), None if rtt is None else rtt / 1000.0)
+
+    def describe(self):
+        hint = ", frame hint" if self.frame_hint else ""
+        rtt = "" if self.rtt is None else f", rtt {self.rtt * 1000:.1f} ms"
+        return f"{self.baudrate or 'default'} baud, ATAT{self.adaptive}, ATST {self.st:02X}{hint}{rtt}"
+
+
+class AdapterTuner:
+    """Runs on a connected python-obd ELM327 interface (caller holds the client lock)."""
+
+    def __init__(self, connection, samples=TUNE_SAMPLES, request=TUNE_REQUEST):
+        self.interface = connection.interface
+        self.port = getattr(self.interface, "_ELM327__port", None)
+        self.samples = samples
+        self.request = request
+        self.log = []
+        self._frames = None
+
+    # ------------------------------------------------------------------
+    # ADAPTER COMMANDS
+    # ------------------------------------------------------------------
+    def _at(self, command):
+        try:
+            messages = self.interface.send_and_parse(command) or []
+        except Exception:
+            return ""
+        return "\n".join(m.raw() for m in messages)
+
+    def identify(self):
+        return self._at(b"ATI").strip() or "unknown"
+
+    def _set(self, settings):
+        ok = "OK" in self._at(b"ATAT%d" % settings.adaptive)
+        return "OK" in self._at(b"ATST%02X" % settings.st) and ok
+
+    def _switch_baud(self, baud):
+        """ATBRD handshake: OK at the old rate, ID string at the new one, then our CR confirms."""
+        port = self.port
+        if port is None:
+            return False
+        old = port.baudrate
+        if baud == old:
+            return True
+        try:
+            port.reset_input_buffer()
+            port.write(b"ATBRD%02X\r" % round(4000000 / baud))
+            if b"OK" not in self._read_until(port, b"OK", 0.5):
+                self._read_until(port, b">", 0.2)          # "?" on adapters without ATBRD
+                return False
+            port.baudrate = baud
+            if not self._read_until(port, b"\r", 0.2).strip():
+                raise OSError("no ID string at the new baud rate")
+            port.write(b"\r")
+            if b"OK" in self._read_until(port, b">", 0.5):
+                return True
+        except Exception as e:
+            self.log.append(f"[OBD-TUNE] {baud} baud failed: {e}")
+        try:
+            # the adapter falls back on its own when the handshake isn't confirmed
+            port.baudrate = old
+            port.reset_input_buffer()
+        except Exception:
+            pass
+        return False
+
+    @staticmethod
+    def _read_until(port, marker, timeout):
+        buf = bytearray()
+        end = time.monotonic() + timeout
+        while marker not in buf and time.monotonic() < end:
+            chunk = port.read(port.in_waiting or 1)
+            if chunk:
+                buf.extend(chunk)
+        return bytes(buf)
+
+    # ------------------------------------------------------------------
+    # MEASUREMENT
+    # ------------------------------------------------------------------
+    def measure(self, frame_hint=False, samples=None):
+        """Median round trip of the tune request, or None if any sample came back without data."""
+        request = self.request
+        if frame_hint:
+            if not self._frames:
+                return None
+            request += b"%X" % self._frames
+        times = []
+        for _ in range(samples or self.samples):
+            t = time.perf_counter()
+            try:
+                messages = self.interface.send_and_parse(request) or []
+            except Exception:
+                return None
+            elapsed = time.perf_counter() - t
+            if not any(len(m.data) > 1 and m.data[0] == 0x41 for m in messages):
+                return None
+            if not frame_hint:
+                self._frames = sum(len(m.frames) for m in messages)
+            times.append(elapsed)
+        return statistics.median(times)
+
+    # ------------------------------------------------------------------
+    # SEARCH
+    # ------------------------------------------------------------------
+    def tune(self):
+        """Greedy search, one dimension at a time; the adapter is left on the best setting."""
+        best = AdapterSettings(self.port.baudrate if self.port else None)
+        self._set(best)
+        best.rtt = self.measure()
+        if best.rtt is None:
+            self.log.append("[OBD-TUNE] No stable baseline; keeping adapter defaults.")
+            return None
+        self.log.append(f"[OBD-TUNE] Baseline: {best.describe()}")
+
+        # each candidate starts from the best so far, so the improvements stack
+        best = self._try(best, best.copy(adaptive=2))
+        for st in ST_CANDIDATES:
+            best = self._try(best, best.copy(st=st))
+
+        hinted = best.copy(frame_hint=True)
+        hinted.rtt = self.measure(frame_hint=True)
+        if hinted.rtt is not None and hinted.rtt < best.rtt:
+            best = hinted
+
+        if self.port is not None:
+            for baud in BAUD_CANDIDATES:
+                if baud <= (best.baudrate or 0):
+                    continue
+                if not self._switch_baud(baud):
+                    break                     # adapter or link can't go faster
+                rtt = self.measure(best.frame_hint)
+                if rtt is None or rtt >= best.rtt:
+                    self._switch_baud(best.baudrate)
+                    break
+                best = best.copy(baudrate=baud, rtt=rtt)
+
+        self._set(best)
+        self.log.append(f"[OBD-TUNE] Selected: {best.describe()}")
+        return best
+
+    def _try(self, best, candidate):
+        if not self._set(candidate):
+            self._set(best)
+            return best
+        candidate.rtt = self.measure(best.frame_hint)
+        if candidate.rtt is not None and candidate.rtt < best.rtt:
+            return candidate
+        self._set(best)
+        return best
+
+    def apply(self, settings):
+        """Re-apply stored settings after ATZ; False if they no longer answer reliably."""
+        self.measure(samples=1)                   # learn the frame count for the hint
+        if not self._set(settings):
+            return False
+        if settings.baudrate and self.port is not None and not self._switch_baud(settings.baudrate):
+            return False
+        rtt = self.measure(settings.frame_hint, samples=VERIFY_SAMPLES)
+        if rtt is None:
+            return False
+        settings.rtt = rtt
+        return True
@@ -0,0 +1,126 @@
+"""
+Event-loop stall watchdog.
+
+The GUI thread calls beat() from a QTimer every `interval` seconds. A
+daemon thread checks the heartbeat; when it is more than `threshold` late,
+it samples the GUI thread's Python stack with sys._current_frames() and
+keeps sampling until the loop comes back, so the report names what the
+thread was doing (e.g. _safe_query ← update_slow_metrics) rather than
+where it ended up.
+
+The detection is printed at once from the watchdog thread; the full report
+is handed to `report(seconds, lines)` from the next beat(), i.e. on the GUI
+thread, so the callback may touch the mini log and Qt objects.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+STALL_THRESHOLD_S = 0.5
+HEARTBEAT_S = 0.1
+STACK_DEPTH = 12                    # innermost frames kept per sample
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def _frame_chain(frame):
+    """Innermost-first (filename, line, function) of a stack, at most STACK_DEPTH deep."""
+    chain = []
+    while frame is not None and len(chain) < STACK_DEPTH:
+        code = frame.f_code
+        chain.append((code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    return tuple(chain)
+
+
+def _culprit(chain):
+    """Short 'inner ← outer' name of a chain, preferring this package's own frames."""
+    own = [name for filename, _, name in chain if os.path.abspath(filename).startswith(_PACKAGE_ROOT)]
+    names = own or [name for _, _, name in chain]
+    return " ← ".join(names[:3]) or "?"
+
+
+class _Stall:
+    __slots__ = ("since", "samples", "chains")
+
+    def __init__(self, since):
+        self.since = since              # monotonic time of the last beat before the stall
+        self.samples = Counter()        # culprit → times sampled
+        self.chains = {}                # culprit → first stack sampled in it
+
+
+class StallWatchdog:
+    """Reports the GUI thread's stack whenever its heartbeat is late (see module docstring)."""
+
+    def __init__(self, report, threshold=STALL_THRESHOLD_S, interval=HEARTBEAT_S, thread_id=None):
+        self.report = report
+        self.threshold = threshold
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.stalls = 0
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._stall = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="StallWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def beat(self):
+        """Heartbeat, called on the watched thread; delivers the report of a stall that just ended."""
+        now = time.monotonic()
+        with self._lock:
+            stall, self._stall = self._stall, None
+            self._last_beat = now
+        if stall is not None:
+            self.stalls += 1
+            seconds = max(0.0, now - stall.since - self.interval)
+            self.report(seconds, self._describe(seconds, stall))
+
+    @staticmethod
+    def _describe(seconds, stall):
+        culprit, hits = stall.samples.most_common(1)[0]
+        total = sum(stall.samples.values())
+        lines = [f"[STALL] GUI event loop blocked {seconds:.2f} s in {culprit} ({hits}/{total} samples)"]
+        lines += [f"    at {filename}:{line} in {name}" for filename, line, name in stall.chains[culprit]]
+        for other, n in stall.samples.most_common(3)[1:]:
+            lines.append(f"    also in {other} ({n}/{total} samples)")
+        return lines
+
+    def _watch(self):
+        poll = max(0.01, self.threshold / 4)
+        while not self._stop.wait(poll):
+            with self._lock:
+                last = self._last_beat
+            late = time.monotonic() - last - self.interval
+            if late < self.threshold:
+                continue
+            chain = _frame_chain(sys._current_frames().get(self.thread_id))
+            if not chain:
+                continue
+            culprit = _culprit(chain)
+            with self._lock:
+                if self._last_beat != last:
+                    continue            # the loop came back while we sampled
+                first = self._stall is None
+                if first:
+                    self._stall = _Stall(last)
+                self._stall.samples[culprit] += 1
+                self._stall.chains.setdefault(culprit, chain)
+            if first:
+                # printed now in case the loop never comes back; the full report follows on recovery
+                print(f"[STALL] GUI event loop late by {late:.2f} s, currently in {culprit}")
+                for filename, line, name in chain:
+                    print(f"    at {filename}:{line} in {name}")
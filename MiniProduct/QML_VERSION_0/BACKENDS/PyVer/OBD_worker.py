@@ -0,0 +1,276 @@
+import threading
+import time
+from collections import deque
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import DTC_JOB
+
+# Link states reported by ConnectionSupervisor
+LINK_DISCONNECTED = "disconnected"
+LINK_PROBING = "probing"
+LINK_CONNECTED = "connected"
+LINK_DEGRADED = "degraded"
+
+
+class TelemetrySnapshot:
+    """
+    Immutable view of the most recent acquisition cycle.
+    The worker builds a fresh instance every cycle and swaps a single
+    reference, so readers on the GUI thread never take a lock.
+    """
+
+    __slots__ = ("seq", "timestamp", "connected", "fast", "dtc", "link_state")
+
+    def __init__(self, seq=0, timestamp=0.0, connected=False, fast=None, dtc=None, link_state=LINK_DISCONNECTED):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.connected = connected
+        self.fast = fast if fast is not None else {}
+        self.dtc = dtc if dtc is not None else {}
+        self.link_state = link_state
+
+
+class StampedMessages:
+    """
+    Worker log lines, stamped with time.time() when they are queued rather
+    than when the GUI gets round to draining them. Safe to fill from one
+    thread and drain from another (deque append / popleft).
+    """
+
+    def __init__(self, maxlen=200):
+        self._lines = deque(maxlen=maxlen)
+
+    def append(self, line):
+        self._lines.append((time.time(), line))
+
+    def extend(self, lines):
+        now = time.time()
+        self._lines.extend((now, line) for line in lines)
+
+    def drain(self):
+        """Pop every queued line, oldest first: [(timestamp, line)]."""
+        lines = []
+        while self._lines:
+            lines.append(self._lines.popleft())
+        return lines
+
+
+class ConnectionSupervisor:
+    """
+    Connection state machine, stepped from the acquisition thread.
+
+        disconnected --(backoff elapsed)--> probing --(car answers)--> connected
+        connected --(empty or silent polls)--> degraded --(data again)--> connected
+        degraded --(too many empty / silent polls, status lost)--> disconnected
+
+    Failed attempts back off exponentially (initial_backoff .. max_backoff),
+    so a missing adapter costs one connect attempt every max_backoff seconds
+    instead of a blocking retry on every tick.
+    A poll the adapter did not answer at all (an ELM327 always prints at least
+    NO DATA) is a stronger signal than an empty one, hence silent_drop_after.
+    """
+
+    def __init__(self, obd_client, messages, initial_backoff=1.0, max_backoff=30.0,
+                 degraded_after=3, drop_after=8, silent_drop_after=2, clock=time.monotonic):
+        self._client = obd_client
+        self._messages = messages
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.degraded_after = degraded_after
+        self.drop_after = drop_after
+        self.silent_drop_after = silent_drop_after
+        self.clock = clock
+
+        self.state = LINK_DISCONNECTED
+        self.on_state_change = None       # called with the new state, from the worker thread
+        self.attempts = 0
+        self.backoff = initial_backoff
+        self._next_attempt = clock()      # first attempt right away
+        self._reconnect_requested = False
+
+    @property
+    def connected(self):
+        return self.state in (LINK_CONNECTED, LINK_DEGRADED)
+
+    def request_reconnect(self):
+        """Safe from any thread: the worker drops the link and retries on its next step."""
+        self._reconnect_requested = True
+
+    def time_until_next_attempt(self):
+        if self.connected:
+            return None
+        return max(0.0, self._next_attempt - self.clock())
+
+    def step(self):
+        """Advance the state machine; returns True when the link can be polled."""
+        if self._reconnect_requested:
+            self._reconnect_requested = False
+            self._drop("[OBD] Reconnect requested.")
+            self.backoff = self.initial_backoff
+            self._next_attempt = self.clock()
+        if self.connected:
+            self._check_health()
+        elif self.clock() >= self._next_attempt:
+            self._probe()
+        return self.connected
+
+    # ------------------------------------------------------------------
+    # TRANSITIONS
+    # ------------------------------------------------------------------
+    def _probe(self):
+        self._set_state(LINK_PROBING)
+        self.attempts += 1
+        self._client.disconnect()
+        self._messages.extend(self._client._connect())
+        if self._client.is_connected(max_age=0):
+            self._set_state(LINK_CONNECTED)
+            self.backoff = self.initial_backoff
+            self._messages.append(f"[OBD] Connected to OBD-II adapter (attempt {self.attempts}).")
+            self.attempts = 0
+            return
+        # adapter absent or car not answering: release the port and wait
+        self._client.disconnect()
+        self._set_state(LINK_DISCONNECTED)
+        self._next_attempt = self.clock() + self.backoff
+        self._messages.append(f"[OBD] OBD-II adapter not connected, retrying in {self.backoff:.0f}s.")
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+
+    def _check_health(self):
+        empty = self._client.consecutive_empty_polls
+        silent = self._client.consecutive_silent_polls
+        if not self._client.is_connected():
+            self._drop("[OBD] Link lost.")
+        elif silent >= self.silent_drop_after:
+            self._drop(f"[OBD] Adapter silent for {silent} polls, reconnecting.")
+        elif empty >= self.drop_after:
+            self._drop(f"[OBD] No data for {empty} polls, reconnecting.")
+        elif silent or empty >= self.degraded_after:
+            if self.state != LINK_DEGRADED:
+                self._messages.append(f"[OBD] Link degraded ({empty} empty polls).")
+            self._set_state(LINK_DEGRADED)
+        elif self.state == LINK_DEGRADED:
+            self._messages.append("[OBD] Link recovered.")
+            self._set_state(LINK_CONNECTED)
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            if self.on_state_change:
+                self.on_state_change(state)
+
+    def _drop(self, reason):
+        if self.state == LINK_DISCONNECTED:
+            return
+        self._messages.append(reason)
+        self._client.disconnect()
+        self._set_state(LINK_DISCONNECTED)
+        self._next_attempt = self.clock() + self.backoff
+
+
+class OBDAcquisitionWorker(threading.Thread):
+    """
+    Background thread that owns the OBD connection.
+    All blocking serial I/O (connect, PID queries, DTC reads) happens here,
+    paced by the client's PID scheduler and the ConnectionSupervisor; the
+    GUI only calls latest(), drain_messages() and drain_samples().
+    `on_publish` (optional) receives every new snapshot on the worker thread,
+    with a flag telling whether it carries a new sample or only a state change.
+    """
+
+    def __init__(self, obd_client, idle_interval=0.1, **supervisor_options):
+        super().__init__(name="OBDAcquisition", daemon=True)
+        self._client = obd_client
+        self.idle_interval = idle_interval
+
+        self._stop_event = threading.Event()
+        self._snapshot = TelemetrySnapshot()
+        self._messages = StampedMessages()
+        self._samples = deque(maxlen=512)       # published samples not yet drained
+        self.on_publish = None
+        self.supervisor = ConnectionSupervisor(obd_client, self._messages, **supervisor_options)
+        # state changes go out immediately, even in the middle of a slow connect
+        self.supervisor.on_state_change = lambda state: self._publish(sample=False)
+
+    # ------------------------------------------------------------------
+    # GUI-SIDE API (non-blocking)
+    # ------------------------------------------------------------------
+    def latest(self):
+        """Return the newest published snapshot (never blocks)."""
+        return self._snapshot
+
+    def drain_messages(self):
+        """Pop all log lines produced by the worker since the last call: [(timestamp, line)]."""
+        return self._messages.drain()
+
+    def drain_samples(self):
+        """Pop every sample published since the last call, oldest first: [(timestamp, fast data)]."""
+        samples = []
+        while self._samples:
+            samples.append(self._samples.popleft())
+        return samples
+
+    def diagnostics(self):
+        """The client's query latency histograms and throughput."""
+        return self._client.get_diagnostics()
+
+    def trace_dump(self, timeout=None):
+        """None: this thread's spans already go to the process's TRACER."""
+        return None
+
+    def request_reconnect(self):
+        self.supervisor.request_reconnect()
+
+    def start_logging(self):
+        self._client.start_logging()
+
+    def stop_logging(self):
+        self._client.stop_logging()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    # ------------------------------------------------------------------
+    # WORKER LOOP
+    # ------------------------------------------------------------------
+    def _publish(self, sample=True):
+        supervisor = self.supervisor
+        self._snapshot = snapshot = TelemetrySnapshot(
+            self._snapshot.seq + 1, time.time(), supervisor.connected,
+            self._client.latest_fast_data(), self._client.latest_dtc_codes(),
+            supervisor.state,
+        )
+        if sample:
+            self._samples.append((snapshot.timestamp, snapshot.fast))
+        if self.on_publish:
+            self.on_publish(snapshot, sample)
+
+    def _poll(self):
+        refreshed = self._client.poll_scheduled()
+        if refreshed:
+            # a DTC-only poll refreshes the snapshot but read no new sample
+            self._publish(sample=bool(refreshed - {DTC_JOB}))
+
+    def run(self):
+        supervisor = self.supervisor
+        try:
+            while not self._stop_event.is_set():
+                connected = False
+                try:
+                    connected = supervisor.step()
+                    if connected:
+                        self._poll()
+                        self._client.refresh_snapshot_step()    # one snapshot command, only if it fits the gap
+                except Exception as e:
+                    self._messages.append(f"[OBD] Acquisition error: {e}")
+
+                if connected:
+                    wait = self._client.time_until_next_poll()
+                else:
+                    wait = supervisor.time_until_next_attempt()
+                self._stop_event.wait(self.idle_interval if wait is None else min(wait, self.idle_interval))
+        finally:
+            try:
+                self._client.close()
+            except Exception as e:
+                self._messages.append(f"[OBD] Close failed: {e}")
@@ -10,6 +10,16 @@ Item {
     property var navigator
     property var carMetrics
 
+    // graphs start from the backend's history instead of empty
+    Component.onCompleted: {
+        if (!carMetrics)
+            return
+        speedGraph.load(carMetrics.seriesPoints("speed", "minute", speedGraph.maxSamples))
+        fuelGraph.load(carMetrics.seriesPoints("fuel", "minute", fuelGraph.maxSamples))
+        const history = carMetrics.logSince(0)
+        logPanel.appendLines(history.first, history.lines)
+    }
+
     Rectangle { anchors.fill: parent; color: "#101010" }
 
     // === Top bar ===
@@ -43,6 +53,130 @@ Item {
                 font.bold: true
                 font.pixelSize: 20
             }
+
+            Button {
+                text: diagPanel.visible ? "Close Timings" : "Timings"
+                onClicked: diagPanel.visible = !diagPanel.visible
+            }
+        }
+    }
+
+    // === TIMINGS (instrumentation, read once a second while open) ===
+    Rectangle {
+        id: diagPanel
+        visible: false
+        z: 10
+        anchors.top: topBar.bottom
+        anchors.left: parent.left
+        anchors.right: parent.right
+        anchors.bottom: parent.bottom
+        anchors.margins: 10
+        color: "#181818"
+        radius: 8
+        border.color: "#333"
+
+        property var diag: visible && carMetrics ? carMetrics.diagnostics : ({})
+        property var frontend: diag.frontend || ({})
+        property string dumpPath: ""
+
+        function fmt(h) {
+            if (!h || !h.count)
+                return "—"
+            return h.p50_ms.toFixed(2) + " / " + h.p95_ms.toFixed(2) + " / " + h.max_ms.toFixed(2)
+        }
+
+        Flickable {
+            anchors.fill: parent
+            anchors.margins: 10
+            contentHeight: diagColumn.height
+            clip: true
+
+            Column {
+                id: diagColumn
+                width: parent.width
+                spacing: 6
+
+                Row {
+                    spacing: 20
+                    Label {
+                        text: "Timings  (p50 / p95 / max ms)"
+                        color: "white"
+                        font.bold: true
+                        font.pixelSize: 16
+                        anchors.verticalCenter: parent.verticalCenter
+                    }
+                    Button {
+                        text: "Dump JSON"
+                        onClicked: diagPanel.dumpPath = carMetrics.dumpDiagnostics("")
+                    }
+                    Label {
+                        text: diagPanel.dumpPath
+                        color: "#888"
+                        font.pixelSize: 12
+                        anchors.verticalCenter: parent.verticalCenter
+                    }
+                }
+
+                Label {
+                    text: "Timer slots"
+                    color: "#00ff66"
+                    font.pixelSize: 14
+                }
+                Repeater {
+                    model: Object.keys(diagPanel.frontend.slots || {})
+                    delegate: Text {
+                        property var slot: diagPanel.frontend.slots[modelData]
+                        text: modelData + "   run " + diagPanel.fmt(slot.runtime)
+                              + "   late " + diagPanel.fmt(slot.lateness)
+                              + "   jitter " + slot.jitter_ms.toFixed(2)
+                              + "   overruns " + slot.overruns
+                        color: slot.overruns > 0 ? "#ffaa00" : "white"
+                        font.family: "monospace"
+                        font.pixelSize: 13
+                    }
+                }
+
+                Label {
+                    text: "Signals per second"
+                    color: "#00ff66"
+                    font.pixelSize: 14
+                }
+                Text {
+                    text: Object.keys(diagPanel.frontend.rates || {}).map(function(name) {
+                        return name + " " + diagPanel.frontend.rates[name].toFixed(1)
+                    }).join("    ")
+                    color: "white"
+                    font.family: "monospace"
+                    font.pixelSize: 13
+                    width: parent.width
+                    wrapMode: Text.WordWrap
+                }
+
+                Label {
+                    text: "Query latency"
+                    color: "#00ff66"
+                    font.pixelSize: 14
+                }
+                Repeater {
+                    model: Object.keys(diagPanel.diag.query_latency || {})
+                    delegate: Text {
+                        property var h: diagPanel.diag.query_latency[modelData]
+                        text: modelData + "   " + diagPanel.fmt(h) + "   n=" + h.count
+                        color: "white"
+                        font.family: "monospace"
+                        font.pixelSize: 13
+                    }
+                }
+                Text {
+                    property var t: diagPanel.diag.throughput || ({})
+                    visible: t.samples_per_sec !== undefined
+                    text: "throughput " + t.samples_per_sec + " samples/s, " + t.round_trips_per_sec
+                          + " round trips/s" + (t.batching ? " (batched)" : "")
+                    color: "#888"
+                    font.family: "monospace"
+                    font.pixelSize: 13
+                }
+            }
         }
     }
 
@@ -195,6 +329,8 @@ Item {
                 property int pageSize: 10
                 property int currentPage: 1
                 property var logData: []
+                property int maxLines: 100
+                property int lastSeq: 0         // sequence number of the newest line shown
                 property int totalItems: logData.length
                 property int totalPages: Math.max(1, Math.ceil(totalItems / pageSize))
 
@@ -203,6 +339,18 @@ Item {
                     return logData.slice(start, start + pageSize)
                 }
 
+                // lines[i] has sequence number firstSeq + i; anything already shown is skipped
+                function appendLines(firstSeq, lines) {
+                    const skip = Math.max(0, lastSeq + 1 - firstSeq)
+                    if (!lines || skip >= lines.length)
+                        return
+                    let data = logData.concat(lines.slice(skip))
+                    if (data.length > maxLines)
+                        data = data.slice(data.length - maxLines)
+                    logData = data
+                    lastSeq = firstSeq + lines.length - 1
+                }
+
                 Column {
                     anchors.fill: parent
                     anchors.margins: 10
@@ -373,36 +521,18 @@ Item {
         }
 
         // Mini logger
-        function onMiniLoggerChanged(lines) {
-            if (!lines || lines.length === 0)
-                return
-
-            // Append new lines only if newer than existing ones
-            let current = logPanel.logData
-            let newLines = []
-
-            for (let i = 0; i < lines.length; i++) {
-                if (current.indexOf(lines[i]) === -1)
-                    newLines.push(lines[i])
-            }
-
-            if (newLines.length > 0)
-                logPanel.logData = current.concat(newLines)
-
+        function onMiniLoggerChanged(firstSeq, lines) {
             // Don't change currentPage automatically
-            logPanel.totalItems = logPanel.logData.length
-            logPanel.totalPages = Math.max(1, Math.ceil(logPanel.totalItems / logPanel.pageSize))
+            logPanel.appendLines(firstSeq, lines)
         }
 
 
-        // Live graphs
-        function onSpeedSeriesChanged(points) {
-            if (points && points.length > 0)
-                speedGraph.value = points[points.length - 1]
-        }
-        function onFuelSeriesChanged(points) {
-            if (points && points.length > 0)
-                fuelGraph.value = points[points.length - 1]
+        // Live graphs: frames carry only the points added since the last frame
+        function onFrameChanged(frame) {
+            if (frame.speedPoints)
+                speedGraph.append(frame.speedPoints)
+            if (frame.fuelPoints)
+                fuelGraph.append(frame.fuelPoints)
         }
     }
 }
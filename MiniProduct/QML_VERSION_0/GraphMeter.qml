@@ -20,14 +20,23 @@ Item {
     property var values: []
     property real displayedValue: 0
 
-    onValueChanged: {
-        const v = Math.min(value, maxValue)
-        values.push(v)
+    onValueChanged: append([value])
+
+    // Add points in order (repeated values included, unlike setting `value`)
+    function append(points) {
+        for (let i = 0; i < points.length; i++)
+            values.push(Math.min(points[i], maxValue))
         if (values.length > maxSamples)
-            values.shift()
+            values.splice(0, values.length - maxSamples)
         canvas.requestPaint()
     }
 
+    // Replace the whole history (e.g. with the backend's series when the page opens)
+    function load(points) {
+        values = []
+        append(points)
+    }
+
     Rectangle {
         anchors.fill: parent
         radius: 8
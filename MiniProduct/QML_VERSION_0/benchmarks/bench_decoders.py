@@ -0,0 +1,66 @@
+"""
+Fast-path decoders vs python-obd's pint decoding for the hot PIDs.
+
+Run from the repository root:
+    python -m MiniProduct.QML_VERSION_0.benchmarks.bench_decoders
+"""
+import sys
+import time
+
+import obd
+from obd.protocols import ISO_15765_4_11bit_500k
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import decode_fast
+
+# single-frame CAN responses, as an ELM327 with headers on would return them
+SAMPLE_RESPONSES = {
+    obd.commands.RPM: "7E8 04 41 0C 1A F8",
+    obd.commands.SPEED: "7E8 03 41 0D 32",
+    obd.commands.THROTTLE_POS: "7E8 03 41 11 40",
+    obd.commands.ENGINE_LOAD: "7E8 03 41 04 80",
+    obd.commands.MAF: "7E8 04 41 10 01 90",
+    obd.commands.COOLANT_TEMP: "7E8 03 41 05 7B",
+    obd.commands.CONTROL_MODULE_VOLTAGE: "7E8 04 41 42 30 39",
+}
+
+
+def _messages():
+    protocol = ISO_15765_4_11bit_500k(["7E8 06 41 00 BE 3F A8 13"])
+    return {cmd: protocol([line]) for cmd, line in SAMPLE_RESPONSES.items()}
+
+
+def _time_per_call(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def run(n=20000):
+    """Return one result row per PID: pint and fast-path cost in µs, plus speedup."""
+    rows = []
+    for cmd, messages in _messages().items():
+        data = bytes(messages[0].data)
+        pid = cmd.pid
+
+        pint_value = cmd(messages).value.magnitude
+        fast_value = decode_fast(pid, data[2:])
+        if abs(pint_value - fast_value) > 1e-9:
+            raise AssertionError(f"{cmd.name}: fast path {fast_value} != pint {pint_value}")
+
+        pint_s = _time_per_call(lambda: cmd(messages).value.magnitude, n)
+        fast_s = _time_per_call(lambda: decode_fast(pid, data[2:]), n)
+        rows.append({
+            "pid": cmd.name,
+            "pint_us": round(pint_s * 1e6, 3),
+            "fast_us": round(fast_s * 1e6, 3),
+            "speedup": round(pint_s / fast_s, 1),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'PID':<24}{'pint µs':>10}{'fast µs':>10}{'speedup':>10}")
+    for row in run(n):
+        print(f"{row['pid']:<24}{row['pint_us']:>10}{row['fast_us']:>10}{row['speedup']:>9}x")
@@ -0,0 +1,97 @@
+"""
+End-to-end throughput of OBDBackendCore against the pty ELM327 emulator,
+through python-obd's real serial stack (Linux / macOS).
+
+Run from the repository root:
+    python -m MiniProduct.QML_VERSION_0.benchmarks.bench_elm327 [--latency 0.03] [--seconds 5]
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_emulator import ELM327Emulator
+
+
+def _percentiles(samples, points=(50, 95, 99)):
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    return {f"p{p}": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] * 1000, 2) for p in points}
+
+
+def _measure_fast_data(client, seconds):
+    latencies = []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        t = time.perf_counter()
+        client.get_fast_data()
+        latencies.append(time.perf_counter() - t)
+    stats = client.get_throughput_stats()
+    return {
+        "calls_per_sec": round(len(latencies) / seconds, 2),
+        "samples_per_sec": stats["samples_per_sec"],
+        "queries_per_sec": stats["round_trips_per_sec"],
+        "latency_ms": _percentiles(latencies),
+    }
+
+
+def run(latency=0.03, jitter=0.01, seconds=5.0, no_data_rate=0.0, timeout_rate=0.0, bus_error_rate=0.0,
+        elm_timing=False, auto_tune=True):
+    emu = ELM327Emulator(latency=latency, jitter=jitter, no_data_rate=no_data_rate,
+                         timeout_rate=timeout_rate, bus_error_rate=bus_error_rate, elm_timing=elm_timing)
+    port = emu.start()
+    results = {"latency_s": latency, "jitter_s": jitter}
+    cache_dir = tempfile.TemporaryDirectory()
+    try:
+        # fresh capability cache: connect_s is a cold start, reconnect_s a known vehicle
+        client = OBDBackendCore(port=port, timeout=max(0.2, latency * 4), auto_tune=auto_tune,
+                                capability_cache=os.path.join(cache_dir.name, "capabilities.json"))
+        t = time.perf_counter()
+        client._connect()
+        results["connect_s"] = round(time.perf_counter() - t, 3)
+        if not client.is_connected():
+            raise RuntimeError(f"Could not connect to the emulator on {port}")
+        if client.adapter_settings:
+            results["adapter_settings"] = client.adapter_settings.as_dict()
+
+        results["fast_data_batched"] = _measure_fast_data(client, seconds)
+        client.batch_queries = False
+        client._round_trips.clear()
+        results["fast_data_single"] = _measure_fast_data(client, seconds)
+
+        t = time.perf_counter()
+        client.get_dtc_codes()
+        results["dtc_s"] = round(time.perf_counter() - t, 3)
+
+        t = time.perf_counter()
+        client.close()
+        client.reconnect()
+        results["reconnect_s"] = round(time.perf_counter() - t, 3)
+        results["reconnected"] = bool(client.is_connected())
+        client.close()
+    finally:
+        emu.stop()
+        cache_dir.cleanup()
+    results["emulator_requests"] = emu.requests
+    results["injected_faults"] = emu.faults
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--no-data-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--bus-error-rate", type=float, default=0.0)
+    parser.add_argument("--elm-timing", action="store_true", help="emulate baud rate and ELM327 response timeouts")
+    parser.add_argument("--no-tune", action="store_true", help="skip the adapter tuning pass")
+    args = parser.parse_args()
+    logging.getLogger("obd").setLevel(logging.CRITICAL)
+    print(json.dumps(run(args.latency, args.jitter, args.seconds, args.no_data_rate,
+                         args.timeout_rate, args.bus_error_rate, args.elm_timing, not args.no_tune), indent=2))
@@ -0,0 +1,60 @@
+"""
+Trip computer over a synthetic multi-hour log: vectorized summary vs the
+per-sample TripComputer loop (both give the same totals).
+
+Run from the repository root:
+    python -m MiniProduct.QML_VERSION_0.benchmarks.bench_trip [hours]
+"""
+import math
+import sys
+import time
+from array import array
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer import OBD_trip
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trip import TripComputer, summarize_arrays
+
+
+def synthetic_trip(hours, rate_hz=20.0):
+    """Speed / MAF columns with stop-and-go phases and a few link gaps."""
+    n = int(hours * 3600 * rate_hz)
+    ts, speed, maf = array("d"), array("d"), array("d")
+    t = 0.0
+    for i in range(n):
+        t += 1.0 / rate_hz + (30.0 if i and i % 100000 == 0 else 0.0)
+        s = max(0.0, 60 + 60 * math.sin(i / 20000)) if (i // 5000) % 4 else 0.0
+        ts.append(t)
+        speed.append(s)
+        maf.append(3 + s / 10)
+    return ts, speed, maf
+
+
+def run(hours=3.0):
+    ts, speed, maf = synthetic_trip(hours)
+
+    t = time.perf_counter()
+    trip = TripComputer()
+    for row in zip(ts, speed, maf):
+        trip.add(*row)
+    loop_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    summary = summarize_arrays(ts, speed, maf)
+    vector_s = time.perf_counter() - t
+
+    if not math.isclose(summary["fuel_l"], trip.summary()["fuel_l"], rel_tol=1e-9):
+        raise AssertionError("vectorized and incremental fuel totals differ")
+    return {
+        "rows": len(ts),
+        "numpy": OBD_trip.np is not None,
+        "loop_ms": round(loop_s * 1000, 1),
+        "vectorized_ms": round(vector_s * 1000, 1),
+        "speedup": round(loop_s / vector_s, 1),
+        "distance_km": round(summary["distance_km"], 2),
+        "fuel_l": round(summary["fuel_l"], 3),
+    }
+
+
+if __name__ == "__main__":
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    for key, value in run(hours).items():
+        print(f"{key:<16}{value}")
@@ -0,0 +1,146 @@
+"""
+Fakes for the benchmark suite: an ELM327 connection that answers instantly,
+an acquisition worker that hands out canned samples, and a signal receiver.
+They remove I/O and threads from the measurement, so only our own code is timed.
+"""
+import contextlib
+import io
+import os
+
+import obd
+from obd.protocols import ECU
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import TelemetrySnapshot, LINK_CONNECTED
+
+# mode 01 payloads (after the PID byte) the fake ECU answers with
+PAYLOADS = {
+    0x0C: b"\x1a\xf8",      # RPM 1726
+    0x0D: b"\x32",          # SPEED 50
+    0x11: b"\x40",          # THROTTLE_POS 25 %
+    0x04: b"\x80",          # ENGINE_LOAD 50 %
+    0x10: b"\x01\x90",      # MAF 4 g/s
+    0x05: b"\x7b",          # COOLANT_TEMP 83
+    0x42: b"\x30\x39",      # CONTROL_MODULE_VOLTAGE 12.3
+}
+
+FAST_SAMPLE = {
+    "RPM": 1726.0, "SPEED": 50.0, "THROTTLE_POS": 25.1, "ENGINE_LOAD": 50.2, "MAF": 4.0,
+    "COOLANT_TEMP": 83.0, "VOLTAGE": 12.3, "FUEL_CONSUMPTION": 4.3, "STEERING_ANGLE": 0.0, "GEAR": "N",
+    "BRAKE_PRESSURE": 0.0, "ACCELERATOR_PEDAL": 0.0, "WHEEL_FL": 0.0, "WHEEL_FR": 0.0, "WHEEL_RL": 0.0,
+    "WHEEL_RR": 0.0,
+}
+
+
+class FakeMessage:
+    __slots__ = ("data", "ecu", "frames")
+
+    def __init__(self, data):
+        self.data = bytearray(data)
+        self.ecu = ECU.ENGINE
+        self.frames = [None] * (1 + max(0, len(data) - 6) // 7)   # ISO-TP frame count
+
+
+class FakeInterface:
+    """ELM327 interface answering raw mode 01 requests (single or multi-PID) from payload()."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def payload(self, pid):
+        """Data bytes for one PID, None if the ECU does not support it."""
+        return PAYLOADS.get(pid)
+
+    def send_and_parse(self, request):
+        self.requests += 1
+        body = bytes(request)[2:]
+        data = bytearray(b"\x41")
+        for i in range(0, len(body) - 1, 2):
+            pid = int(body[i:i + 2], 16)
+            payload = self.payload(pid)
+            if payload is None:
+                return []
+            data.append(pid)
+            data += payload
+        return [FakeMessage(data)]
+
+
+class FakeConnection:
+    """Stands in for obd.OBD (pass `FakeConnection` as OBDBackendCore's connection_factory)."""
+
+    def __init__(self, interface=None):
+        self.interface = interface or FakeInterface()
+        self.supported_commands = []
+
+    def status(self):
+        return obd.OBDStatus.CAR_CONNECTED
+
+    def protocol_id(self):
+        return "6"
+
+    def protocol_name(self):
+        return "ISO 15765-4 (CAN 11/500)"
+
+    def query(self, cmd, force=False):
+        return obd.OBDResponse()
+
+    def close(self):
+        pass
+
+
+class FakeWorker:
+    """Acquisition worker replacement: every drain returns `per_tick` samples of FAST_SAMPLE."""
+
+    def __init__(self, per_tick=2):
+        self.per_tick = per_tick
+        self.t = 0.0
+        self._snapshot = TelemetrySnapshot(seq=1, timestamp=0.0, connected=True, fast=dict(FAST_SAMPLE), dtc={},
+                                           link_state=LINK_CONNECTED)
+
+    def latest(self):
+        return self._snapshot
+
+    def drain_samples(self):
+        samples = []
+        for _ in range(self.per_tick):
+            self.t += 0.05
+            samples.append((self.t, FAST_SAMPLE))
+        return samples
+
+    def drain_messages(self):
+        return []
+
+    def diagnostics(self):
+        return {}
+
+    def trace_dump(self, timeout=None):
+        return None
+
+    def stop(self, timeout=2.0):
+        pass
+
+
+def detached_car_metrics(worker):
+    """
+    CarMetrics with its timers stopped and its acquisition replaced by `worker`;
+    the caller runs the slots. Needs a QCoreApplication.
+    """
+    from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.CarMetrics import CarMetrics
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        metrics = CarMetrics(colours_filename=os.devnull, replay_path=os.devnull)
+        for timer in (metrics.fast_timer, metrics.slow_timer, metrics.dtc_timer, metrics.logger_timer):
+            timer.stop()
+        metrics._pipeline.stop()
+    metrics._pipeline.worker = worker
+    metrics.starting = False
+    return metrics
+
+
+class SignalSink:
+    """Receiver slot for a Qt signal, so emission pays the argument conversion QML would."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
@@ -0,0 +1,276 @@
+"""
+Hot-path benchmark suite with a stored baseline.
+
+Every case is timed against fakes (see fakes.py), so no adapter, event loop
+or QML scene is needed. Results are microseconds per operation, written as
+JSON, and compared with baseline.json: a case more than --tolerance slower
+than its baseline is a regression and the run exits with status 1.
+
+Run from the repository root:
+    python -m MiniProduct.QML_VERSION_0.benchmarks.suite [--only obd,music] [--json results.json]
+    python -m MiniProduct.QML_VERSION_0.benchmarks.suite --update-baseline
+
+Baselines are machine specific; refresh baseline.json when the reference
+machine changes (its "meta" block records where it was taken).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_series import TieredSeries, lttb
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import (FAST_SAMPLE, FakeConnection, FakeWorker, SignalSink,
+                                                      detached_car_metrics)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.5             # 50 % slower than the baseline fails; timings on shared machines are noisy
+REPEATS = 5
+
+
+def _per_op(fn, number, repeat=REPEATS):
+    """
+    Time per call of fn() in microseconds: the fastest of `repeat` runs after a
+    warm-up call (background load only ever slows a run down, as with timeit).
+    """
+    fn()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - start) / number)
+    return round(min(runs) * 1e6, 3)
+
+
+def _fake_client(**options):
+    client = OBDBackendCore(connection_factory=FakeConnection, capability_cache=None, auto_tune=False, **options)
+    client._connect()
+    return client
+
+
+# ----------------------------------------------------------------------
+# CASES (each returns {metric: µs per operation})
+# ----------------------------------------------------------------------
+def bench_obd():
+    """get_fast_data through query_batch against an instant ECU, batched and one PID per request."""
+    batched = _fake_client()
+    single = _fake_client(batch_queries=False)
+    return {
+        "obd.get_fast_data.batched": _per_op(batched.get_fast_data, 5000),
+        "obd.get_fast_data.single": _per_op(single.get_fast_data, 2000),
+    }
+
+
+def bench_carmetrics():
+    """CarMetrics timer slots with a fake worker and a receiver on every signal."""
+    from PyQt6.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication([])     # noqa: F841 (QTimers need one)
+    metrics = detached_car_metrics(FakeWorker(per_tick=2))
+    sink = SignalSink()
+    for signal in (metrics.frameChanged, metrics.diagnosticsChanged, metrics.connectionStateChanged):
+        signal.connect(sink)
+    results = {
+        "carmetrics.update_fast_metrics": _per_op(metrics.update_fast_metrics, 5000),
+        "carmetrics.update_slow_metrics": _per_op(metrics.update_slow_metrics, 2000),
+    }
+    metrics._pipeline.worker = None
+    return results
+
+
+def bench_series():
+    """Graph series: per-sample append into the tiers, and LTTB reduction for display."""
+    series = TieredSeries()
+    clock = [0.0]
+
+    def append():
+        clock[0] += 0.1
+        series.append(clock[0], 50.0 + (clock[0] % 7))
+
+    results = {"series.append": _per_op(append, 50000)}     # 50k samples = 83 min at 10 Hz, fills the hour tier
+    results["series.points.hour_100"] = _per_op(lambda: series.points("hour", 100), 2000)
+    ts = [i * 0.1 for i in range(100000)]
+    vs = [50.0 + (i % 70) for i in range(100000)]
+    results["series.lttb.100k_to_500"] = _per_op(lambda: lttb(ts, vs, 500), 5, repeat=3)
+    return results
+
+
+def bench_logging():
+    """Per-row cost of _append_log_entry, and of getting the row onto disk (final flush + writer thread)."""
+    results = {}
+    rows = 20000
+    for log_format in ("csv", "trip"):
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            client = _fake_client(log_file_path=os.path.join(tmp, f"bench.{log_format}"), log_format=log_format)
+            client.start_logging()
+            append = client._append_log_entry
+            start = time.perf_counter()
+            for _ in range(rows):
+                append(FAST_SAMPLE)
+            appended = time.perf_counter()
+            client.stop_logging()           # flushes and joins the writer: everything is on disk
+            done = time.perf_counter()
+        results[f"logging.append_log_entry.{log_format}"] = round((appended - start) / rows * 1e6, 3)
+        results[f"logging.write_through.{log_format}"] = round((done - start) / rows * 1e6, 3)
+    return results
+
+
+def _music_tree(root, files, per_album=100):
+    """`files` empty tracks in albums of `per_album`, plus a few loose ones in the root."""
+    for a in range(files // per_album):
+        album = os.path.join(root, f"album_{a:05d}")
+        os.mkdir(album)
+        for t in range(per_album):
+            open(os.path.join(album, f"{t:03d} track.mp3"), "w").close()
+        open(os.path.join(album, "cover.jpg"), "w").close()
+    for t in range(10):
+        open(os.path.join(root, f"single_{t}.ogg"), "w").close()
+
+
+def bench_music():
+    """MusicBackend.get_music_folders over synthetic libraries of 10k and 100k tracks."""
+    from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.music_backend import MusicBackend
+
+    results = {}
+    for files in (10_000, 100_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            _music_tree(tmp, files)
+            backend = MusicBackend(tmp)
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[f"music.get_music_folders.{files // 1000}k"] = _per_op(backend.get_music_folders, 1, repeat=7)
+    return results
+
+
+def _wardrobe(boxes):
+    """A run of floor boxes with stacks of up to three boxes on top of some of them."""
+    from NAS.NasCreateFurnitures.WardrobeModel import WardrobeBox, WardrobeManager
+
+    manager = WardrobeManager()
+    manager._boxes = [WardrobeBox(i + 1) for i in range(boxes)]
+    for i, box in enumerate(manager._boxes):
+        if i % 4:
+            box.bind_to = i - 1
+        box.width_offset = (i % 5) * 10
+    return manager
+
+
+def bench_wardrobe():
+    """WardrobeManager.get_absolute_position for every box of large layouts (what the 3D view asks for)."""
+    results = {}
+    for boxes in (200, 1000):
+        manager = _wardrobe(boxes)
+
+        def layout():
+            for index in range(boxes):
+                manager.get_absolute_position(index)
+
+        results[f"wardrobe.get_absolute_position.{boxes}_boxes"] = round(_per_op(layout, max(1, 2000 // boxes)) / boxes, 3)
+    return results
+
+
+CASES = {
+    "obd": bench_obd,
+    "carmetrics": bench_carmetrics,
+    "series": bench_series,
+    "logging": bench_logging,
+    "music": bench_music,
+    "wardrobe": bench_wardrobe,
+}
+
+
+# ----------------------------------------------------------------------
+# BASELINE
+# ----------------------------------------------------------------------
+def _meta():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "machine": platform.machine(), "processor": platform.processor() or platform.machine(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Rows of (metric, baseline µs, current µs, ratio, status); status "REGRESSION" fails the run."""
+    rows = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, None, value, None, "new"))
+            continue
+        ratio = value / base if base else float("inf")
+        if ratio > 1 + tolerance:
+            status = "REGRESSION"
+        elif ratio < 1 / (1 + tolerance):
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, base, value, ratio, status))
+    return rows
+
+
+def run(only=None):
+    results = {}
+    for name, case in CASES.items():
+        if only and name not in only:
+            continue
+        print(f"[BENCH] {name} ...", file=sys.stderr)
+        results.update(case())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the hot-path benchmarks and compare with the baseline")
+    parser.add_argument("--only", default=None, help=f"comma-separated cases ({', '.join(CASES)})")
+    parser.add_argument("--json", default=None, help="write results (and the comparison) here")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before a case fails (0.5 = 50 %%)")
+    args = parser.parse_args(argv)
+
+    only = set(args.only.split(",")) if args.only else None
+    unknown = (only or set()) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    results = run(only)
+
+    if args.update_baseline:
+        stored = {}
+        if only and os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f).get("results", {})
+        stored.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": _meta(), "results": stored}, f, indent=2, sort_keys=True)
+        print(f"[BENCH] Baseline written to {args.baseline}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+    rows = compare(results, baseline, args.tolerance)
+    print(f"{'metric':<44}{'baseline µs':>14}{'current µs':>14}{'ratio':>8}  status")
+    for name, base, value, ratio, status in rows:
+        base_s = f"{base:.3f}" if base is not None else "-"
+        ratio_s = f"{ratio:.2f}" if ratio is not None else "-"
+        print(f"{name:<44}{base_s:>14}{value:>14.3f}{ratio_s:>8}  {status}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": _meta(), "tolerance": args.tolerance, "results": results,
+                       "comparison": [dict(zip(("metric", "baseline_us", "current_us", "ratio", "status"), row))
+                                      for row in rows]}, f, indent=2)
+
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"[BENCH] REGRESSION in {len(regressions)} case(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -80,6 +80,16 @@ Item {
 
     }
 
+    // Last value the backend sent for `key` (gauges loaded after it was sent start from here)
+    function frameValue(key) {
+        const frame = carMetrics ? carMetrics.frame : null
+        return frame && frame[key] !== undefined ? frame[key] : 0
+    }
+
+    function barValue(key, val) {
+        return key === "fuelConsumption" ? Math.min(val, 35) : val   // clamp for UI
+    }
+
 
 
 
@@ -299,10 +309,10 @@ Item {
                 Layout.topMargin: 150
                 Layout.leftMargin: 180
 
-                Loader { id: oilTempBox     ; sourceComponent: metricBox ; onLoaded:{ item.label="Oil Temp"    ; item.unit="°C" } }
-                Loader { id: batteryBox     ; sourceComponent: metricBox ; onLoaded:{ item.label="Battery V"   ; item.unit="V"  } }
-                Loader { id: coolantBox     ; sourceComponent: metricBox ; onLoaded:{ item.label="Coolant"     ; item.unit="°C" } }
-                Loader { id: engineLoadBox  ; sourceComponent: metricBox ; onLoaded:{ item.label="Eng Load"    ; item.unit="%"  } }
+                Loader { id: oilTempBox     ; sourceComponent: metricBox ; onLoaded:{ item.label="Oil Temp"    ; item.unit="°C" ; item.value=root.frameValue("oilTemp")    } }
+                Loader { id: batteryBox     ; sourceComponent: metricBox ; onLoaded:{ item.label="Battery V"   ; item.unit="V"  ; item.value=root.frameValue("battery")    } }
+                Loader { id: coolantBox     ; sourceComponent: metricBox ; onLoaded:{ item.label="Coolant"     ; item.unit="°C" ; item.value=root.frameValue("coolant")    } }
+                Loader { id: engineLoadBox  ; sourceComponent: metricBox ; onLoaded:{ item.label="Eng Load"    ; item.unit="%"  ; item.value=root.frameValue("engineLoad") } }
             }
 
             // Flexible empty space
@@ -320,9 +330,9 @@ Item {
 
                 Repeater {
                     model: [
-                        { label: "Throttle",  signal: "throttleChanged" },
-                        { label: "Fuel Cons", signal: "fuelConsumptionChanged" },
-                        { label: "Brakes",    signal: "brakesChanged" }
+                        { label: "Throttle",  key: "throttle" },
+                        { label: "Fuel Cons", key: "fuelConsumption" },
+                        { label: "Brakes",    key: "brakes" }
                     ]
 
                     delegate: Column {
@@ -337,7 +347,7 @@ Item {
                             onLoaded: {
                                 if (item) {
                                     // initialize value and unit
-                                    item.value = 0
+                                    item.value = root.barValue(modelData.key, root.frameValue(modelData.key))
                                     if (modelData.label === "Throttle" || modelData.label === "Brakes") {
                                         item.unit = "%"                // Throttle / Brakes
                                     } else if (modelData.label === "Fuel Cons") {
@@ -353,19 +363,10 @@ Item {
                                 id: dynConn
                                 target: carMetrics
 
-                                function onThrottleChanged(val) {
-                                    if (modelData.label === "Throttle" && dynBar.item)
-                                        dynBar.item.value = val
-                                }
-
-                                function onFuelConsumptionChanged(val) {
-                                    if (modelData.label === "Fuel Cons" && dynBar.item)
-                                        dynBar.item.value = Math.min(val, 35) // clamp for UI
-                                }
-
-                                function onBrakesChanged(val) {
-                                    if (modelData.label === "Brakes" && dynBar.item)
-                                        dynBar.item.value = val
+                                function onFrameChanged(frame) {
+                                    const val = frame[modelData.key]
+                                    if (val !== undefined && dynBar.item)
+                                        dynBar.item.value = root.barValue(modelData.key, val)
                                 }
                             }
                         }
@@ -426,6 +427,7 @@ Item {
                     if (root.fuelDesign === "graph")   return fuelGraph
                     return fuelCircular
                 }
+                onLoaded: if (item) item.value = root.frameValue("fuelLevel")
             }
 
             // --- SPEEDOMETER with overlay indicators ---
@@ -635,44 +637,34 @@ Item {
         }
 
 
-        function onSpeedChanged(val) {
-            if (speedLoader.item) speedLoader.item.value = val
-            speedLoader.speedValue = val
-        }
-
-        function onRpmChanged(val) {
-            if (rpmLoader.item) rpmLoader.item.value = val
-            rpmLoader.rpmValue = val
-        }
-
-
-        function onOilTempChanged(val) {
-            if (oilTempBox.item)
-                oilTempBox.item.value = val
-        }
-
-        function onBatteryChanged(val) {
-            if (batteryBox.item)
-                batteryBox.item.value = val
-        }
-
-        function onCoolantChanged(val) {
-            if (coolantBox.item)
-                coolantBox.item.value = val
-        }
-
-        function onFuelLevelChanged(val) {
-            if (fuelLoader.item)
-                fuelLoader.item.value = val
-        }
-
-        function onEngineLoadChanged(val) {
-            if (engineLoadBox.item)
-                engineLoadBox.item.value = val
+        // One frame per backend tick, holding only the values that changed
+        function onFrameChanged(frame) {
+            if (frame.speed !== undefined) {
+                if (speedLoader.item) speedLoader.item.value = frame.speed
+                speedLoader.speedValue = frame.speed
+            }
+            if (frame.rpm !== undefined) {
+                if (rpmLoader.item) rpmLoader.item.value = frame.rpm
+                rpmLoader.rpmValue = frame.rpm
+            }
+            if (frame.oilTemp !== undefined && oilTempBox.item)
+                oilTempBox.item.value = frame.oilTemp
+            if (frame.battery !== undefined && batteryBox.item)
+                batteryBox.item.value = frame.battery
+            if (frame.coolant !== undefined && coolantBox.item)
+                coolantBox.item.value = frame.coolant
+            if (frame.fuelLevel !== undefined && fuelLoader.item)
+                fuelLoader.item.value = frame.fuelLevel
+            if (frame.engineLoad !== undefined && engineLoadBox.item)
+                engineLoadBox.item.value = frame.engineLoad
+            if (frame.engineWarning !== undefined)
+                setEngineWarning(frame.engineWarning)
+            if (frame.generalWarning !== undefined)
+                setGeneralWarning(frame.generalWarning)
         }
 
         // === Engine Light ===
-function onEngineWarningChanged(active) {
+function setEngineWarning(active) {
     if (active) {
         engineLight.color = "yellow"
         engineIcon.color = "black"
@@ -687,7 +679,7 @@ function onEngineWarningChanged(active) {
 }
 
 // === General Warning Light ===
-function onGeneralWarningChanged(active) {
+function setGeneralWarning(active) {
     if (active) {
         warningLight.color = "yellow"
         warningIcon.color = "black"
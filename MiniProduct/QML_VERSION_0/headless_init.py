@@ -0,0 +1,83 @@
+"""
+Headless telemetry recorder: the OBD pipeline without Qt, for data collection
+on vehicles without a screen and for benchmarking without GUI overhead.
+
+Run from the repository root:
+    python -m MiniProduct.QML_VERSION_0.headless_init --port /dev/ttyUSB0 --max-rate
+    python -m MiniProduct.QML_VERSION_0.headless_init --replay logs/obd_log_x.trip --replay-speed max --no-log
+
+Logging starts once the link is up (logs/obd_log_<time>.trip unless --log is
+given) and stops cleanly on Ctrl+C / SIGTERM or after --duration seconds.
+"""
+import argparse
+import signal
+import threading
+import time
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_pipeline import TelemetryPipeline
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER
+
+
+def _status_line(pipeline, elapsed):
+    trip = pipeline.trip_summary()
+    rate = pipeline.samples / elapsed if elapsed > 0 else 0.0
+    return (f"[HEADLESS] {elapsed:7.1f} s  link={pipeline.connection_state:<12} "
+            f"samples={pipeline.samples} ({rate:.1f}/s)  "
+            f"trip {trip['distance_km']:.2f} km / {trip['fuel_l']:.3f} L")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record OBD telemetry without a GUI")
+    parser.add_argument("--port", default="COM5")
+    parser.add_argument("--replay", default=None, help="recorded trip to play back instead of an adapter")
+    parser.add_argument("--replay-speed", default="1")
+    parser.add_argument("--isolated", action="store_true", help="run acquisition and logging in a separate process")
+    parser.add_argument("--max-rate", action="store_true", help="poll the fast PIDs back to back instead of at 20 Hz")
+    parser.add_argument("--log", default=None, help="log file (default logs/obd_log_<time>.<format>)")
+    parser.add_argument("--format", choices=("trip", "csv"), default="trip")
+    parser.add_argument("--no-log", action="store_true", help="do not record, only run the pipeline")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--status", type=float, default=5.0, help="seconds between status lines (0 = none)")
+    parser.add_argument("--diagnostics", default=None, help="write timings / query latency JSON here on exit")
+    parser.add_argument("--trace", default=None, help="record a span timeline, written here (Chrome JSON) on exit")
+    args = parser.parse_args(argv)
+
+    replay_speed = args.replay_speed if args.replay_speed == "max" else float(args.replay_speed)
+    if args.trace:
+        TRACER.enable()
+    pipeline = TelemetryPipeline(port=args.port, log_file_path=args.log, replay_path=args.replay,
+                                 replay_speed=replay_speed, isolated=args.isolated,
+                                 log_format=args.format, max_rate=args.max_rate)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    if not pipeline.start():
+        return 1
+
+    start = time.monotonic()
+    next_status = [start + args.status]
+
+    def on_tick(now):
+        if not args.no_log and pipeline.connected and not pipeline.is_logging:
+            pipeline.set_logging(True)
+        if args.status and now >= next_status[0]:
+            print(_status_line(pipeline, now - start))
+            next_status[0] = now + args.status
+
+    try:
+        pipeline.run(duration=args.duration, on_tick=on_tick, should_stop=stop.is_set)
+    finally:
+        pipeline.set_logging(False)
+        pipeline.consume_samples()
+        pipeline.stop()
+    print(_status_line(pipeline, time.monotonic() - start))
+    if args.diagnostics:
+        pipeline.dump_diagnostics(args.diagnostics)
+    if args.trace:
+        pipeline.export_trace(args.trace)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,4 @@
+import argparse
 import functools
 import os
 import sys
@@ -10,6 +11,8 @@ from PyQt6.QtWidgets import QApplication
 from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.CongifBackend import ConfigBackend
 from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.music_backend import MusicBackend
 from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.CarMetrics import CarMetrics
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_watchdog import StallWatchdog, STALL_THRESHOLD_S
 
 
 # ---------------------------
@@ -25,18 +28,19 @@ def qml_logger(msg_type, context, message, log_somewhere_else_func=None):
         QtMsgType.QtInfoMsg: "[QML INFO]",
     }.get(msg_type, "[QML LOG]")
 
-    mssg = f"{prefix} {message}"
-    print(mssg)
-    if context.file:
-        mssg1 = f"    at {context.file}:{context.line}"
-        print(mssg1)
-    else:
-        mssg1 = ""
-    if log_somewhere_else_func is not None:
-        try:
-            log_somewhere_else_func(f"{mssg}  {mssg1}")
-        except Exception as e:
-            print(f"[QML LOGGER ERROR] Could not forward log: {e}")
+    with TRACER.span("qml_logger", "qml", {"type": prefix}):
+        mssg = f"{prefix} {message}"
+        print(mssg)
+        if context.file:
+            mssg1 = f"    at {context.file}:{context.line}"
+            print(mssg1)
+        else:
+            mssg1 = ""
+        if log_somewhere_else_func is not None:
+            try:
+                log_somewhere_else_func(f"{mssg}  {mssg1}")
+            except Exception as e:
+                print(f"[QML LOGGER ERROR] Could not forward log: {e}")
 
 
 # ---------------------------
@@ -58,7 +62,28 @@ if __name__ == "__main__":
 
 
     # ✅ 2. Create CarMetrics backend — it's ready to log
-    metrics = CarMetrics()
+    # optional: --replay <trip log> [--replay-speed N|max] to run without an adapter
+    # optional: --isolated to run OBD acquisition and logging in a separate process
+    # optional: --trace <file.json> to record a span timeline, written on exit (open in ui.perfetto.dev)
+    # optional: --stall-threshold <seconds> for stall reports in the logger (0 turns the watchdog off)
+    arg_parser = argparse.ArgumentParser(add_help=False)
+    arg_parser.add_argument("--replay", default=None)
+    arg_parser.add_argument("--replay-speed", default="1")
+    arg_parser.add_argument("--isolated", action="store_true")
+    arg_parser.add_argument("--trace", default=None)
+    arg_parser.add_argument("--stall-threshold", type=float, default=STALL_THRESHOLD_S)
+    cli_args, _ = arg_parser.parse_known_args(sys.argv[1:])
+    replay_speed = cli_args.replay_speed if cli_args.replay_speed == "max" else float(cli_args.replay_speed)
+    if cli_args.trace:
+        TRACER.enable()         # before CarMetrics, so an isolated acquisition process traces too
+    metrics = CarMetrics(replay_path=cli_args.replay, replay_speed=replay_speed, isolated=cli_args.isolated)
+    watchdog = None
+    if cli_args.stall_threshold > 0:
+        watchdog = StallWatchdog(metrics.report_stall, threshold=cli_args.stall_threshold)
+        app.aboutToQuit.connect(watchdog.stop)      # first: a slow shutdown is not a stall
+    if cli_args.trace:
+        app.aboutToQuit.connect(lambda: metrics.exportTrace(cli_args.trace))
+    app.aboutToQuit.connect(metrics.shutdown)
 
     # ✅ 3. Install QML logger, safely linked to metrics.log
     qml_logger_with_metrics = functools.partial(qml_logger, log_somewhere_else_func=metrics.log)
@@ -120,4 +145,11 @@ if __name__ == "__main__":
     # ✅ Optional: keep metrics updating or start fallback mode
     # QTimer.singleShot(1000, metrics.start_random_metrics)
 
+    # ✅ 6. Stall watchdog: a heartbeat on the event loop, checked from its own thread
+    if watchdog:
+        heartbeat = QTimer()
+        heartbeat.timeout.connect(watchdog.beat)
+        heartbeat.start(int(watchdog.interval * 1000))
+        watchdog.start()
+
     sys.exit(app.exec())
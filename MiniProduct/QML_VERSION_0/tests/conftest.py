@@ -0,0 +1,26 @@
+"""
+Shared fixtures. Run the suite from the repository root:
+    python -m pytest MiniProduct/QML_VERSION_0/tests
+"""
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FakeConnection
+
+
+@pytest.fixture
+def make_client():
+    """OBDBackendCore on a FakeConnection (instant ECU, see benchmarks/fakes.py), already connected."""
+    clients = []
+
+    def make(interface=None, **options):
+        options.setdefault("auto_tune", False)
+        client = OBDBackendCore(connection_factory=lambda: FakeConnection(interface), capability_cache=None,
+                                **options)
+        client._connect()
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
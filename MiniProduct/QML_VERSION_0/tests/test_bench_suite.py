@@ -0,0 +1,36 @@
+import contextlib
+import io
+import json
+
+from MiniProduct.QML_VERSION_0.benchmarks import suite
+
+
+def test_compare_flags_regressions_only_beyond_the_tolerance():
+    rows = suite.compare({"a": 1.4, "b": 1.6, "c": 0.5, "d": 2.0}, {"a": 1.0, "b": 1.0, "c": 1.0}, tolerance=0.5)
+    assert [row[4] for row in rows] == ["ok", "REGRESSION", "faster", "new"]
+
+
+def test_stored_baseline_is_readable():
+    with open(suite.BASELINE_PATH) as f:
+        stored = json.load(f)
+    assert stored["meta"]["python"] and stored["results"]
+    assert {name.split(".")[0] for name in stored["results"]} <= set(suite.CASES)
+
+
+def test_exit_status_follows_the_baseline(tmp_path, monkeypatch):
+    timings = {"fake.op": 10.0}
+    monkeypatch.setattr(suite, "CASES", {"fake": lambda: dict(timings)})
+    baseline = str(tmp_path / "baseline.json")
+    results = str(tmp_path / "results.json")
+
+    def main(*args):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return suite.main(["--baseline", baseline, *args])
+
+    assert main("--update-baseline") == 0
+    timings["fake.op"] = 12.0
+    assert main("--json", results) == 0
+    timings["fake.op"] = 20.0
+    assert main("--tolerance", "0.5") == 1
+    with open(results) as f:
+        assert json.load(f)["comparison"][0]["status"] == "ok"
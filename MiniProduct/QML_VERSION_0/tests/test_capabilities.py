@@ -0,0 +1,49 @@
+import contextlib
+import io
+import json
+import os
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_capabilities import CACHE_VERSION, CapabilityCache
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_emulator import DEFAULT_VIN, ELM327Emulator
+
+
+def test_entries_survive_a_reload(tmp_path):
+    path = str(tmp_path / "cache" / "capabilities.json")
+    cache = CapabilityCache(path)
+    cache.update("VIN1", port="/dev/ttyUSB0", protocol="6", supported=["RPM", "SPEED"])
+    cache.update_adapter("/dev/ttyUSB0|ELM327 v1.5", st=0x19)
+    reloaded = CapabilityCache(path)
+    assert reloaded.get("VIN1")["supported"] == ["RPM", "SPEED"]
+    assert reloaded.for_port("/dev/ttyUSB0")["vin"] == "VIN1"
+    assert reloaded.for_port("COM5") is None
+    assert reloaded.adapter("/dev/ttyUSB0|ELM327 v1.5")["st"] == 0x19
+
+
+@pytest.mark.parametrize("content", ("{not json", json.dumps({"version": CACHE_VERSION + 1, "vehicles": {"X": {}}})))
+def test_unreadable_or_old_caches_are_ignored(tmp_path, content):
+    path = tmp_path / "capabilities.json"
+    path.write_text(content)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert CapabilityCache(str(path)).get("X") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="the emulator needs a pseudo-terminal")
+def test_known_vehicle_skips_discovery(tmp_path):
+    path = str(tmp_path / "capabilities.json")
+    with ELM327Emulator() as emulator:
+        first = OBDBackendCore(port=emulator.port, timeout=0.5, capability_cache=path, auto_tune=False)
+        messages = first._connect()
+        assert first.vin == DEFAULT_VIN and first.connection.discovered
+        assert any("commands supported" in line for line in messages)
+        supported = set(first.connection.supported_commands)
+        first.close()                                   # saves batching / dead PIDs / latency
+
+        second = OBDBackendCore(port=emulator.port, timeout=0.5, capability_cache=path, auto_tune=False)
+        messages = second._connect()
+        assert second.is_connected() and not second.connection.discovered
+        assert any("skipped PID discovery" in line for line in messages)
+        assert set(second.connection.supported_commands) == supported
+        second.close()
@@ -0,0 +1,61 @@
+import os
+
+import obd
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_capabilities import read_vin
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import BATCH_REJECT_LIMIT, OBDBackendCore
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_emulator import DEFAULT_VIN, ELM327Emulator, _u8, _u16
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "openpty"), reason="the emulator needs a pseudo-terminal")
+
+SIGNALS = {
+    0x0C: (lambda v: _u16(v * 4), lambda t: 1500.0),        # RPM
+    0x0D: (lambda v: _u8(v), lambda t: 72.0),               # SPEED
+    0x05: (lambda v: _u8(v + 40), lambda t: 88.0),          # COOLANT_TEMP
+}
+C = obd.commands
+
+
+@pytest.fixture
+def connect():
+    emulators, clients = [], []
+
+    def make(**emulator_options):
+        emulator = ELM327Emulator(signals=SIGNALS, **emulator_options)
+        emulators.append(emulator)
+        client = OBDBackendCore(port=emulator.start(), timeout=0.5, capability_cache=None, auto_tune=False)
+        clients.append(client)
+        client._connect()
+        assert client.is_connected()
+        return emulator, client
+
+    yield make
+    for client in clients:
+        client.close()
+    for emulator in emulators:
+        emulator.stop()
+
+
+def test_batched_values_through_the_serial_stack(connect):
+    emulator, client = connect()
+    before = emulator.requests
+    values = client.query_batch([C.RPM, C.SPEED, C.COOLANT_TEMP])
+    assert values == {C.RPM: 1500.0, C.SPEED: 72.0, C.COOLANT_TEMP: 88.0}
+    assert emulator.requests - before == 1
+
+
+def test_single_pid_ecu(connect):
+    emulator, client = connect(multi_pid=False)
+    for _ in range(BATCH_REJECT_LIMIT):
+        assert client.query_batch([C.RPM, C.SPEED]) == {C.RPM: 1500.0, C.SPEED: 72.0}
+    assert not client._batching_available()
+
+
+def test_dtcs_and_vin(connect):
+    emulator, client = connect()
+    codes = client.get_dtc_codes()
+    assert [code.split(" ")[0] for code in codes["stored"]] == ["P0138"]
+    assert [code.split(" ")[0] for code in codes["pending"]] == ["P0171"]
+    assert codes["permanent"] == []
+    assert read_vin(client.connection) == DEFAULT_VIN
@@ -0,0 +1,40 @@
+import random
+
+import obd
+import pytest
+from obd.protocols import ISO_15765_4_11bit_500k
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import FAST_DECODERS, decode_fast
+
+PROTOCOL = ISO_15765_4_11bit_500k(["7E8 06 41 00 BE 3F A8 13"])
+
+
+def _python_obd(cmd, payload):
+    line = "7E8 %02X 41 %02X %s" % (2 + len(payload), cmd.pid, " ".join("%02X" % b for b in payload))
+    return cmd(PROTOCOL([line])).value.magnitude
+
+
+def _payloads(n):
+    rng = random.Random(n)
+    return [bytes([0] * n), bytes([0xFF] * n)] + [bytes(rng.randrange(256) for _ in range(n)) for _ in range(50)]
+
+
+@pytest.mark.parametrize("pid", sorted(FAST_DECODERS))
+def test_matches_python_obd(pid):
+    cmd = obd.commands[1][pid]
+    length = FAST_DECODERS[pid][0]
+    assert length == cmd.bytes - 2
+    for payload in _payloads(length):
+        assert decode_fast(pid, payload) == pytest.approx(_python_obd(cmd, payload), abs=1e-9), payload.hex()
+
+
+def test_short_payload_and_unknown_pid():
+    assert decode_fast(0x0C, b"\x1a") is None
+    assert decode_fast(0x2F, b"\x80") is None           # fuel level: no fast path, python-obd decodes it
+
+
+def test_single_queries_use_the_raw_path(make_client):
+    client = make_client(batch_queries=False)
+    assert client.query_batch([obd.commands.RPM, obd.commands.COOLANT_TEMP]) == {
+        obd.commands.RPM: 1726.0, obd.commands.COOLANT_TEMP: 83.0}
+    assert client.connection.interface.requests == 2
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+from PyQt6.QtCore import QCoreApplication
+
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FakeWorker, detached_car_metrics
+
+
+@pytest.fixture
+def metrics():
+    app = QCoreApplication.instance() or QCoreApplication([])     # noqa: F841 (QTimers need one)
+    metrics = detached_car_metrics(FakeWorker())
+    yield metrics
+    metrics._pipeline.worker = None
+
+
+def test_only_changed_values_are_sent(metrics):
+    frames = []
+    metrics.frameChanged.connect(frames.append)
+    metrics._stage(speed=50.0, rpm=1726.0)
+    metrics._emit_frame()
+    metrics._stage(speed=50.0, rpm=1800.0)
+    metrics._emit_frame()
+    metrics._stage(speed=50.0, rpm=1800.0)
+    metrics._emit_frame()                                   # nothing changed: no signal
+    assert frames == [{"speed": 50.0, "rpm": 1726.0}, {"rpm": 1800.0}]
+    assert metrics.frame["speed"] == 50.0 and metrics.frame["rpm"] == 1800.0
+
+
+def test_graph_points_are_sent_once(metrics):
+    frames = []
+    metrics.frameChanged.connect(frames.append)
+    metrics._stage_points("speedPoints", [42.0])
+    metrics._emit_frame()
+    metrics._emit_frame()
+    assert frames == [{"speedPoints": [42.0]}]
+    assert "speedPoints" not in metrics.frame
+
+
+def test_one_frame_per_tick(metrics):
+    frames = []
+    metrics.frameChanged.connect(frames.append)
+    for _ in range(3):
+        metrics.update_fast_metrics()
+    assert len(frames) == 3
+    assert frames[0]["speed"] == 50.0 and frames[0]["rpm"] == 1726.0
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_instrumentation import (
+    HISTOGRAM_BOUNDS, Histogram, Instrumentation, RateCounter, SlotStats, dump_json,
+)
+
+
+def test_histogram_quantiles_are_bucket_bounds():
+    histogram = Histogram()
+    for _ in range(99):
+        histogram.record(0.001)
+    histogram.record(0.5)
+    p50 = histogram.quantile(0.5)
+    assert 0.001 <= p50 <= 0.001 * 2 ** 0.5             # within one √2 bucket
+    assert histogram.quantile(1.0) == 0.5
+    assert histogram.as_dict()["max_ms"] == 500.0
+    histogram.record(100.0)                             # above every bound
+    assert histogram.counts[-1] == 1 and histogram.quantile(1.0) == 100.0
+    assert Histogram().quantile(0.5) is None and HISTOGRAM_BOUNDS[0] == 50e-6
+
+
+def test_slot_lateness_jitter_and_overruns():
+    slot = SlotStats(0.1)
+    for start in (0.0, 0.1, 0.25, 0.35):
+        slot.begin(start)
+        slot.end(0.02)
+    slot.end(0.3)
+    report = slot.as_dict()
+    assert report["period_ms"] == pytest.approx(350 / 3, abs=0.01)
+    assert report["jitter_ms"] > 0 and report["overruns"] == 1
+    assert report["lateness"]["max_ms"] == pytest.approx(50.0)
+
+
+def test_rate_counts_quiet_seconds():
+    counter = RateCounter()
+    for second in range(3):
+        counter.add(10, now=second + 0.5)
+    assert counter.rate(now=3.0) == 10.0
+    assert counter.rate(now=5.0) == 6.0                 # 10, 10, 10, 0, 0
+    assert counter.total == 30
+
+
+def test_disabled_instrumentation_is_a_no_op(tmp_path):
+    def slot():
+        return 42
+
+    off = Instrumentation(enabled=False)
+    assert off.timed("tick", 0.1, slot) is slot
+    off.record("query", 0.01)
+    off.count("frameChanged")
+    assert off.snapshot() == {"histograms": {}, "slots": {}, "rates": {}, "counts": {}}
+
+    on = Instrumentation()
+    assert on.timed("tick", 0.1, slot)() == 42
+    on.record("query", 0.01)
+    on.count("frameChanged", 3)
+    path = dump_json(on.snapshot(), str(tmp_path / "diag.json"))
+    with open(path) as f:
+        snapshot = json.load(f)
+    assert snapshot["counts"] == {"frameChanged": 3}
+    assert snapshot["slots"]["tick"]["runtime"]["count"] == 1
+    assert snapshot["histograms"]["query"]["count"] == 1
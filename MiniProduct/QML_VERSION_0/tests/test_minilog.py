@@ -0,0 +1,26 @@
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_minilog import MiniLog
+
+
+def test_cursor_reads_only_new_lines():
+    log = MiniLog(capacity=5)
+    assert log.since(0) == (1, [])
+    assert [log.append(f"line {i}") for i in range(1, 4)] == [1, 2, 3]
+    assert log.since(0) == (1, ["line 1", "line 2", "line 3"])
+    assert log.since(2) == (3, ["line 3"])
+    assert log.since(3) == (4, [])
+
+
+def test_lines_that_fell_off_are_skipped():
+    log = MiniLog(capacity=3)
+    for i in range(1, 8):
+        log.append(f"line {i}")
+    assert (log.first_seq, log.last_seq, len(log)) == (5, 7, 3)
+    assert log.since(2) == (5, ["line 5", "line 6", "line 7"])      # the reader missed 3 and 4
+    assert log.since(6) == (7, ["line 7"])
+
+
+def test_identical_lines_are_kept():
+    log = MiniLog()
+    log.append("[OBD] Link OK")
+    log.append("[OBD] Link OK")
+    assert log.since(0) == (1, ["[OBD] Link OK", "[OBD] Link OK"])
@@ -0,0 +1,102 @@
+import obd
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import BATCH_REJECT_LIMIT
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FakeInterface, FakeMessage
+
+C = obd.commands
+EXPECTED = {
+    C.RPM: 1726.0, C.SPEED: 50.0, C.THROTTLE_POS: 0x40 * 100 / 255, C.ENGINE_LOAD: 0x80 * 100 / 255,
+    C.MAF: 4.0, C.COOLANT_TEMP: 83.0, C.CONTROL_MODULE_VOLTAGE: 12.345,
+}
+
+
+class RejectingInterface(FakeInterface):
+    """ECU that answers single PIDs but returns a negative response to multi-PID requests."""
+
+    def send_and_parse(self, request):
+        if len(bytes(request)) > 4:
+            self.requests += 1
+            return [FakeMessage(b"\x7f\x01\x12")]
+        return super().send_and_parse(request)
+
+
+class SplitInterface(FakeInterface):
+    """Answers a multi-PID request with one message per PID, as some ECUs do."""
+
+    def send_and_parse(self, request):
+        body = bytes(request)[2:]
+        messages = []
+        for i in range(0, len(body) - 1, 2):
+            messages += super().send_and_parse(b"01" + body[i:i + 2])
+        return messages
+
+
+class UnknownPidInterface(FakeInterface):
+    """RPM, then PID 0x33 that nobody asked for (its length is unknown), then SPEED."""
+
+    def send_and_parse(self, request):
+        self.requests += 1
+        return [FakeMessage(b"\x41\x0c\x1a\xf8\x33\x01\x0d\x32")]
+
+
+class SilentInterface(FakeInterface):
+    def send_and_parse(self, request):
+        self.requests += 1
+        return []
+
+
+def assert_values(values, expected=EXPECTED):
+    assert set(values) == set(expected)
+    for cmd, value in expected.items():
+        assert values[cmd] == pytest.approx(value, abs=1e-6), cmd.name
+
+
+def test_seven_pids_take_two_requests(make_client):
+    client = make_client()
+    values = client.query_batch(list(EXPECTED))
+    assert_values(values)
+    assert client.connection.interface.requests == 2            # six per request on CAN
+
+
+@pytest.mark.parametrize("fast_decoders", (True, False))
+def test_fast_and_python_obd_decoding_agree(make_client, fast_decoders):
+    client = make_client(fast_decoders=fast_decoders)
+    assert_values(client.query_batch(list(EXPECTED)))
+
+
+def test_one_message_per_pid(make_client):
+    client = make_client(SplitInterface())
+    assert_values(client.query_batch([C.RPM, C.SPEED, C.MAF]), {C.RPM: 1726.0, C.SPEED: 50.0, C.MAF: 4.0})
+
+
+def test_unknown_pid_stops_parsing_but_keeps_what_was_decoded(make_client):
+    client = make_client(UnknownPidInterface())
+    assert client._query_multi_pid([C.RPM, C.SPEED]) == {C.RPM: 1726.0}
+
+
+def test_rejected_batches_fall_back_to_single_queries(make_client):
+    interface = RejectingInterface()
+    client = make_client(interface)
+    commands = [C.RPM, C.SPEED, C.MAF]
+    for _ in range(BATCH_REJECT_LIMIT):
+        assert_values(client.query_batch(commands), {C.RPM: 1726.0, C.SPEED: 50.0, C.MAF: 4.0})
+    assert not client._batching_available()
+    before = interface.requests
+    client.query_batch(commands)
+    assert interface.requests - before == len(commands)         # no more multi-PID attempts
+
+
+def test_silent_adapter_is_a_link_problem_not_a_rejection(make_client):
+    client = make_client(SilentInterface())
+    assert client.query_batch([C.RPM, C.SPEED]) == {}
+    assert client._adapter_silent
+    assert client._batch_failures == 0
+    assert client.get_pid_health() == {}                        # unanswered PIDs are not blamed
+
+
+def test_no_batching_outside_can(make_client):
+    client = make_client()
+    client.connection.protocol_id = lambda: "3"                 # ISO 9141-2
+    assert_values(client.query_batch([C.RPM, C.SPEED]), {C.RPM: 1726.0, C.SPEED: 50.0})
+    assert client.connection.interface.requests == 2
@@ -0,0 +1,107 @@
+import contextlib
+import io
+import time
+
+import obd
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import (
+    PID_FAILURE_LIMIT, PID_QUARANTINE_MAX_S, PID_QUARANTINE_S, PIDHealth,
+)
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FakeInterface, FakeMessage
+
+C = obd.commands
+
+
+class DeadMafInterface(FakeInterface):
+    """The ECU answers, but never with MAF data (an ELM327 would print NO DATA)."""
+
+    def send_and_parse(self, request):
+        if bytes(request)[2:] == b"10":
+            self.requests += 1
+            return [FakeMessage(b"\x7f\x01\x12")]
+        return super().send_and_parse(request)
+
+
+def test_quarantine_starts_after_the_failure_limit_and_doubles():
+    health = PIDHealth()
+    for _ in range(PID_FAILURE_LIMIT - 1):
+        assert not health.record(False, 0.0)
+    assert health.record(False, 0.0)
+    assert health.quarantined_until == PID_QUARANTINE_S
+    assert health.record(False, 100.0)                  # failed re-probe
+    assert health.quarantine == 2 * PID_QUARANTINE_S
+    for _ in range(10):
+        health.record(False, 100.0)
+    assert health.quarantine == PID_QUARANTINE_MAX_S
+
+
+def test_one_good_answer_clears_it():
+    health = PIDHealth()
+    for _ in range(PID_FAILURE_LIMIT):
+        health.record(False, 0.0)
+    assert not health.record(True, 1.0)
+    assert health.failures == 0 and health.quarantined_until == 0.0
+    assert health.total_failures == PID_FAILURE_LIMIT
+
+
+def test_dead_pid_is_skipped_until_its_reprobe(make_client):
+    interface = DeadMafInterface()
+    client = make_client(interface, batch_queries=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(PID_FAILURE_LIMIT):
+            assert client.query_batch([C.RPM, C.MAF]) == {C.RPM: 1726.0}
+    before = interface.requests
+    assert client.query_batch([C.RPM, C.MAF]) == {C.RPM: 1726.0}
+    assert interface.requests - before == 1                     # MAF no longer asked for
+    assert not client.pid_usable(C.MAF)
+    assert client.pid_usable(C.MAF, time.monotonic() + PID_QUARANTINE_S + 1)
+    assert client.get_pid_health()["MAF"]["failures"] == PID_FAILURE_LIMIT
+
+
+def test_pids_missing_from_the_support_bitmap_are_never_queried(make_client):
+    client = make_client()
+    client._supported_pids = {(1, 0x00), (1, 0x0C), (1, 0x0D)}
+    assert not client.pid_usable(C.MAF)
+    assert client.query_batch([C.RPM, C.SPEED, C.MAF]) == {C.RPM: 1726.0, C.SPEED: 50.0}
+
+
+class DyingMafInterface(DeadMafInterface):
+    """MAF answers until `dead` is set, then only ever NO DATA."""
+
+    def __init__(self):
+        super().__init__()
+        self.dead = False
+
+    def send_and_parse(self, request):
+        if self.dead:
+            return super().send_and_parse(request)
+        return FakeInterface.send_and_parse(self, request)
+
+
+def _poll_everything(client):
+    for job in client.scheduler.jobs:
+        job.next_due = 0.0
+    return client.poll_scheduled()
+
+
+def test_a_quarantined_pid_drops_out_of_the_live_data(make_client):
+    interface = DyingMafInterface()
+    client = make_client(interface, batch_queries=False)
+    _poll_everything(client)
+    assert client.latest_fast_data()["MAF"] == 4.0
+    interface.dead = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(PID_FAILURE_LIMIT):
+            _poll_everything(client)
+    assert not client.pid_usable(C.MAF)
+    fast = client.latest_fast_data()
+    assert "MAF" not in fast and fast["RPM"] == 1726.0
+    assert "MAF" not in client.snapshot_entries()
+
+
+def test_an_unsupported_pid_drops_out_once_skipped(make_client):
+    client = make_client()
+    _poll_everything(client)
+    client._supported_pids = {(1, 0x00), (1, 0x0C), (1, 0x0D)}
+    _poll_everything(client)
+    assert "MAF" not in client.latest_fast_data()
@@ -0,0 +1,53 @@
+import contextlib
+import io
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_pipeline import STATS_METRICS, TelemetryPipeline
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import LINK_CONNECTED, LINK_DEGRADED
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FAST_SAMPLE, FakeWorker
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = TelemetryPipeline()
+    pipeline.worker = FakeWorker(per_tick=4)
+    return pipeline
+
+
+def test_every_sample_feeds_statistics_and_trip(pipeline):
+    for _ in range(50):
+        assert pipeline.consume_samples() == 4
+    assert pipeline.samples == 200
+    summary = pipeline.stats["speed"].summary("trip")
+    assert summary["count"] == 200 and summary["mean"] == FAST_SAMPLE["SPEED"]
+    assert set(pipeline.stats) == set(STATS_METRICS)
+    trip = pipeline.trip_summary()
+    assert trip["duration_s"] == pytest.approx(199 * 0.05)
+    assert trip["distance_km"] == pytest.approx(50.0 * 199 * 0.05 / 3600.0)
+
+
+def test_state_changes_are_reported_once(pipeline):
+    states = []
+    pipeline.on_state_change = states.append
+    pipeline.latest()
+    pipeline.latest()
+    pipeline.worker.latest().link_state = LINK_DEGRADED
+    pipeline.latest()
+    assert states == [LINK_CONNECTED, LINK_DEGRADED]
+    assert pipeline.connected
+
+
+def test_without_a_worker_nothing_happens():
+    pipeline = TelemetryPipeline()
+    assert pipeline.latest() is None and not pipeline.connected
+    assert pipeline.consume_samples() == 0
+    assert pipeline.dtc_codes() is None
+    assert pipeline.set_logging(True) is False
+
+
+def test_run_stops_on_request(pipeline):
+    ticks = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.run(tick=0.001, on_tick=ticks.append, should_stop=lambda: len(ticks) >= 5)
+    assert len(ticks) == 5 and pipeline.samples == 20
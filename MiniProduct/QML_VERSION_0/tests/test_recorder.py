@@ -0,0 +1,77 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import threading
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_recorder import TelemetryRecorder
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_triplog import TripLogReader
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FAST_SAMPLE
+
+
+def _quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def test_csv_rows_events_and_schema(tmp_path):
+    path = str(tmp_path / "log.csv")
+    with _quiet():
+        recorder = TelemetryRecorder(path, columns=("timestamp", "SPEED", "GEAR", "RPM"), chunk_size=4)
+        for i in range(10):
+            recorder.append({"SPEED": float(i), "GEAR": "D", "UNKNOWN": 1.0}, timestamp=100.0 + i)
+        recorder.append({"SPEED": "n/a", "GEAR": "?"}, timestamp=110.0)     # unparsable → empty cells
+        recorder.record_event("DTC", {"stored": ["P0300"]}, timestamp=105.0)
+        recorder.close()
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "SPEED", "GEAR", "RPM"]
+    assert rows[1] == ["100.0", "0.0", "D", ""]
+    assert rows[-1] == ["110.0", "", "", ""]
+    assert len(rows) == 12 and recorder.rows_written == 11
+    with open(str(tmp_path / "log.events.jsonl")) as f:
+        assert json.loads(f.readline()) == {"timestamp": 105.0, "kind": "DTC", "data": {"stored": ["P0300"]}}
+
+
+def test_trip_format_keeps_every_row(tmp_path):
+    path = str(tmp_path / "log.trip")
+    recorder = TelemetryRecorder(path, chunk_size=100, pool_size=2, log_format="trip")
+    for i in range(1234):
+        recorder.append(FAST_SAMPLE, timestamp=float(i))
+    recorder.close()
+    with TripLogReader(path) as reader:
+        assert reader.row_count() == 1234
+        assert reader.read_range(0, 2000, ["timestamp"])["timestamp"].tolist() == [float(i) for i in range(1234)]
+
+
+def test_stop_logging_keeps_rows_appended_concurrently(make_client, tmp_path):
+    """Appends from the acquisition thread racing stop_logging on the GUI thread are never lost."""
+    for cycle in range(30):
+        client = make_client(log_file_path=str(tmp_path / f"race{cycle}.trip"), log_format="trip")
+        with _quiet():
+            client.start_logging()
+        recorder = client._recorder
+        calls = [0]
+        append = recorder.append
+
+        def counting(sample, timestamp=None):
+            calls[0] += 1
+            append(sample, timestamp)
+
+        recorder.append = counting
+        stop = threading.Event()
+
+        def spin():
+            while not stop.is_set():
+                client._append_log_entry(FAST_SAMPLE)
+
+        thread = threading.Thread(target=spin)
+        thread.start()
+        while not calls[0]:
+            pass
+        with _quiet():
+            client.stop_logging()
+        stop.set()
+        thread.join()
+        assert recorder.rows_written == calls[0]
+        assert os.path.getsize(str(tmp_path / f"race{cycle}.trip")) > 0
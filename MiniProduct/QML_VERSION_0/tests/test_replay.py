@@ -0,0 +1,87 @@
+import math
+from array import array
+
+import obd
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_recorder import LOG_COLUMNS
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_replay import REPLAY_MAX, ReplayConnection
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_triplog import TripLogWriter
+
+ROWS = 40           # 0.1 s apart, two chunks; SPEED = row number, RPM always missing
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def trip(tmp_path):
+    path = str(tmp_path / "drive.trip")
+    with TripLogWriter(path, LOG_COLUMNS) as writer:
+        for start in (0, ROWS // 2):
+            columns = [array("d", [math.nan] * (ROWS // 2)) for _ in LOG_COLUMNS]
+            for i in range(ROWS // 2):
+                columns[0][i] = 1000.0 + (start + i) * 0.1
+                columns[LOG_COLUMNS.index("SPEED")][i] = float(start + i)
+            writer.write_chunk(columns, ROWS // 2)
+    return path
+
+
+def speed(connection):
+    return connection.query(obd.commands.SPEED).value
+
+
+def test_plays_at_real_time_and_faster(trip):
+    clock = Clock()
+    replay = ReplayConnection(trip, speed=1.0, clock=clock)
+    assert speed(replay) == 0.0
+    clock.now = 2.05
+    assert speed(replay) == 20.0                    # crosses into the second chunk
+    fast = ReplayConnection(trip, speed=10.0, clock=clock)
+    clock.now += 0.305
+    assert speed(fast) == 30.0
+
+
+def test_max_speed_advances_one_row_per_polling_round(trip):
+    replay = ReplayConnection(trip, speed=REPLAY_MAX)
+    assert [speed(replay) for _ in range(3)] == [0.0, 1.0, 2.0]
+    assert replay.query(obd.commands.COOLANT_TEMP).value is None     # other PIDs read the same row
+
+
+def test_end_of_trip_loops_or_finishes(trip):
+    clock = Clock()
+    looping = ReplayConnection(trip, clock=clock)
+    once = ReplayConnection(trip, loop=False, clock=clock)
+    clock.now = ROWS * 0.1 + 1.0
+    assert speed(looping) == 0.0 and looping.status() == obd.OBDStatus.CAR_CONNECTED
+    assert speed(once) is None and once.status() == obd.OBDStatus.NOT_CONNECTED
+
+
+def test_only_recorded_columns_are_supported(trip):
+    replay = ReplayConnection(trip)
+    assert obd.commands.SPEED in replay.supported_commands
+    assert obd.commands.RPM not in replay.supported_commands         # column is all NaN
+
+
+def test_csv_logs_replay_too(tmp_path):
+    path = tmp_path / "obd_log.csv"
+    path.write_text("timestamp,SPEED,RPM\n5.0,12,900\n5.1,13,950\n")
+    replay = ReplayConnection(str(path), speed=REPLAY_MAX)
+    assert [speed(replay), speed(replay)] == [12.0, 13.0]
+
+
+def test_drives_the_client_deterministically(trip):
+    # auto_tune stays on: a replay source has no adapter interface, so tuning is skipped
+    client = OBDBackendCore(port=trip, capability_cache=None,
+                            connection_factory=lambda: ReplayConnection(trip, speed=REPLAY_MAX))
+    client._connect()
+    assert client.is_connected()
+    speeds = [client.get_fast_data()["SPEED"] for _ in range(3)]
+    assert speeds == [0.0, 1.0, 2.0]
+    client.close()
@@ -0,0 +1,58 @@
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_process import (
+    HEADER_WORDS, FRAME_FIELDS, TelemetryRing, decode_frame, encode_frame,
+)
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import LINK_DEGRADED, TelemetrySnapshot
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FAST_SAMPLE
+
+
+@pytest.fixture
+def ring():
+    ring = TelemetryRing(n_slots=4, n_fields=2)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def test_reader_sees_frames_and_wraparound(ring):
+    assert ring.latest() == (0, None)
+    for k in range(6):
+        ring.write([k, k * 10.0])
+    reader = TelemetryRing(ring.name)
+    try:
+        assert reader.latest() == (6, [5.0, 50.0])
+        assert reader.read(1) is None                   # overwritten by frame 5
+        assert [k for k, _ in reader.read_since(0)] == [2, 3, 4, 5]
+        assert reader.read_since(5) == [(5, [5.0, 50.0])]
+        assert reader.read_since(6) == []
+    finally:
+        reader.close()
+
+
+def test_a_slot_being_written_is_not_read(ring):
+    ring.write([1.0, 2.0])
+    ring._u64[HEADER_WORDS] = 1                         # odd sequence: the writer is mid-frame
+    assert ring.read(0) is None
+    assert ring.latest() == (1, None)
+
+
+def test_attaching_to_foreign_memory_fails():
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(ValueError):
+            TelemetryRing(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_frame_round_trip():
+    snapshot = TelemetrySnapshot(seq=3, timestamp=12.5, connected=True, fast=dict(FAST_SAMPLE, MAF=None), dtc={},
+                                 link_state=LINK_DEGRADED)
+    values = encode_frame(snapshot)
+    assert len(values) == len(FRAME_FIELDS) and values[-1] == 1.0
+    timestamp, fast, link_state = decode_frame(values)
+    expected = {k: v for k, v in FAST_SAMPLE.items() if k != "MAF"}
+    assert (timestamp, fast, link_state) == (12.5, expected, LINK_DEGRADED)
@@ -0,0 +1,72 @@
+import obd
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import DTC_JOB, PIDScheduler, RateClass, scale_rate_classes
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import OBDAcquisitionWorker
+
+RATES = (
+    RateClass("fast", 0.05, {"RPM": obd.commands.RPM}, priority=0),
+    RateClass("slow", 1.0, {"COOLANT_TEMP": obd.commands.COOLANT_TEMP}, priority=2),
+)
+
+
+def keys(jobs):
+    return [job.key for job in jobs]
+
+
+def test_everything_is_due_at_start_highest_priority_first():
+    scheduler = PIDScheduler(RATES, now=0.0)
+    assert keys(scheduler.due_jobs(0.0)) == ["RPM", "COOLANT_TEMP"]
+
+
+def test_mark_done_keeps_the_phase_without_catching_up():
+    scheduler = PIDScheduler(RATES, now=0.0)
+    rpm = scheduler.next_job(0.0)
+    scheduler.mark_done(rpm, 0.01)
+    assert rpm.next_due == 0.05
+    scheduler.mark_done(rpm, 3.0)               # missed many slots: resume now, no burst
+    assert rpm.next_due == 3.0
+
+
+def test_jobs_wait_for_their_deadline():
+    scheduler = PIDScheduler(RATES, now=0.0)
+    for job in scheduler.due_jobs(0.0):
+        scheduler.mark_done(job, 0.0)
+    assert scheduler.due_jobs(0.01) == []
+    assert keys(scheduler.due_jobs(0.05)) == ["RPM"]
+    assert abs(scheduler.time_until_next(0.01) - 0.04) < 1e-9
+
+
+def test_lookahead_admits_almost_due_jobs():
+    scheduler = PIDScheduler(RATES, now=0.0)
+    for job in scheduler.due_jobs(0.0):
+        scheduler.mark_done(job, 0.0)
+    assert keys(scheduler.due_jobs(0.05, lookahead=0.1)) == ["RPM"]
+    assert keys(scheduler.due_jobs(0.95, lookahead=0.1)) == ["RPM", "COOLANT_TEMP"]
+
+
+def test_starved_low_priority_job_is_promoted():
+    scheduler = PIDScheduler(RATES, now=0.0)
+    coolant = scheduler.jobs[1]
+    coolant.next_due = 0.0
+    scheduler.jobs[0].next_due = 2.5
+    # coolant has waited longer than its own interval: it now outranks RPM
+    assert keys(scheduler.due_jobs(2.5)) == ["COOLANT_TEMP", "RPM"]
+
+
+def test_scaled_rate_classes():
+    fast = scale_rate_classes(10.0, RATES)
+    assert [rc.interval for rc in fast] == [0.005, 0.1]
+    assert [rc.interval for rc in scale_rate_classes(None, RATES)] == [0.0, 0.0]
+
+
+def test_a_dtc_only_poll_publishes_no_sample(make_client):
+    client = make_client()
+    worker = OBDAcquisitionWorker(client)
+    worker._poll()
+    assert len(worker.drain_samples()) == 1
+    published = worker.latest().seq
+    for job in client.scheduler.jobs:
+        job.next_due = 0.0 if job.key == DTC_JOB else float("inf")
+    worker._poll()
+    assert worker.latest().seq == published + 1             # the snapshot still carries the new DTCs
+    assert worker.drain_samples() == []
@@ -0,0 +1,45 @@
+import math
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_series import TRIP_CAPACITY, SeriesRing, TieredSeries, lttb
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    ts = list(range(1000))
+    vs = [math.sin(t / 50.0) for t in ts]
+    vs[500] = 25.0                                      # a spike block averages would smear
+    out_t, out_v = lttb(ts, vs, 50)
+    assert len(out_t) == len(out_v) == 50
+    assert (out_t[0], out_t[-1]) == (0, 999)
+    assert 25.0 in out_v
+    assert out_t == sorted(out_t)
+    assert lttb(ts[:10], vs[:10], 50) == (ts[:10], vs[:10])
+
+
+def test_ring_wraps_oldest_first():
+    ring = SeriesRing(3)
+    for i in range(5):
+        ring.append(float(i), i * 10.0)
+    assert len(ring) == 3
+    assert ring.points() == ([2.0, 3.0, 4.0], [20.0, 30.0, 40.0])
+
+
+def test_append_returns_closed_minute_points():
+    series = TieredSeries()
+    assert series.append(0.0, 1.0) == []
+    assert series.append(0.5, 3.0) == []
+    assert series.append(1.0, 10.0) == [2.0]            # mean of the closed 1 s bucket
+    assert series.values("minute") == [2.0]
+
+
+def test_trip_tier_compacts_with_constant_memory():
+    series = TieredSeries()
+    resolution = series.resolution("trip")
+    t = 0.0
+    while t < resolution * (TRIP_CAPACITY + 10):
+        series.append(t, t % 100)
+        t += 1.0
+    assert series.resolution("trip") == 2 * resolution
+    ts, vs = series.points("trip")
+    assert len(ts) <= TRIP_CAPACITY and ts == sorted(ts)
+    assert len(series.values("minute")) == 60
+    assert len(series.points("trip", max_points=100)[0]) == 100
@@ -0,0 +1,53 @@
+import obd
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FakeConnection, FakeMessage
+
+C = obd.commands
+
+
+class CountingConnection(FakeConnection):
+    """Answers every python-obd query with a fixed value and remembers what was asked."""
+
+    def __init__(self):
+        super().__init__()
+        self.supported_commands = [C.PIDS_A, C.FUEL_PRESSURE, C.INTAKE_PRESSURE, C.GET_DTC, C.CLEAR_DTC, C.RPM]
+        self.queried = []
+
+    def query(self, cmd, force=False):
+        self.queried.append(cmd.name)
+        response = obd.OBDResponse(cmd, [FakeMessage(b"\x41\x00")])
+        response.value = 42
+        return response
+
+
+def _client():
+    connection = CountingConnection()
+    client = OBDBackendCore(connection_factory=lambda: connection, capability_cache=None, auto_tune=False)
+    client._connect()
+    return client, connection
+
+
+def test_refresher_skips_dtc_modes_bitmaps_and_live_pids():
+    client, connection = _client()
+    try:
+        refreshed = {client.refresh_snapshot_step() for _ in range(6)}
+        assert refreshed - {None} == {"FUEL_PRESSURE", "INTAKE_PRESSURE"}
+        assert "CLEAR_DTC" not in connection.queried and "GET_DTC" not in connection.queried
+    finally:
+        client.close()
+
+
+def test_snapshot_reads_the_cache_without_querying():
+    client, connection = _client()
+    try:
+        client.refresh_snapshot_step()
+        client.refresh_snapshot_step()
+        asked = len(connection.queried)
+        snapshot = client.get_full_snapshot()
+        assert snapshot["FUEL_PRESSURE"] == snapshot["INTAKE_PRESSURE"] == "42"
+        assert len(connection.queried) == asked
+        assert "FUEL_PRESSURE" not in client.get_full_snapshot(max_age=-1.0)
+        assert client.snapshot_entries()["FUEL_PRESSURE"]["age"] >= 0
+    finally:
+        client.close()
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer import OBD_pipeline
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_minilog import MINI_LOG_CAPACITY
+from MiniProduct.QML_VERSION_0.benchmarks import soak
+
+
+def _samples(sizes, traced=None):
+    return [{"sim_s": i * 600.0, "sizes": {"ring": size}, "traced_bytes": None if traced is None else traced[i],
+             "rss_bytes": None, "tick_p50_ms": 0.1} for i, size in enumerate(sizes)]
+
+
+def test_growing_containers_fail_and_saw_tooth_rings_pass():
+    assert soak.evaluate(_samples([512, 300, 512, 300, 512, 300]), 0) == []
+    failures = soak.evaluate(_samples([10, 11, 12, 13, 14, 15]), 0)
+    assert len(failures) == 1 and failures[0].startswith("ring still growing")
+    assert soak.evaluate(_samples([1, 1]), 0)[0].startswith("only 2 samples")
+
+
+def test_traced_memory_trend():
+    growing = [i * (1 << 20) for i in range(9)]
+    assert any(f.startswith("traced_bytes trending up") for f in soak.evaluate(_samples([1] * 9, growing), 0))
+    assert soak.evaluate(_samples([1] * 9, [5 << 20] * 9), 0) == []
+
+
+def test_clock_is_patched_only_inside_the_block():
+    clock = soak.FakeClock()
+    with soak.clocked(clock):
+        start = OBD_pipeline.time.monotonic()
+        OBD_pipeline.time.sleep(3600)
+        assert OBD_pipeline.time.monotonic() - start == 3600
+    assert OBD_pipeline.time is time
+
+
+def test_short_drive_runs_with_capped_containers():
+    pytest.importorskip("PyQt6")
+    # too short for the growth verdict (nothing is warmed up yet), long enough for the caps
+    report = soak.run(hours=0.25, sample_every_s=60.0, trace_memory=False, warmup_s=0, report=lambda line: None)
+    assert report["samples_acquired"] > 0 and len(report["samples"]) == 15
+    assert report["trip"]["duration_s"] > 0
+    sizes = report["samples"][-1]["sizes"]
+    assert sizes["mini_logger"] <= MINI_LOG_CAPACITY
+    assert sizes["series.speed.minute"] == 60
+    assert sizes["pending_points"] == 0 and sizes.get("recorder.overflows", 0) == 0
@@ -0,0 +1,92 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_stats import QuantileSketch, StreamingStats
+
+
+def test_bucket_count_stays_bounded_without_summary():
+    stats = StreamingStats()
+    for i in range(20 * 900):                           # 15 min at 20 Hz, nobody reads
+        stats.add(i * 0.05, float(i % 97))
+    for window in stats._windows.values():
+        if window.span is None:
+            assert not window.buckets                   # trip window keeps totals only
+        else:
+            assert len(window.buckets) <= window.span / stats.bucket_s
+            assert len(window.lows) <= len(window.buckets) and len(window.highs) <= len(window.buckets)
+
+
+def test_exact_moments_over_the_window():
+    rng = random.Random(1)
+    samples = [(i * 0.1, 1000.0 + rng.gauss(0, 5)) for i in range(1200)]    # 120 s
+    stats = StreamingStats()
+    for t, v in samples:
+        stats.add(t, v)
+    now = samples[-1][0]
+    for name, span in (("10s", 10.0), ("1min", 60.0), ("trip", None)):
+        first = 0 if span is None else (int(now) - int(span) + 1)
+        values = [v for t, v in samples if int(t) >= first]
+        summary = stats.summary(name)
+        assert summary["count"] == len(values)
+        assert summary["mean"] == pytest.approx(statistics.fmean(values), rel=1e-12)
+        assert summary["min"] == min(values) and summary["max"] == max(values)
+        assert summary["stddev"] == pytest.approx(statistics.pstdev(values), rel=1e-9)
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(2)
+    values = [rng.lognormvariate(3, 1) for _ in range(5000)]
+    stats = StreamingStats(windows=(("trip", None),))
+    for i, v in enumerate(values):
+        stats.add(i * 0.01, v)
+    ordered = sorted(values)
+    summary = stats.summary("trip", quantiles=(0.5, 0.9, 0.99))
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert summary[f"p{round(q * 100)}"] == pytest.approx(exact, rel=0.0101)
+
+
+def test_sketch_merge_and_subtract():
+    a, b = QuantileSketch(), QuantileSketch()
+    for v in (-3.0, 0.0, 1.0, 2.0):
+        a.add(v)
+    for v in (5.0, 7.0):
+        b.add(v)
+    before = (dict(a.positive), dict(a.negative), a.zero, a.count)
+    a.merge(b)
+    assert a.count == 6 and a.quantile(1.0) == pytest.approx(7.0, rel=0.01)
+    a.merge(b, -1)
+    assert (a.positive, a.negative, a.zero, a.count) == before
+    assert a.quantile(0.0) == pytest.approx(-3.0, rel=0.01)
+
+
+def test_missing_samples_and_idle_expiry():
+    stats = StreamingStats()
+    stats.add(0.0, 5.0)
+    stats.add(0.1, None)
+    stats.add(0.2, math.nan)
+    assert stats.summary("10s")["count"] == 1
+    empty = stats.summary("10s", now=60.0)              # no samples for a minute
+    assert empty["count"] == 0 and empty["mean"] is None and empty["p50"] is None
+    assert stats.summary("trip", now=60.0)["mean"] == 5.0
+
+
+def test_late_samples_never_duplicate_a_bucket():
+    stats = StreamingStats()
+    stats.add(0.2, 1.0)
+    stats.add(0.5, 2.0)
+    assert stats.summary("10s", now=1.1)["count"] == 2      # GUI clock already in the next second
+    stats.add(0.9, 3.0)                                     # worker sample for second 0, arriving late
+    stats.add(1.2, 4.0)
+    stats.add(0.7, 5.0)                                     # even later: joins the open bucket
+    stats.add(2.0, 6.0)
+    window = stats._windows["10s"]
+    assert [bucket.index for bucket in window.buckets] == [0, 1]
+    summary = stats.summary("10s", now=2.5)
+    assert summary["count"] == 6 and summary["mean"] == 3.5
+    assert (summary["min"], summary["max"]) == (1.0, 6.0)
+    assert stats.summary("10s", now=30.0)["count"] == 0
+    assert stats.summary("trip", now=30.0)["count"] == 6
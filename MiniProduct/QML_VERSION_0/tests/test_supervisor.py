@@ -0,0 +1,109 @@
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import (
+    ConnectionSupervisor, LINK_CONNECTED, LINK_DEGRADED, LINK_DISCONNECTED, LINK_PROBING, StampedMessages,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    """Adapter whose presence and poll results the test sets directly."""
+
+    def __init__(self):
+        self.present = False
+        self.connected = False
+        self.connects = 0
+        self.consecutive_empty_polls = 0
+        self.consecutive_silent_polls = 0
+
+    def _connect(self):
+        self.connects += 1
+        self.connected = self.present
+        return [f"[OBD] connect #{self.connects}"]
+
+    def disconnect(self):
+        self.connected = False
+
+    def is_connected(self, max_age=None):
+        return self.connected
+
+
+def make(**options):
+    clock, client, states = Clock(), FakeClient(), []
+    supervisor = ConnectionSupervisor(client, StampedMessages(), clock=clock, **options)
+    supervisor.on_state_change = states.append
+    return supervisor, client, clock, states
+
+
+def test_backoff_doubles_up_to_the_cap():
+    supervisor, client, clock, _ = make(initial_backoff=1.0, max_backoff=8.0)
+    waits = []
+    for _ in range(6):
+        assert not supervisor.step()
+        waits.append(supervisor.time_until_next_attempt())
+        assert not supervisor.step()                    # nothing happens before the backoff elapsed
+        clock.now += waits[-1]
+    assert waits == [1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+    assert client.connects == 6
+
+
+def test_connect_resets_the_backoff():
+    supervisor, client, clock, states = make()
+    supervisor.step()
+    clock.now += supervisor.time_until_next_attempt()
+    client.present = True
+    assert supervisor.step()
+    assert supervisor.state == LINK_CONNECTED and supervisor.backoff == supervisor.initial_backoff
+    assert supervisor.attempts == 0
+    assert states == [LINK_PROBING, LINK_DISCONNECTED, LINK_PROBING, LINK_CONNECTED]
+
+
+def connected(**options):
+    supervisor, client, clock, states = make(**options)
+    client.present = True
+    supervisor.step()
+    states.clear()
+    return supervisor, client, clock, states
+
+
+def test_empty_polls_degrade_then_drop():
+    supervisor, client, _, states = connected(degraded_after=3, drop_after=8)
+    client.consecutive_empty_polls = 3
+    assert supervisor.step() and supervisor.state == LINK_DEGRADED
+    client.consecutive_empty_polls = 0
+    assert supervisor.step() and supervisor.state == LINK_CONNECTED
+    client.consecutive_empty_polls = 8
+    assert not supervisor.step()
+    assert states == [LINK_DEGRADED, LINK_CONNECTED, LINK_DISCONNECTED]
+    assert not client.connected                         # port released
+
+
+def test_silent_adapter_drops_sooner():
+    supervisor, client, _, _ = connected(silent_drop_after=2)
+    client.consecutive_silent_polls = 1
+    assert supervisor.step() and supervisor.state == LINK_DEGRADED
+    client.consecutive_silent_polls = 2
+    assert not supervisor.step() and supervisor.state == LINK_DISCONNECTED
+
+
+def test_lost_status_drops_and_waits_out_the_backoff():
+    supervisor, client, clock, _ = connected(initial_backoff=1.0)
+    client.connected = False
+    assert not supervisor.step()
+    assert supervisor.time_until_next_attempt() == 1.0
+    connects = client.connects
+    supervisor.step()
+    assert client.connects == connects
+
+
+def test_reconnect_request_retries_at_once():
+    supervisor, client, _, states = connected()
+    supervisor.request_reconnect()
+    assert supervisor.step()
+    assert client.connects == 2
+    assert states == [LINK_DISCONNECTED, LINK_PROBING, LINK_CONNECTED]
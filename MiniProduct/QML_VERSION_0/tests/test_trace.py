@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trace import TRACER, Tracer
+
+
+def test_disabled_spans_record_nothing():
+    tracer = Tracer()
+    with tracer.span("RPM", "obd"):
+        pass
+    assert len(tracer) == 0
+
+
+def test_buffer_keeps_the_newest_spans():
+    tracer = Tracer()
+    tracer.enable(capacity=3)
+    for i in range(5):
+        tracer.complete(f"q{i}", "obd", float(i), i + 0.5)
+    assert [event[0] for event in tracer.dump()["events"]] == ["q2", "q3", "q4"]
+
+
+def test_export_merges_process_dumps(tmp_path):
+    ui = Tracer("ui")
+    ui.enable()
+    with ui.span("update_fast_metrics", "slot", {"samples": 2}):
+        pass
+    child = Tracer("acquisition").dump()
+    child["pid"] = os.getpid() + 1
+    child["events"] = [("RPM", "obd", 1.0, 0.002, 7, None)]
+    path = str(tmp_path / "trace.json")
+    assert ui.export(path, child) == 2
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert spans["update_fast_metrics"]["args"] == {"samples": 2}
+    assert spans["RPM"]["ts"] == 1e6 and spans["RPM"]["dur"] == 2000.0
+    names = {e["args"]["name"] for e in events if e["name"] == "process_name"}
+    assert names == {"ui", "acquisition"}
+
+
+@pytest.fixture
+def tracing():
+    TRACER.clear()
+    TRACER.enable()
+    yield TRACER
+    TRACER.disable()
+    TRACER.clear()
+
+
+def test_client_queries_are_traced(make_client, tracing):
+    client = make_client()
+    client.get_fast_data()
+    assert any(event[1] == "obd" for event in tracing.dump()["events"])
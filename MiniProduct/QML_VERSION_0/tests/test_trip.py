@@ -0,0 +1,60 @@
+import math
+import random
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer import OBD_trip
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_recorder import TelemetryRecorder
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_trip import AFR, FUEL_DENSITY, TripComputer, summarize_arrays, summarize_log
+
+
+def _feed(rows):
+    trip = TripComputer()
+    for row in rows:
+        trip.add(*row)
+    return trip.summary()
+
+
+def test_trapezoid_totals():
+    # 36 km/h → 72 km/h over 10 s, MAF constant: 150 m, 10 s of fuel flow
+    s = _feed([(0.0, 36.0, 10.0), (5.0, 54.0, 10.0), (10.0, 72.0, 10.0)])
+    assert s["distance_km"] == pytest.approx(0.15)
+    assert s["fuel_l"] == pytest.approx(100.0 / (AFR * FUEL_DENSITY))
+    assert (s["duration_s"], s["moving_s"], s["idle_s"]) == (10.0, 10.0, 0.0)
+    assert s["avg_speed_kph"] == pytest.approx(54.0)
+
+
+def test_gaps_and_idle():
+    s = _feed([(0.0, 0.0, 2.0), (2.0, 0.0, 2.0), (60.0, 30.0, 8.0), (61.0, 30.0, None)])
+    assert s["duration_s"] == 3.0                       # the 58 s gap is not integrated
+    assert s["idle_s"] == 2.0 and s["moving_s"] == 1.0
+    assert s["idle_fuel_l"] == pytest.approx(4.0 / (AFR * FUEL_DENSITY))
+    assert s["fuel_l"] == s["idle_fuel_l"]              # the interval ending without MAF adds no fuel
+
+
+@pytest.mark.parametrize("vectorized", (True, False))
+def test_whole_log_matches_the_live_computer(monkeypatch, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(OBD_trip, "np", None)
+    elif OBD_trip.np is None:
+        pytest.skip("numpy not installed")
+    rng = random.Random(3)
+    rows, t = [], 0.0
+    for i in range(2000):
+        t += 0.1 if i % 500 else 30.0                   # a few dropped-link gaps
+        speed = math.nan if i % 97 == 0 else max(0.0, 50 * math.sin(i / 200.0))
+        rows.append((t, speed, rng.uniform(1, 20)))
+    live = _feed(rows)
+    whole = summarize_arrays(*zip(*rows))
+    for key, value in live.items():
+        assert whole[key] == pytest.approx(value, rel=1e-9)
+
+
+def test_summarize_a_recorded_trip_log(tmp_path):
+    path = str(tmp_path / "log.trip")
+    recorder = TelemetryRecorder(path, chunk_size=50, log_format="trip")
+    rows = [(i * 0.5, 40.0, 6.0) for i in range(120)]
+    for t, speed, maf in rows:
+        recorder.append({"SPEED": speed, "MAF": maf}, timestamp=t)
+    recorder.close()
+    assert summarize_log(path) == pytest.approx(_feed(rows))
@@ -0,0 +1,100 @@
+import math
+import os
+import random
+from array import array
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_triplog import (
+    TripLogReader, TripLogWriter, _INDEX_ENTRY, _TRAILER, convert_csv,
+)
+
+COLUMNS = ("timestamp", "SPEED", "RPM")
+
+
+def _write(path, chunks, codec="zlib"):
+    """chunks: list of row lists [(t, speed, rpm), ...]; returns every row written."""
+    rows = []
+    with TripLogWriter(path, COLUMNS, codec=codec) as writer:
+        for chunk in chunks:
+            writer.write_chunk([array("d", col) for col in zip(*chunk)], len(chunk))
+            rows.extend(chunk)
+    return rows
+
+
+def _chunks(n_chunks, rows_per_chunk, step=0.1):
+    return [[(round((c * rows_per_chunk + i) * step, 6), float(i % 120), 800.0 + i)
+             for i in range(rows_per_chunk)] for c in range(n_chunks)]
+
+
+@pytest.mark.parametrize("codec", ("zlib", "lzma"))
+def test_round_trip(tmp_path, codec):
+    path = str(tmp_path / "t.trip")
+    chunks = _chunks(5, 37)
+    chunks[2][3] = (chunks[2][3][0], math.nan, 1.0)             # missing value survives as NaN
+    rows = _write(path, chunks, codec)
+    with TripLogReader(path) as reader:
+        assert reader.columns == COLUMNS
+        assert reader.row_count() == len(rows) == 185
+        assert reader.time_span() == (rows[0][0], rows[-1][0])
+        read = [row for chunk in reader.iter_chunks() for row in zip(*(chunk[c] for c in COLUMNS))]
+    assert len(read) == len(rows)
+    for got, want in zip(read, rows):
+        assert all(g == w or (math.isnan(g) and math.isnan(w)) for g, w in zip(got, want))
+
+
+def test_read_range_is_inclusive_and_crosses_chunks(tmp_path):
+    path = str(tmp_path / "t.trip")
+    rows = _write(path, _chunks(10, 50))
+    with TripLogReader(path) as reader:
+        out = reader.read_range(4.5, 10.5, ["timestamp", "RPM"])
+        assert out["timestamp"].tolist() == [r[0] for r in rows if 4.5 <= r[0] <= 10.5]
+        assert out["RPM"].tolist() == [r[2] for r in rows if 4.5 <= r[0] <= 10.5]
+        assert reader.overlapping_chunks(4.5, 10.5) == [0, 1, 2]          # 5 s per chunk
+        assert reader.read_range(-10, -1)["timestamp"].tolist() == []
+        assert reader.read_range(1000, 2000)["timestamp"].tolist() == []
+
+
+def test_overlapping_chunks_matches_a_full_scan(tmp_path):
+    path = str(tmp_path / "t.trip")
+    chunks = _chunks(200, 10)
+    # a clock step backwards: one chunk ends before the previous one did
+    chunks[50] = [(chunks[50][0][0], 1.0, 1.0), (chunks[49][-1][0] - 0.5, 1.0, 1.0)]
+    _write(path, chunks)
+    rng = random.Random(6)
+    with TripLogReader(path) as reader:
+        for _ in range(500):
+            t0 = rng.uniform(-10, 210)
+            t1 = t0 + rng.uniform(0, 20)
+            expected = [i for i, c in enumerate(reader.chunks) if c[0] <= t1 and c[1] >= t0]
+            assert reader.overlapping_chunks(t0, t1) == expected
+
+
+def test_missing_trailer_rebuilds_the_index(tmp_path):
+    path = str(tmp_path / "t.trip")
+    rows = _write(path, _chunks(4, 20))
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:                                # recording cut off: no index, no trailer
+        f.truncate(size - _TRAILER.size - 4 * _INDEX_ENTRY.size)
+    with TripLogReader(path) as reader:
+        assert len(reader.chunks) == 4
+        assert reader.read_range(0, 100)["timestamp"].tolist() == [r[0] for r in rows]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.trip"
+    path.write_bytes(b"timestamp,SPEED\n1,2\n")
+    with pytest.raises(ValueError):
+        TripLogReader(str(path))
+
+
+def test_convert_csv_sorts_and_skips_rows_without_timestamp(tmp_path):
+    src = tmp_path / "obd_log.csv"
+    src.write_text("timestamp,SPEED,GEAR\n2.0,20,D\n,,\n1.0,10,N\n3.0,,P\n")
+    out = convert_csv(str(src), columns=("timestamp", "SPEED", "GEAR"), chunk_size=2)
+    with TripLogReader(out) as reader:
+        data = reader.read_range(0, 10)
+        assert data["timestamp"].tolist() == [1.0, 2.0, 3.0]
+        assert data["SPEED"].tolist()[:2] == [10.0, 20.0] and math.isnan(data["SPEED"][2])
+        assert data["GEAR"].tolist() == [2.0, 3.0, 0.0]             # indices into GEAR_CODES
+        assert len(reader.chunks) == 2
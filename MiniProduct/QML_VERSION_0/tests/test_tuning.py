@@ -0,0 +1,80 @@
+import types
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer import OBD_tuning
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_client import OBDBackendCore
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_tuning import AdapterSettings, AdapterTuner
+from MiniProduct.QML_VERSION_0.benchmarks.fakes import FakeConnection, FakeInterface
+
+
+class _Reply:
+    def __init__(self, text):
+        self.text = text
+
+    def raw(self):
+        return self.text
+
+
+class TimedInterface(FakeInterface):
+    """
+    ELM327 whose answer time follows its settings: without a frame hint it
+    waits out ATST (halved by ATAT2), with one it returns after the frame.
+    Time is a fake clock, so the search is deterministic.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.clock = 100.0
+        self.adaptive = 1
+        self.st = 0x32
+        self.at = []
+
+    def send_and_parse(self, request):
+        request = bytes(request)
+        if request.startswith(b"AT"):
+            self.at.append(request)
+            if request == b"ATI":
+                return [_Reply("ELM327 v1.5")]
+            if request.startswith(b"ATAT"):
+                self.adaptive = int(request[4:])
+            elif request.startswith(b"ATST"):
+                self.st = int(request[4:], 16)
+            return [_Reply("OK")]
+        hinted = len(request) % 2 == 1
+        self.clock += 0.01 if hinted else self.st * 0.004 / self.adaptive
+        return super().send_and_parse(request)
+
+
+@pytest.fixture
+def interface(monkeypatch):
+    interface = TimedInterface()
+    clock = types.SimpleNamespace(perf_counter=lambda: interface.clock, monotonic=lambda: interface.clock)
+    monkeypatch.setattr(OBD_tuning, "time", clock)
+    return interface
+
+
+def test_settings_round_trip():
+    settings = AdapterSettings(115200, adaptive=2, st=0x0C, frame_hint=True, rtt=0.0123)
+    again = AdapterSettings.from_dict(settings.as_dict())
+    assert again.as_dict() == settings.as_dict()
+    assert AdapterSettings.from_dict({}).as_dict() == AdapterSettings().as_dict()
+
+
+def test_tuner_stacks_the_improvements(interface):
+    best = AdapterTuner(FakeConnection(interface)).tune()
+    assert (best.adaptive, best.st, best.frame_hint) == (2, 0x0C, True)
+    assert best.rtt == pytest.approx(0.01)
+    assert (interface.adaptive, interface.st) == (2, 0x0C)         # left on the best setting
+
+
+def test_connect_tunes_without_a_capability_cache(interface):
+    client = OBDBackendCore(connection_factory=lambda: FakeConnection(interface), capability_cache=None)
+    try:
+        messages = client._connect()
+        assert any(line.startswith("[OBD-TUNE] Selected") for line in messages)
+        assert client.frame_hints and client.adapter_settings.st == 0x0C
+        assert client.lock.acquire(blocking=False)                  # released after tuning
+        client.lock.release()
+    finally:
+        client.close()
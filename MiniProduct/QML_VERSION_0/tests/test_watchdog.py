@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_watchdog import StallWatchdog
+
+
+def _blocking_slot(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:       # busy, like a synchronous query would be
+        pass
+
+
+@pytest.fixture
+def watchdog():
+    reports = []
+    watchdog = StallWatchdog(lambda seconds, lines: reports.append((seconds, lines)), threshold=0.05,
+                             interval=0.01, thread_id=threading.get_ident())
+    watchdog.reports = reports
+    watchdog.start()
+    yield watchdog
+    watchdog.stop()
+
+
+def test_a_stall_is_reported_with_its_culprit(watchdog, capsys):
+    watchdog.beat()
+    _blocking_slot(0.3)
+    watchdog.beat()
+    assert watchdog.stalls == 1
+    seconds, lines = watchdog.reports[0]
+    assert seconds >= 0.2
+    assert "_blocking_slot" in lines[0] and lines[0].startswith("[STALL] GUI event loop blocked")
+    assert "currently in _blocking_slot" in capsys.readouterr().out
+
+
+def test_a_beating_loop_reports_nothing(watchdog):
+    for _ in range(20):
+        watchdog.beat()
+        time.sleep(0.01)
+    watchdog.beat()
+    assert watchdog.stalls == 0 and watchdog.reports == []
@@ -0,0 +1,53 @@
+import time
+
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_pipeline import TelemetryPipeline
+from MiniProduct.QML_VERSION_0.BACKENDS.PyVer.OBD_worker import OBDAcquisitionWorker, StampedMessages
+
+
+class _StubClient:
+    def close(self):
+        pass
+
+
+class _Worker:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def drain_messages(self):
+        lines, self.lines = self.lines, []
+        return lines
+
+
+def test_lines_are_stamped_when_queued(monkeypatch):
+    messages = StampedMessages()
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    messages.append("[OBD] Connecting ...")
+    monkeypatch.setattr(time, "time", lambda: 1003.0)
+    messages.extend(["[OBD] Status: Car Connected", "[OBD] Connected"])
+    assert messages.drain() == [(1000.0, "[OBD] Connecting ..."), (1003.0, "[OBD] Status: Car Connected"),
+                                (1003.0, "[OBD] Connected")]
+    assert messages.drain() == []
+
+
+def test_queue_is_bounded():
+    messages = StampedMessages(maxlen=3)
+    messages.extend(str(i) for i in range(10))
+    assert [line for _, line in messages.drain()] == ["7", "8", "9"]
+
+
+def test_worker_drains_what_the_supervisor_queued():
+    worker = OBDAcquisitionWorker(_StubClient())
+    before = time.time()
+    worker.supervisor._messages.append("[OBD] Link recovered.")
+    [(at, line)] = worker.drain_messages()
+    assert line == "[OBD] Link recovered."
+    assert before <= at <= time.time()
+
+
+def test_pipeline_keeps_the_queue_time(capsys):
+    at = time.mktime((2026, 1, 2, 3, 4, 5, 0, 0, -1))
+    pipeline = TelemetryPipeline()
+    pipeline.worker = _Worker([(at, "[OBD] Connecting ...")])
+    pipeline.pump_messages()
+    assert pipeline.mini_logger.lines() == ["[03:04:05] [OBD] Connecting ..."]
+    assert "[OBD] Connecting ..." in capsys.readouterr().out